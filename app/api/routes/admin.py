@@ -0,0 +1,47 @@
+# app/api/routes/admin.py
+from fastapi import APIRouter, Query
+
+from app.services.admission_service import admission_controller
+from app.services.disk_cache import disk_cache
+from app.services.duplicate_index import duplicate_index
+from app.services.executors import all_executors
+from app.services.job_scheduler import job_scheduler
+from app.services.llm_control import llm_limiter
+from app.services.search_index import search_index
+from app.services.trending_service import trending_tracker
+
+router = APIRouter()
+
+
+@router.get("/executors")
+async def get_executor_metrics():
+    """
+    Size, active workers, queue depth and queue wait percentiles of each worker pool,
+    plus the LLM concurrency limit that plays the same role for LLM calls, the combined job
+    queue (aggregated over clients), the admission control counters of POST /combined, the
+    sizes of the search and duplicate indexes and the disk cache counters.
+    """
+    return {
+        "executors": [executor.snapshot() for executor in all_executors()],
+        "scheduler": job_scheduler.snapshot(),
+        "llm": llm_limiter.snapshot(),
+        "admission": admission_controller.snapshot(),
+        "search_index": search_index.snapshot(),
+        "duplicate_index": duplicate_index.snapshot(),
+        "disk_cache": disk_cache.snapshot() if disk_cache else None
+    }
+
+
+@router.get("/trending")
+async def get_trending_videos(
+        limit: int = Query(20, ge=1, le=100, description="Maximum number of videos")
+):
+    """
+    Most requested videos on this worker by decayed request count (Count-Min sketch estimates),
+    with the distinct clients requesting each (HyperLogLog estimates) and the model last
+    requested for it. These are the videos the scheduled prefetch keeps warm.
+    """
+    return {
+        "videos": trending_tracker.top(limit),
+        "sketch": trending_tracker.snapshot()
+    }
@@ -1,202 +1,589 @@
 import asyncio
+import json
 import time
 import uuid
-from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, status as http_status, BackgroundTasks, Request
+from fastapi import APIRouter, Header, HTTPException, status as http_status, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.exceptions import YouTubeTranscriptError
+from app.core.config import settings
+from app.core.exceptions import AIServiceUnavailableError, YouTubeTranscriptError
 from app.models.schemas import CombinedRequest, CombinedResponse, ErrorResponse, ProcessingStatusResponse, \
     TranscriptResponse
+from app.services.admission_service import admission_controller
+from app.services.checkpoint_service import INSIGHTS, NORMALIZED, TRANSCRIPT, CheckpointService
+from app.services.duplicate_index import duplicate_index, signature
+from app.services.eta_service import FETCHING, GENERATING, eta_estimator
+from app.services.executors import cpu_executor
+from app.services.extractive_service import EXTRACTIVE_MODEL
 from app.services.insights_service import InsightsService
-from app.services.redis_service import RedisService
+from app.services.job_registry import job_registry
+from app.services.job_scheduler import client_identity, idempotency_key, job_scheduler
+from app.services.model_router import estimate_tokens
+from app.services.redis_service import ChunkedValueError, RedisService
+from app.services.search_index import search_index
+from app.services.transcript_normalizer import normalize_transcript
 from app.services.transcript_service import TranscriptService
+from app.services.trending_service import trending_tracker
+from app.services.write_buffer import TERMINAL_STATUSES, JobWriteBuffer
+from app.utils.deadline import Deadline, DeadlineExceeded, use_deadline
+from app.utils.timing import JobTimeline, maybe_profile, span, use_timeline
 from app.utils.validators import extract_youtube_id, validate_youtube_id
 
 router = APIRouter()
 
+# Terminal statuses that POST /{request_id}/retry resumes
+RETRYABLE_STATUSES = TERMINAL_STATUSES - {"completed"}
+
 
 def process_video(
         request_id: str,
         video_id: str,
         model: str,
-        redis_service: RedisService
+        redis_service: RedisService,
+        queued_at: Optional[float] = None,
+        fallback_models: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None
 ):
     """Background task to process video and generate insights"""
+    # Create async event loop for this background task
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        loop.run_until_complete(
+            run_job(request_id, video_id, model, redis_service, queued_at, fallback_models, languages)
+        )
+    finally:
+        # Always ensure the loop is closed properly
+        try:
+            # Run any pending tasks (status broadcasts) before closing
+            pending = asyncio.all_tasks(loop)
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        except Exception as close_error:
+            print(f"Error cleaning up pending tasks: {str(close_error)}")
+        finally:
+            loop.close()
+
+
+async def run_job(
+        request_id: str,
+        video_id: str,
+        model: str,
+        redis_service: RedisService,
+        queued_at: Optional[float] = None,
+        fallback_models: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None
+):
+    """
+    Run every stage of a combined job under one deadline.
+
+    The deadline (REQUEST_TIMEOUT, counted from when the job was queued) is inherited by
+    the transcript fetch, each Redis operation and the LLM call. When it passes, the
+    running stage is cancelled and the job ends as timed_out with whatever it produced.
+    """
     start_time = time.time()
-    loop = None
 
+    # Per-job span timeline, stored with the result for debugging slow requests
+    timeline = JobTimeline(request_id, started_at=queued_at or start_time)
+    timeline.record("queue_wait", 0.0, start_time - timeline.started_at)
+    deadline = Deadline(settings.REQUEST_TIMEOUT, started_at=timeline.started_at)
+
+    # What the pipeline has produced so far; kept when the job times out
+    job = {
+        "video_id": video_id,
+        "transcript": None,
+        "language": None,
+        "normalization": None,
+        "progress": 0.0,
+        "resumed": []
+    }
+
+    with use_timeline(timeline), maybe_profile(timeline):
+        # Status and result writes of the job, coalesced and pipelined
+        writes = JobWriteBuffer(redis_service)
+        watcher = None
+        try:
+            with use_deadline(deadline):
+                pipeline = asyncio.ensure_future(deadline.run(_run_pipeline(
+                    request_id, video_id, model, writes, fallback_models, languages, job, timeline, start_time
+                )))
+
+            # Cancelled while queued here; cancellation through another worker is checked by the pipeline
+            if not job_registry.attach(request_id, pipeline):
+                pipeline.cancel()
+            elif settings.CANCEL_POLL_INTERVAL > 0:
+                watcher = asyncio.ensure_future(_watch_cancel(request_id, redis_service, pipeline))
+
+            await pipeline
+
+        except asyncio.CancelledError:
+            reason = job_registry.cancel_reason(request_id) or "Cancelled"
+            print(f"Job {request_id} cancelled: {reason}")
+            await _store_unfinished(request_id, writes, job, "cancelled", "Processing was cancelled.",
+                                    reason, timeline, start_time)
+
+        except DeadlineExceeded as e:
+            print(f"Job {request_id} timed out: {str(e)}")
+            # A cancel made through another worker meanwhile keeps the job cancelled
+            reason = await redis_service.get(cancel_key(request_id))
+            if reason:
+                await _store_unfinished(request_id, writes, job, "cancelled", "Processing was cancelled.",
+                                        reason, timeline, start_time)
+            else:
+                await _store_unfinished(request_id, writes, job, "timed_out",
+                                        f"Processing did not finish within {settings.REQUEST_TIMEOUT} seconds.",
+                                        str(e), timeline, start_time)
+
+        except Exception as e:
+            # Log the exception for debugging
+            import traceback
+            print(f"Error in process_video: {str(e)}")
+            print(traceback.format_exc())
+
+            try:
+                reason = await redis_service.get(cancel_key(request_id))
+                if reason:
+                    await _store_unfinished(request_id, writes, job, "cancelled", "Processing was cancelled.",
+                                            reason, timeline, start_time)
+                    return
+
+                # Update status to failed
+                await writes.set_status(
+                    request_id,
+                    {
+                        "status": "failed",
+                        "progress": 0,
+                        "message": f"Processing failed: {str(e)}",
+                        "error": str(e),
+                        "video_id": video_id
+                    },
+                    ttl=7200  # 2 hours
+                )
+            except Exception as inner_e:
+                print(f"Error updating failure status: {str(inner_e)}")
+                print(traceback.format_exc())
+
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            await writes.flush()
+            job_registry.remove(request_id)
+
+
+async def _check_cancelled(request_id: str, redis_service: RedisService) -> None:
+    """
+    Stop the job if it was cancelled through another worker. Checked between stages and
+    before the final result is stored, so a job cancelled elsewhere never ends as completed.
+    """
+    reason = await redis_service.get(cancel_key(request_id))
+    if reason:
+        job_registry.cancel(request_id, reason)
+        raise asyncio.CancelledError()
+
+
+async def _watch_cancel(request_id: str, redis_service: RedisService, pipeline: asyncio.Future):
+    """Cancel the pipeline as soon as the job is cancelled through another worker (CANCEL_POLL_INTERVAL)"""
+    while not pipeline.done():
+        await asyncio.sleep(settings.CANCEL_POLL_INTERVAL)
+        reason = await redis_service.get(cancel_key(request_id))
+        if reason:
+            job_registry.cancel(request_id, reason)
+            pipeline.cancel()
+            return
+
+
+async def _run_pipeline(
+        request_id: str,
+        video_id: str,
+        model: str,
+        writes: JobWriteBuffer,
+        fallback_models: Optional[List[str]],
+        languages: Optional[List[str]],
+        job: Dict[str, Any],
+        timeline: JobTimeline,
+        start_time: float
+):
+    # Cancelled while queued in another worker
+    await _check_cancelled(request_id, writes.redis)
+
+    # Step 1: Update status to processing (2 hour TTL)
+    await writes.set_status(
+        request_id,
+        {
+            "status": "processing",
+            "progress": 0.1,
+            "message": "Fetching transcript...",
+            "video_id": video_id,  # Include video_id in all status updates
+            "estimated_completion_time": eta_estimator.completion_time(
+                FETCHING, model, caption_bytes=eta_estimator.caption_size(video_id)
+            )
+        },
+        ttl=7200  # 2 hours
+    )
+    job["progress"] = 0.1
+
+    # Step 2: Get transcript (the best caption track for the language preferences)
+    transcript_service = TranscriptService()
+    fetch_start = time.monotonic()
+    transcript_items, language, cached = await transcript_service.get_preferred_items(video_id, languages)
+    fetch_time = time.monotonic() - fetch_start
+    with span("transcript.join"):
+        transcript = transcript_service.join_transcript(transcript_items)
+    job["transcript"] = transcript
+    job["language"] = language
+    if not cached:
+        eta_estimator.record_fetch(video_id, len(transcript), fetch_time)
+    else:
+        # The transcript cache is the transcript checkpoint
+        job["resumed"].append(TRANSCRIPT)
+
+    # The raw transcript is kept for the transcript endpoints; the LLM gets the normalized text
+    llm_input = transcript
+    normalization = None
+    if settings.NORMALIZE_TRANSCRIPT:
+        normalized = await CheckpointService.get_normalized(video_id, language)
+        if normalized:
+            job["resumed"].append(NORMALIZED)
+        else:
+            with span("transcript.normalize") as normalize_span:
+                normalized = await cpu_executor.run(normalize_transcript, [item.text for item in transcript_items])
+                normalize_span.update(normalized["stats"])
+            await CheckpointService.save_normalized(video_id, normalized, language)
+        llm_input = normalized["text"] or transcript
+        normalization = normalized["stats"]
+    job["normalization"] = normalization
+    llm_tokens = estimate_tokens(llm_input)
+
+    # Step 3: Update status with transcript included
+    await writes.set_status(
+        request_id,
+        {
+            "status": "processing",
+            "progress": 0.5,
+            "message": "Transcript ready. Generating insights...",
+            "video_id": video_id,
+            "estimated_completion_time": eta_estimator.completion_time(GENERATING, model, llm_tokens),
+            "transcript": transcript  # Include transcript in status
+        },
+        ttl=7200  # 2 hours
+    )
+    job["progress"] = 0.5
+
+    # Step 4: Store partial result with just transcript (1 hour TTL)
+    partial_result = {
+        "video_id": video_id,
+        "transcript": transcript,
+        "insights": None,
+        "language": language,
+        "normalization": normalization,
+        "resumed_stages": job["resumed"],
+        "processing_time": time.time() - start_time,
+        "timings": timeline.to_dict()
+    }
+
+    # Cache partial result (stored together with the status above)
+    await writes.set(
+        f"result:{request_id}",
+        partial_result,
+        ttl=3600,  # 1 hour
+        compress=True
+    )
+
+    # Step 5: Generate insights, unless the job was cancelled through another worker meanwhile
+    await _check_cancelled(request_id, writes.redis)
+    insights_service = InsightsService()
     try:
-        # Create async event loop for this background task
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        duplicate = None
+        generation = await CheckpointService.get_insights(video_id, model, language)
+        if generation:
+            job["resumed"].append(INSIGHTS)
+        else:
+            video_signature, duplicate = await _find_duplicate(video_id, model, language, llm_input)
+            if duplicate:
+                # Re-upload or mirror of a processed video: its insights apply to this one as well
+                generation = duplicate["generation"]
+            else:
+                llm_start = time.monotonic()
+                generation = await insights_service.generate(llm_input, model, fallback_models)
+                llm_time = time.monotonic() - llm_start
+                eta_estimator.record_llm(generation["model"], llm_tokens, llm_time)
+                if generation["model"] != model:
+                    # Requests for "auto" or a failing model take as long as their actual answer
+                    eta_estimator.record_llm(model, llm_tokens, llm_time)
+            await CheckpointService.save_insights(video_id, model, generation, language)
+            if video_signature is not None and not generation.get("fallback_reason"):
+                duplicate_index.add(video_id, video_signature)
+        insights = generation["insights"]
+
+        # Step 6: Store complete result (24 hour TTL), unless the job was cancelled meanwhile
+        await _check_cancelled(request_id, writes.redis)
+        complete_result = {
+            "video_id": video_id,
+            "transcript": transcript,
+            "insights": insights,
+            "model_used": generation["model"],
+            "llm_attempts": generation["attempts"],
+            "fallback_reason": generation.get("fallback_reason"),
+            "duplicate_of": duplicate["video_id"] if duplicate else None,
+            "duplicate_similarity": duplicate["similarity"] if duplicate else None,
+            "language": language,
+            "normalization": normalization,
+            "resumed_stages": job["resumed"],
+            "processing_time": time.time() - start_time,
+            "timings": timeline.to_dict()
+        }
 
-        # Step 1: Update status to processing (2 hour TTL)
-        loop.run_until_complete(redis_service.set_status(
-            request_id,
-            {
-                "status": "processing",
-                "progress": 0.1,
-                "message": "Fetching transcript...",
-                "video_id": video_id,  # Include video_id in all status updates
-                "estimated_completion_time": (datetime.utcnow() + timedelta(minutes=2)).isoformat()
-            },
-            ttl=7200  # 2 hours
-        ))
+        # Cache complete result
+        store_start = time.monotonic()
+        await writes.set(
+            f"result:{request_id}",
+            complete_result,
+            ttl=86400,  # 24 hours
+            compress=True
+        )
 
-        # Step 2: Get transcript
-        transcript_service = TranscriptService()
-        transcript = loop.run_until_complete(transcript_service.get_transcript(video_id))
+        # Step 7: Update status to completed (stored with the result in one transaction)
+        message = "Processing complete"
+        if generation.get("fallback_reason"):
+            message += ". The AI service was unavailable, so key points were extracted locally."
+        elif duplicate:
+            message += f". Insights reused from near-duplicate video {duplicate['video_id']}."
 
-        # Step 3: Update status with transcript included
-        loop.run_until_complete(redis_service.set_status(
+        await writes.set_status(
             request_id,
             {
-                "status": "processing",
-                "progress": 0.5,
-                "message": "Transcript ready. Generating insights...",
+                "status": "completed",
+                "progress": 1.0,
+                "message": message,
+                "request_id": request_id,
                 "video_id": video_id,
-                "estimated_completion_time": (datetime.utcnow() + timedelta(minutes=1)).isoformat(),
-                "transcript": transcript  # Include transcript in status
+                "transcript": transcript,
+                "insights": insights,
+                "model_used": generation["model"]
             },
             ttl=7200  # 2 hours
-        ))
-
-        # Step 4: Store partial result with just transcript (1 hour TTL)
+        )
+        eta_estimator.record_store(time.monotonic() - store_start)
+        eta_estimator.record_job(time.time() - start_time)
+        await _index_video(request_id, video_id, transcript_items, insights)
+
+    except DeadlineExceeded:
+        raise
+
+    except Exception as insights_error:
+        # Handle AI model error gracefully
+        print(f"Error generating insights: {str(insights_error)}")
+
+        # Create a user-friendly error message
+        error_message = "We couldn't generate insights for this video."
+        if isinstance(insights_error, AIServiceUnavailableError):
+            error_message += " The AI service is overloaded right now, please try again in a few minutes."
+        elif "no insights were generated" in str(insights_error).lower():
+            error_message += " The AI model couldn't extract meaningful information from the transcript."
+        elif "api request failed" in str(insights_error).lower():
+            error_message += " There was an issue connecting to the AI service."
+
+        # Store partial result with just transcript and error info, unless the job was cancelled meanwhile
+        await _check_cancelled(request_id, writes.redis)
         partial_result = {
             "video_id": video_id,
             "transcript": transcript,
             "insights": None,
-            "processing_time": time.time() - start_time
+            "error": str(insights_error),
+            "language": language,
+            "normalization": normalization,
+            "resumed_stages": job["resumed"],
+            "processing_time": time.time() - start_time,
+            "timings": timeline.to_dict()
         }
 
         # Cache partial result
-        loop.run_until_complete(redis_service.set(
+        await writes.set(
             f"result:{request_id}",
             partial_result,
-            ttl=3600,  # 1 hour
+            ttl=86400,  # 24 hours - keep it for as long as a successful result
             compress=True
-        ))
-
-        # Step 5: Generate insights
-        insights_service = InsightsService()
-        try:
-            insights = loop.run_until_complete(insights_service.get_insights(transcript, model))
+        )
 
-            # Step 6: Store complete result (24 hour TTL)
-            complete_result = {
+        # Update status with partial success (stored with the result in one transaction)
+        await writes.set_status(
+            request_id,
+            {
+                "status": "partial_success",
+                "progress": 0.5,
+                "message": error_message,
+                "error": str(insights_error),
                 "video_id": video_id,
+                "request_id": request_id,
                 "transcript": transcript,
-                "insights": insights,
-                "processing_time": time.time() - start_time
-            }
+                "insights": None
+            },
+            ttl=7200  # 2 hours
+        )
+        await _index_video(request_id, video_id, transcript_items, None)
 
-            # Cache complete result
-            loop.run_until_complete(redis_service.set(
-                f"result:{request_id}",
-                complete_result,
-                ttl=86400,  # 24 hours
-                compress=True
-            ))
 
-            # Step 7: Update status to completed
-            loop.run_until_complete(redis_service.set_status(
-                request_id,
-                {
-                    "status": "completed",
-                    "progress": 1.0,
-                    "message": "Processing complete",
-                    "request_id": request_id,
-                    "video_id": video_id,
-                    "transcript": transcript,
-                    "insights": insights
-                },
-                ttl=7200  # 2 hours
-            ))
-
-        except Exception as insights_error:
-            # Handle AI model error gracefully
-            print(f"Error generating insights: {str(insights_error)}")
-
-            # Create a user-friendly error message
-            error_message = "We couldn't generate insights for this video."
-            if "no insights were generated" in str(insights_error).lower():
-                error_message += " The AI model couldn't extract meaningful information from the transcript."
-            elif "api request failed" in str(insights_error).lower():
-                error_message += " There was an issue connecting to the AI service."
-
-            # Update status with partial success
-            loop.run_until_complete(redis_service.set_status(
-                request_id,
+async def _index_video(request_id: str, video_id: str, transcript_items: List[Any], insights: Optional[str]):
+    """Add a finished video to the search index; indexing errors never fail the job"""
+    try:
+        with span("search.index"):
+            segments = [(item.offset, item.text) for item in transcript_items]
+            await cpu_executor.run(search_index.add, video_id, request_id, segments, insights)
+    except Exception as e:
+        print(f"Error indexing video {video_id}: {str(e)}")
+
+
+async def _find_duplicate(
+        video_id: str,
+        model: str,
+        lang: str,
+        text: str
+) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+    """
+    MinHash signature of the transcript text and the most similar already processed video
+    ({video_id, similarity, generation}) with checkpointed insights for model in caption
+    language lang, if any is at least DUPLICATE_THRESHOLD similar.
+    """
+    if settings.DUPLICATE_THRESHOLD <= 0 or settings.CHECKPOINT_TTL <= 0 or model == EXTRACTIVE_MODEL:
+        return None, None
+
+    with span("duplicate.lookup") as lookup_span:
+        video_signature = await cpu_executor.run(signature, text)
+        if video_signature is None:
+            return None, None
+        for other, similarity in duplicate_index.find(video_id, video_signature, settings.DUPLICATE_THRESHOLD):
+            # Matches whose insights checkpoint has expired cannot be reused
+            generation = await CheckpointService.get_insights(other, model, lang)
+            if generation:
+                similarity = round(similarity, 4)
+                lookup_span.update(duplicate_of=other, similarity=similarity)
+                return video_signature, {"video_id": other, "similarity": similarity, "generation": generation}
+    return video_signature, None
+
+
+async def _store_unfinished(
+        request_id: str,
+        writes: JobWriteBuffer,
+        job: Dict[str, Any],
+        status: str,
+        message: str,
+        error: str,
+        timeline: JobTimeline,
+        start_time: float
+):
+    """Record a job that timed out or was cancelled, keeping the transcript if it was fetched"""
+    transcript = job["transcript"]
+    if transcript:
+        message += " The transcript is available."
+
+    try:
+        # These writes run after the deadline or cancellation, bounded by STORAGE_TIMEOUT only
+        if transcript:
+            await writes.set(
+                f"result:{request_id}",
                 {
-                    "status": "partial_success",
-                    "progress": 0.5,
-                    "message": error_message,
-                    "error": str(insights_error),
-                    "video_id": video_id,
-                    "request_id": request_id,
+                    "video_id": job["video_id"],
                     "transcript": transcript,
-                    "insights": None
+                    "insights": None,
+                    "error": error,
+                    "language": job["language"],
+                    "normalization": job["normalization"],
+                    "resumed_stages": job["resumed"],
+                    "processing_time": time.time() - start_time,
+                    "timings": timeline.to_dict()
                 },
-                ttl=7200  # 2 hours
-            ))
+                ttl=86400,  # 24 hours
+                compress=True
+            )
 
-            # Store partial result with just transcript and error info
-            partial_result = {
-                "video_id": video_id,
+        await writes.set_status(
+            request_id,
+            {
+                "status": status,
+                "progress": job["progress"],
+                "message": message,
+                "error": error,
+                "video_id": job["video_id"],
+                "request_id": request_id,
                 "transcript": transcript,
-                "insights": None,
-                "error": str(insights_error),
-                "processing_time": time.time() - start_time
-            }
+                "insights": None
+            },
+            ttl=7200  # 2 hours
+        )
+    except Exception as e:
+        print(f"Error updating {status} status: {str(e)}")
 
-            # Cache partial result
-            loop.run_until_complete(redis_service.set(
-                f"result:{request_id}",
-                partial_result,
-                ttl=86400,  # 24 hours - keep it for as long as a successful result
-                compress=True
-            ))
 
-    except Exception as e:
-        # Log the exception for debugging
-        import traceback
-        print(f"Error in process_video: {str(e)}")
-        print(traceback.format_exc())
+def cancel_key(request_id: str) -> str:
+    return f"cancel:{request_id}"
+
+
+def job_key(request_id: str) -> str:
+    return f"job:{request_id}"
+
+
+def is_final_result(result: Dict[str, Any]) -> bool:
+    """Results with insights belong to completed jobs, which are never retried, so they do not change"""
+    return bool(result.get("insights"))
+
+
+async def _replay(
+        redis: RedisService,
+        record: Any,
+        params: Dict[str, Any],
+        response: Response
+) -> ProcessingStatusResponse:
+    """Status of the job an Idempotency-Key was first used for"""
+    if isinstance(record, str):
+        record = json.loads(record)
+    if record["video_id"] != params["video_id"] or record["model"] != params["model"]:
+        raise HTTPException(
+            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+    request_id = record["request_id"]
+    response.headers["Idempotent-Replayed"] = "true"
+    status = await redis.get_status(request_id)
+    if status.get("status") == "not_found":
+        # The first request claimed the key and has not stored its status yet
+        status = {"status": "pending", "progress": 0, "message": "Request queued"}
+    status["request_id"] = request_id
+    status.update(job_scheduler.position(request_id) or {})
+    return ProcessingStatusResponse(**status)
 
-        try:
-            # Ensure we have a working event loop
-            if loop is None or loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            # Update status to failed
-            loop.run_until_complete(redis_service.set_status(
-                request_id,
-                {
-                    "status": "failed",
-                    "progress": 0,
-                    "message": f"Processing failed: {str(e)}",
-                    "error": str(e),
-                    "video_id": video_id
-                },
-                ttl=7200  # 2 hours
-            ))
-        except Exception as inner_e:
-            print(f"Error updating failure status: {str(inner_e)}")
-            print(traceback.format_exc())
-    finally:
-        # Always ensure the loop is closed properly
-        if loop is not None and not loop.is_closed():
-            try:
-                # Run any pending tasks before closing
-                pending = asyncio.all_tasks(loop)
-                if pending:
-                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            except Exception as close_error:
-                print(f"Error cleaning up pending tasks: {str(close_error)}")
-            finally:
-                loop.close()
+
+async def cancel_job(request_id: str, reason: str) -> Dict[str, Any]:
+    """
+    Cancel a pending or running combined job.
+
+    A job running in this process is cancelled at once; jobs in other workers notice the
+    cancel key within CANCEL_POLL_INTERVAL seconds, before their next stage or before storing
+    their result, whichever comes first, and queued jobs never start.
+    """
+    redis = RedisService()
+    status = await redis.get_status(request_id)
+    cancelled = {
+        "status": "cancelled",
+        "progress": status.get("progress", 0),
+        "message": "Processing was cancelled.",
+        "error": reason,
+        "video_id": status.get("video_id"),
+        "request_id": request_id
+    }
+
+    # Status first: the job records its own (richer) cancelled status once it stops
+    await redis.set_status(request_id, cancelled, ttl=7200)
+    await redis.set(cancel_key(request_id), reason, ttl=7200)
+    if job_scheduler.remove(request_id):
+        # Still queued here: it never starts
+        job_registry.remove(request_id)
+    else:
+        job_registry.cancel(request_id, reason)
+    return cancelled
 
 
 @router.post(
@@ -204,15 +591,22 @@ def process_video(
     response_model=ProcessingStatusResponse,
     responses={
         400: {"model": ErrorResponse},
-        500: {"model": ErrorResponse}
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
     },
     summary="Generate transcript and insights from YouTube video",
     description="Starts processing a YouTube video to extract transcript and insights"
 )
 async def generate_transcript_and_insights(
         request: CombinedRequest,
-        background_tasks: BackgroundTasks,
-        req: Request
+        req: Request,
+        response: Response,
+        idempotency_key_header: Optional[str] = Header(
+            None,
+            alias="Idempotency-Key",
+            max_length=255,
+            description="Client-chosen key; repeating it returns the original job instead of starting another"
+        )
 ):
     """
     Start processing a YouTube video to extract transcript and insights.
@@ -220,8 +614,14 @@ async def generate_transcript_and_insights(
     - **video_id**: YouTube video ID (optional if url is provided)
     - **url**: YouTube video URL (optional if video_id is provided)
     - **model**: AI model to use for insights (default: deepseek/deepseek-chat:free)
-
-    Returns a request ID that can be used to check processing status.
+    - **fallback_models**: Models to hedge or fail over to, in order
+    - **languages**: Caption languages in order of preference (default: TRANSCRIPT_LANGUAGES)
+    - **cancel_on_disconnect**: Cancel the job when its last WebSocket subscriber disconnects
+    - **Idempotency-Key** (header): Within IDEMPOTENCY_TTL, a repeated key returns the original
+      request ID and its current status without starting a job or counting against the rate limit
+
+    Returns a request ID that can be used to check processing status. When the job queue is
+    too long, uncached requests are rejected with 503 and a Retry-After header.
     """
     # Determine video_id from either direct input or URL
     video_id = request.video_id
@@ -236,8 +636,65 @@ async def generate_transcript_and_insights(
 
     # Generate request ID
     request_id = str(uuid.uuid4())
+    client = client_identity(req)
+    params = {
+        "video_id": video_id,
+        "model": request.model,
+        "fallback_models": request.fallback_models,
+        "languages": request.languages,
+        "cancel_on_disconnect": request.cancel_on_disconnect
+    }
+
+    if not idempotency_key_header:
+        status = await _enqueue(request_id, params, client)
+        # Only requests that started a job count towards trending (not shed ones or replays)
+        trending_tracker.record(video_id, client, request.model)
+        return status
+
+    # SET NX decides which of concurrent requests with the same key (on any worker) starts the job
+    redis = RedisService()
+    key = idempotency_key(client, idempotency_key_header)
+    record = {"request_id": request_id, "video_id": video_id, "model": request.model}
+    if await redis.set_if_absent(key, record, ttl=settings.IDEMPOTENCY_TTL) is False:
+        existing = await redis.get(key)
+        if existing:
+            return await _replay(redis, existing, params, response)
+
+    try:
+        status = await _enqueue(request_id, params, client)
+    except Exception:
+        # Shed or failed before the job was queued: a retry with the same key must be able to run
+        await redis.delete(key)
+        raise
+    trending_tracker.record(video_id, client, request.model)
+    return status
+
+
+async def _enqueue(request_id: str, params: Dict[str, Any], client: str) -> ProcessingStatusResponse:
+    """Admit a new or retried job, record its parameters and queue it"""
+    video_id = params["video_id"]
+    model = params["model"]
+
+    # Shed load before creating any state; cached and cheap jobs are always admitted
+    languages = TranscriptService.preferred_languages(params.get("languages"))
+    admission = await admission_controller.admit(video_id, model, client, languages[0])
+
+    queued_at = time.time()
     redis = RedisService()
 
+    # Parameters are kept so the job can be retried after a failure or a restart
+    await redis.set(job_key(request_id), {**params, "queued_at": queued_at}, ttl=86400)
+
+    # Expected run time, used to run a client's shorter jobs first (by caption size once known)
+    caption_bytes = eta_estimator.caption_size(video_id)
+    job_estimate = eta_estimator.remaining(FETCHING, model, caption_bytes=caption_bytes)
+    estimated_completion_time = eta_estimator.completion_time(
+        FETCHING,
+        model,
+        caption_bytes=caption_bytes,
+        queue_wait=admission["queue_wait"]
+    )
+
     # Set initial status
     await redis.set_status(
         request_id,
@@ -245,18 +702,26 @@ async def generate_transcript_and_insights(
             "status": "pending",
             "progress": 0,
             "message": "Request queued",
-            "estimated_completion_time": (datetime.utcnow() + timedelta(minutes=3)).isoformat(),
+            "estimated_completion_time": estimated_completion_time,
             "request_id": request_id
         }
     )
 
-    # Start background processing - THIS IS THE KEY PART
-    background_tasks.add_task(
+    job_registry.add(request_id, cancel_on_disconnect=params["cancel_on_disconnect"])
+
+    # Queue for the job pool (apart from the shared request threadpool), fairly across clients
+    job_scheduler.submit(
+        client,
+        request_id,
+        job_estimate,
         process_video,
         request_id,
         video_id,
-        request.model,
-        redis
+        model,
+        redis,
+        queued_at,
+        params["fallback_models"],
+        params.get("languages")
     )
 
     # Return status response IMMEDIATELY without waiting for processing
@@ -265,7 +730,8 @@ async def generate_transcript_and_insights(
         progress=0,
         message="Your request is being processed. Check status endpoint for updates.",
         request_id=request_id,
-        estimated_completion_time=(datetime.utcnow() + timedelta(minutes=3)).isoformat()
+        estimated_completion_time=estimated_completion_time,
+        **(job_scheduler.position(request_id) or {})
     )
 
 
@@ -296,10 +762,11 @@ async def get_processing_result(request_id: str, include_partial: bool = True):
     - **request_id**: The ID of the request to get results for
     - **include_partial**: If True, return partial results when available
     """
+    job_registry.mark_result_requested(request_id)
     redis = RedisService()
 
     # Check if result exists
-    result = await redis.get(f"result:{request_id}", decompress=True)
+    result = await redis.get(f"result:{request_id}", decompress=True, local=is_final_result)
     if result:
         # If we have a result with insights or user wants partial results
         if result.get("insights") or include_partial:
@@ -320,6 +787,53 @@ async def get_processing_result(request_id: str, include_partial: bool = True):
     )
 
 
+@router.get(
+    "/result/{request_id}/stream",
+    responses={
+        200: {"content": {"application/json": {}}, "description": "The stored result, streamed"},
+        404: {"model": ErrorResponse},
+        202: {"model": ProcessingStatusResponse},
+        503: {"model": ErrorResponse}
+    },
+    summary="Stream processing result",
+    description="Stream the stored result of a processed YouTube video as it is read from storage"
+)
+async def stream_processing_result(request_id: str):
+    """
+    Stream the stored result JSON of a processed YouTube video. Large results are stored in
+    chunks; they are sent as they are read instead of after the whole result is assembled.
+
+    - **request_id**: The ID of the request to stream results for
+    """
+    job_registry.mark_result_requested(request_id)
+    redis = RedisService()
+
+    try:
+        body = await redis.stream(f"result:{request_id}", decompress=True)
+    except ChunkedValueError as e:
+        print(f"Incomplete result for {request_id}: {str(e)}")
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The stored result is incomplete. Try again later."
+        )
+    if body is not None:
+        return StreamingResponse(body, media_type="application/json")
+
+    # Check status
+    status = await redis.get_status(request_id)
+    if status.get("status") == "not_found":
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Request not found"
+        )
+
+    # Return 202 Accepted with status
+    raise HTTPException(
+        status_code=http_status.HTTP_202_ACCEPTED,
+        detail=status
+    )
+
+
 @router.get(
     "/transcript/{request_id}",
     response_model=TranscriptResponse,
@@ -336,10 +850,11 @@ async def get_transcript_only(request_id: str):
 
     - **request_id**: The ID of the request to get transcript for
     """
+    job_registry.mark_result_requested(request_id)
     redis = RedisService()
 
     # Check if result exists
-    result = await redis.get(f"result:{request_id}", decompress=True)
+    result = await redis.get(f"result:{request_id}", decompress=True, local=is_final_result)
     if result and result.get("transcript"):
         return TranscriptResponse(
             video_id=result["video_id"],
@@ -366,3 +881,85 @@ async def get_transcript_only(request_id: str):
         status_code=http_status.HTTP_202_ACCEPTED,
         detail=status
     )
+
+
+@router.delete(
+    "/{request_id}",
+    response_model=ProcessingStatusResponse,
+    responses={
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse}
+    },
+    summary="Cancel processing",
+    description="Cancel a pending or running YouTube video job"
+)
+async def cancel_processing(request_id: str):
+    """
+    Cancel a pending or running job. The in-flight stage is stopped and the status is set to
+    cancelled; the transcript is kept if it was already fetched.
+
+    - **request_id**: The ID of the request to cancel
+    """
+    redis = RedisService()
+    status = await redis.get_status(request_id)
+    if status.get("status") == "not_found":
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Request not found"
+        )
+    if status.get("status") in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail=f"Request already {status['status']}"
+        )
+
+    return ProcessingStatusResponse(**await cancel_job(request_id, "Cancelled by the client"))
+
+
+@router.post(
+    "/{request_id}/retry",
+    response_model=ProcessingStatusResponse,
+    responses={
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
+    },
+    summary="Retry processing",
+    description="Resume a failed, timed out, cancelled or partially successful job from its last checkpoint"
+)
+async def retry_processing(request_id: str, req: Request):
+    """
+    Resume a job under the same request ID. Completed stages are restored from their
+    checkpoints, so a partial_success job only re-runs the insights stage.
+
+    Jobs left pending or processing by a restarted worker can be retried once their
+    deadline (REQUEST_TIMEOUT) has passed.
+
+    - **request_id**: The ID of the request to retry
+    """
+    redis = RedisService()
+    params = await redis.get(job_key(request_id))
+    status = await redis.get_status(request_id)
+    if not params or status.get("status") == "not_found":
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Request not found"
+        )
+    if isinstance(params, str):
+        params = json.loads(params)
+
+    # An unfinished job is orphaned once its deadline has passed and it is not queued here
+    orphaned = (
+        status["status"] not in TERMINAL_STATUSES
+        and time.time() - params["queued_at"] > settings.REQUEST_TIMEOUT
+        and job_scheduler.position(request_id) is None
+    )
+    if status["status"] not in RETRYABLE_STATUSES and not orphaned:
+        raise HTTPException(
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail=f"Request is {status['status']}"
+        )
+
+    await redis.delete(cancel_key(request_id))
+    params.pop("queued_at", None)
+    return await _enqueue(request_id, params, client_identity(req))
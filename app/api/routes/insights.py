@@ -19,6 +19,7 @@ async def generate_insights(request: InsightsRequest):
 
     - **text**: Text to analyze
     - **model**: AI model to use (default: deepseek/deepseek-chat:free)
+    - **fallback_models**: Models to hedge or fail over to, in order
     """
-    insights = await InsightsService.get_insights(request.text, request.model)
+    insights = await InsightsService.get_insights(request.text, request.model, request.fallback_models)
     return InsightsResponse(insights=insights)
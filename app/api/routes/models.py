@@ -0,0 +1,19 @@
+# app/api/routes/models.py
+from fastapi import APIRouter
+
+from app.services.llm_control import llm_limiter
+from app.services.model_router import leaderboard
+
+router = APIRouter()
+
+
+@router.get("/leaderboard")
+async def get_model_leaderboard():
+    """
+    Compare models by live telemetry: time to first token, tokens per second,
+    error rate, token usage and cost over the rolling window.
+    """
+    return {
+        "models": leaderboard(),
+        "concurrency": llm_limiter.snapshot()
+    }
@@ -0,0 +1,44 @@
+# app/api/routes/search.py
+import time
+
+from fastapi import APIRouter, Query
+
+from app.models.schemas import SearchHit, SearchResponse
+from app.services.search_index import search_index
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=SearchResponse,
+    summary="Search processed videos",
+    description="Full-text search over the transcripts and insights of processed videos"
+)
+async def search_videos(
+        q: str = Query(..., min_length=1, max_length=500, description="Search query"),
+        limit: int = Query(10, ge=1, le=100, description="Maximum number of results")
+):
+    """
+    Search the transcripts and insights of processed videos, ranked by BM25. Each hit links
+    to the caption segment where most query terms occur.
+
+    - **q**: Search query
+    - **limit**: Maximum number of results
+    """
+    start = time.perf_counter()
+    hits = search_index.search(q, limit)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    return SearchResponse(
+        query=q,
+        results=[
+            SearchHit(
+                **hit,
+                url=f"https://www.youtube.com/watch?v={hit['video_id']}"
+                    + (f"&t={int(hit['start'])}s" if hit["start"] is not None else "")
+            )
+            for hit in hits
+        ],
+        took_ms=round(took_ms, 3)
+    )
@@ -3,6 +3,7 @@ from typing import Dict, Any
 import uuid
 
 from app.models.schemas import ProcessingStatusResponse, ErrorResponse
+from app.services.job_scheduler import job_scheduler
 from app.services.redis_service import RedisService
 
 router = APIRouter()
@@ -30,4 +31,9 @@ async def check_status(request_id: str):
             detail="Request not found"
         )
 
+    # Queue positions change with every dispatch, so they are read live for jobs queued here
+    position = job_scheduler.position(request_id)
+    if position:
+        status.update(position)
+
     return ProcessingStatusResponse(**status)
\ No newline at end of file
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from typing import Dict, Any, List, Optional
 
-from app.models.schemas import TranscriptRequest, TranscriptResponse, ErrorResponse
+from app.models.schemas import TranscriptRequest, TranscriptResponse, ErrorResponse, MultiTranscriptRequest, \
+    MultiTranscriptResponse, CaptionTracksResponse, LANGUAGES_DESCRIPTION, check_languages
+from app.services.job_scheduler import client_identity
 from app.services.transcript_service import TranscriptService
+from app.services.trending_service import trending_tracker
 from app.utils.validators import extract_youtube_id, validate_youtube_id
 from app.core.exceptions import YouTubeTranscriptError
 
 router = APIRouter()
 
 
+async def _preferred_transcript(video_id: str, languages: Optional[List[str]]) -> TranscriptResponse:
+    transcript_items, language, _ = await TranscriptService.get_preferred_items(video_id, languages)
+    return TranscriptResponse(
+        video_id=video_id,
+        transcript=TranscriptService.join_transcript(transcript_items),
+        language=language
+    )
+
+
 @router.post(
     "/",
     response_model=TranscriptResponse,
@@ -16,17 +28,18 @@ router = APIRouter()
     summary="Generate transcript from YouTube video",
     description="Extracts transcript text from a YouTube video using its ID"
 )
-async def generate_transcript(request: TranscriptRequest):
+async def generate_transcript(request: TranscriptRequest, req: Request):
     """
     Generate transcript from a YouTube video.
 
     - **video_id**: YouTube video ID (the part after v= in the URL)
+    - **languages**: Caption languages in order of preference
     """
     if not validate_youtube_id(request.video_id):
         raise YouTubeTranscriptError("Invalid YouTube video ID format")
 
-    transcript = await TranscriptService.get_transcript(request.video_id)
-    return TranscriptResponse(video_id=request.video_id, transcript=transcript)
+    trending_tracker.record(request.video_id, client_identity(req))
+    return await _preferred_transcript(request.video_id, request.languages)
 
 
 @router.get(
@@ -37,16 +50,77 @@ async def generate_transcript(request: TranscriptRequest):
     description="Extracts transcript text from a YouTube video using its URL"
 )
 async def generate_transcript_from_url(
-        url: str = Query(..., description="YouTube video URL")
+        req: Request,
+        url: str = Query(..., description="YouTube video URL"),
+        languages: Optional[List[str]] = Query(None, max_length=10, description=LANGUAGES_DESCRIPTION)
 ):
     """
     Generate transcript from a YouTube video URL.
 
     - **url**: Full YouTube video URL
+    - **languages**: Caption languages in order of preference (repeat the parameter)
     """
     video_id = extract_youtube_id(url)
     if not video_id:
         raise YouTubeTranscriptError("Could not extract a valid YouTube video ID from the URL")
+    try:
+        check_languages(languages)
+    except ValueError as e:
+        raise YouTubeTranscriptError(str(e))
+
+    trending_tracker.record(video_id, client_identity(req))
+    return await _preferred_transcript(video_id, languages)
+
+
+@router.post(
+    "/multi",
+    response_model=MultiTranscriptResponse,
+    responses={400: {"model": ErrorResponse}},
+    summary="Generate transcripts in several languages",
+    description="Extracts the transcripts of several caption languages of a YouTube video at once"
+)
+async def generate_transcripts(request: MultiTranscriptRequest, req: Request):
+    """
+    Generate transcripts of a YouTube video in several languages. The caption tracks are
+    downloaded concurrently, using one caption-track manifest of the video.
+
+    - **video_id**: YouTube video ID
+    - **languages**: Caption languages to fetch; languages the video has no captions in are
+      listed in missing
+    """
+    if not validate_youtube_id(request.video_id):
+        raise YouTubeTranscriptError("Invalid YouTube video ID format")
+
+    trending_tracker.record(request.video_id, client_identity(req))
+    transcripts, missing = await TranscriptService.get_transcripts(request.video_id, request.languages)
+    return MultiTranscriptResponse(
+        video_id=request.video_id,
+        transcripts={
+            lang: TranscriptService.join_transcript(transcript_items)
+            for lang, transcript_items in transcripts.items()
+        },
+        missing=missing
+    )
+
+
+@router.get(
+    "/tracks",
+    response_model=CaptionTracksResponse,
+    responses={400: {"model": ErrorResponse}},
+    summary="List caption tracks",
+    description="Lists the caption languages of a YouTube video"
+)
+async def list_caption_tracks(
+        video_id: str = Query(..., description="YouTube video ID")
+):
+    """
+    List the caption tracks of a YouTube video, from the cached caption-track manifest when
+    the video was requested before.
+
+    - **video_id**: YouTube video ID
+    """
+    if not validate_youtube_id(video_id):
+        raise YouTubeTranscriptError("Invalid YouTube video ID format")
 
-    transcript = await TranscriptService.get_transcript(video_id)
-    return TranscriptResponse(video_id=video_id, transcript=transcript)
\ No newline at end of file
+    manifest, _ = await TranscriptService.get_manifest(video_id)
+    return CaptionTracksResponse(video_id=video_id, title=manifest["title"], tracks=manifest["tracks"])
\ No newline at end of file
@@ -1,8 +1,11 @@
 # app/api/routes/websocket.py
-from typing import Dict, List
+import asyncio
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.services.job_registry import job_registry
+
 router = APIRouter()
 
 
@@ -10,8 +13,11 @@ router = APIRouter()
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Loop the connections belong to; jobs publish from their own loops
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(self, websocket: WebSocket, request_id: str):
+        self.loop = asyncio.get_running_loop()
         await websocket.accept()
         if request_id not in self.active_connections:
             self.active_connections[request_id] = []
@@ -37,14 +43,26 @@ class ConnectionManager:
             for connection in disconnected:
                 self.disconnect(connection, request_id)
 
+    def publish(self, request_id: str, data: dict):
+        """Send an update from any thread or event loop without waiting for it"""
+        if request_id not in self.active_connections or self.loop is None or self.loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is self.loop:
+                asyncio.create_task(self.send_update(request_id, data))
+                return
+        except RuntimeError:
+            pass
+        asyncio.run_coroutine_threadsafe(self.send_update(request_id, data), self.loop)
+
 
 manager = ConnectionManager()
 
 
 @router.websocket("/ws/{request_id}")
 async def websocket_endpoint(websocket: WebSocket, request_id: str):
-    # Accept the connection
-    await websocket.accept()
+    # Accept the connection and subscribe to status updates
+    await manager.connect(websocket, request_id)
     print(f"WebSocket connection accepted for request_id: {request_id}")
 
     try:
@@ -88,3 +106,9 @@ async def websocket_endpoint(websocket: WebSocket, request_id: str):
         print(f"Error type: {type(e)}")
         import traceback
         print(traceback.format_exc())
+    finally:
+        manager.disconnect(websocket, request_id)
+        if request_id not in manager.active_connections and job_registry.cancel_on_disconnect(request_id):
+            # Nobody is waiting for this job any more
+            from app.api.routes.combined import cancel_job
+            await cancel_job(request_id, "Cancelled after the last subscriber disconnected")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -15,17 +15,149 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str
     OPENROUTER_SITE_URL: Optional[str] = None
     OPENROUTER_SITE_NAME: Optional[str] = "YouTube Insights"
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
 
-    # Upstash Redis Configuration
-    UPSTASH_REDIS_URL: str
-    UPSTASH_REDIS_TOKEN: str
+    # LLM hedging / failover
+    LLM_FALLBACK_MODELS: List[str] = []  # Models tried after the requested one, in order (JSON list)
+    LLM_HEDGE_DELAY: float = 10.0  # Seconds to wait for a first token before hedging, until p95 data exists
+    LLM_HEDGE_MIN_DELAY: float = 1.0  # Lower bound for the p95-based hedge delay
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # First-token samples needed before using the model's p95
+
+    LLM_DEADLINE: float = 120.0  # Seconds all LLM attempts together may take
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 60.0  # Max seconds between two chunks of a streamed answer
+
+    # Local extractive insights ("local/extractive" model and fallback when every LLM fails)
+    EXTRACTIVE_FALLBACK: bool = True
+    EXTRACTIVE_MAX_POINTS: int = 8  # Key sentences returned
+
+    # LLM adaptive concurrency limit (AIMD) and per-model circuit breakers
+    LLM_CONCURRENCY_INITIAL: int = 8
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 64
+    LLM_LIMIT_BACKOFF: float = 0.7  # Multiplicative decrease on 429/5xx/connection errors
+    LLM_LATENCY_TOLERANCE: float = 2.0  # Back off when first token takes this many times the no-load baseline
+    LLM_QUEUE_TIMEOUT: float = 60.0  # Max seconds a request waits for a concurrency slot
+    LLM_BREAKER_CONSECUTIVE_FAILURES: int = 5
+    LLM_BREAKER_WINDOW: int = 20  # Calls in the rolling error-rate window
+    LLM_BREAKER_ERROR_RATE: float = 0.5  # Error rate over the full window that opens the breaker
+    LLM_BREAKER_COOLDOWN: float = 30.0  # Seconds open before a half-open probe
+
+    # Model telemetry and "auto" routing
+    MODEL_TELEMETRY_WINDOW: int = 900  # Seconds of per-model call history kept
+    MODEL_TELEMETRY_MAX_SAMPLES: int = 500  # Calls kept per model
+    MODEL_ROUTER_CANDIDATES: List[str] = [
+        "deepseek/deepseek-chat:free",
+        "google/gemini-2.0-flash-exp:free",
+        "meta-llama/llama-3.3-70b-instruct:free",
+        "mistralai/mistral-small-3.1-24b-instruct:free",
+    ]
+    MODEL_ROUTER_COMPLETION_TOKENS: int = 1024  # Expected answer size used for routing and context fit
+    MODEL_ROUTER_MAX_ERROR_RATE: float = 0.5  # Models above this rolling error rate count as unhealthy
+    MODEL_CATALOG_TTL: int = 3600  # Seconds between refreshes of the OpenRouter model list
+    MODEL_CONTEXT_LENGTHS: Dict[str, int] = {}  # Overrides for context lengths (JSON object)
+    DEFAULT_CONTEXT_LENGTH: int = 32768  # Used for models missing from the catalog
+
+    # Transcript normalization before the LLM (the raw transcript is kept for the transcript endpoints)
+    NORMALIZE_TRANSCRIPT: bool = True
+    NORMALIZE_DROP_FILLERS: bool = False  # Also drop filler words (um, uh, ...)
+    NORMALIZE_MIN_OVERLAP: int = 2  # Fewest repeated words treated as a rolling caption overlap
+
+    # YouTube Configuration (overridable so benchmarks can point at local stubs)
+    YOUTUBE_BASE_URL: str = "https://www.youtube.com"
+    YOUTUBE_TIMEOUT: float = 15.0  # Seconds per YouTube request
+    # Caption languages in order of preference when a request names none ("*" for any track, JSON list)
+    TRANSCRIPT_LANGUAGES: List[str] = ["en"]
+
+    # Storage backend: "upstash" (REST), "redis" (standard protocol) or "memory" (in-process)
+    STORAGE_BACKEND: str = "upstash"
+    STORAGE_TIMEOUT: float = 5.0  # Seconds per storage operation
+    STORAGE_CHUNK_SIZE: int = 262144  # Characters; larger stored values are split into chunks (0 disables)
+    STORAGE_CHUNK_BATCH: int = 3  # Chunks per pipelined write or MGET read (keeps REST bodies under 1 MB)
+    # Seconds a job's status and result writes are buffered, coalesced and pipelined (0 writes through)
+    WRITE_BEHIND_DELAY: float = 0.3
+
+    # Upstash Redis Configuration (STORAGE_BACKEND=upstash)
+    UPSTASH_REDIS_URL: Optional[str] = None
+    UPSTASH_REDIS_TOKEN: Optional[str] = None
+
+    # Redis protocol Configuration (STORAGE_BACKEND=redis)
+    REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0
+    REDIS_MAX_CONNECTIONS: int = 20
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 10  # Requests per hour per IP
 
-    # Request Timeout (seconds)
+    # Seconds an Idempotency-Key of POST /combined maps to its original job
+    IDEMPOTENCY_TTL: int = 86400
+
+    # Worker pools per I/O class (CPU_WORKERS defaults to the number of CPUs)
+    JOB_WORKERS: int = 16  # Combined jobs running at once; more wait in the job queue
+    YOUTUBE_WORKERS: int = 8
+    STORAGE_WORKERS: int = 16
+    CPU_WORKERS: Optional[int] = None
+
+    # Optional process pool for caption parsing and (de)compression of large payloads
+    CPU_PROCESS_POOL: bool = False
+    CPU_PROCESS_WORKERS: Optional[int] = None  # Defaults to the number of CPUs
+    CPU_PROCESS_THRESHOLD: int = 262144  # Characters; smaller payloads are processed inline
+
+    # Fair-share job scheduling across clients (client identity: "ip:<address>")
+    SCHEDULER_AGING: float = 1.0  # Seconds of estimated run time forgiven per second a job waits
+    SCHEDULER_CLIENT_WEIGHTS: Dict[str, int] = {}  # Jobs per round-robin turn by client identity (JSON object)
+
+    # Admission control: predicted queue wait (seconds) above which new uncached LLM jobs get 503 (0 disables)
+    ADMISSION_MAX_WAIT: float = 120.0
+
+    # Seconds fetched caption segments are cached per video and language (0 disables)
+    TRANSCRIPT_CACHE_TTL: int = 86400
+    # Seconds the caption-track manifest of a video (track URLs and languages) is cached (0 disables); caption URLs
+    # are signed and expire after a few hours, and a stale manifest is refreshed when its URL fails
+    CAPTION_MANIFEST_TTL: int = 3600
+
+    # Seconds the normalized transcript and insights of a video are checkpointed for resumed jobs (0 disables)
+    CHECKPOINT_TTL: int = 86400
+
+    # Full-text search index over processed videos, snapshotted per worker next to SEARCH_INDEX_PATH (empty disables
+    # snapshots); the workers merge each other's snapshots every SEARCH_INDEX_SAVE_INTERVAL seconds
+    SEARCH_INDEX_PATH: Optional[str] = "search_index.pkl"
+    SEARCH_INDEX_SAVE_INTERVAL: float = 60.0  # Seconds between snapshots and merges of the in-process indexes
+
+    # Estimated transcript similarity above which a video reuses the insights of an already processed one (0 disables)
+    DUPLICATE_THRESHOLD: float = 0.85
+    # The MinHash index is snapshotted per worker next to DUPLICATE_INDEX_PATH (empty disables snapshots)
+    DUPLICATE_INDEX_PATH: Optional[str] = "duplicate_index.pkl"
+
+    # Node-local SQLite cache of transcripts, checkpoints and final results in front of the store (empty disables)
+    DISK_CACHE_PATH: Optional[str] = None
+    DISK_CACHE_MAX_BYTES: int = 1 << 30  # Least recently read entries are evicted above this size
+    DISK_CACHE_TTL: int = 3600  # Seconds values read from or written to the store are kept locally at most
+
+    # Most requested videos tracked per worker (Count-Min sketch plus top-K) and the half-life of their counts
+    TRENDING_TOP_K: int = 100
+    TRENDING_HALF_LIFE: float = 3600.0
+    # Cache prefetch of trending videos: seconds between runs (0 disables), videos per run, the decayed request count
+    # a video needs, and how many seconds before expiry its transcript and checkpoints are refreshed
+    PREFETCH_INTERVAL: float = 300.0
+    PREFETCH_TOP_K: int = 10
+    PREFETCH_MIN_REQUESTS: float = 3.0
+    PREFETCH_MARGIN: int = 3600
+    PREFETCH_INSIGHTS: bool = True  # Also refresh insights checkpoints (costs LLM calls)
+
+    # Weight of the newest observation in the per-stage timings behind estimated_completion_time
+    ETA_ALPHA: float = 0.2
+
+    # Seconds between checks for a cancel request made through another worker while a stage runs (0 disables; such
+    # requests are also checked before each stage and before the result is stored). Costs a storage read per interval
+    CANCEL_POLL_INTERVAL: float = 15.0
+
+    # Request Timeout (seconds): deadline of a combined job, counted from when it was queued
     REQUEST_TIMEOUT: int = 300  # 5 minutes
 
+    # Profiling
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of combined jobs to CPU-profile (0 disables)
+    PROFILE_DIR: str = "profiles"  # Where sampled .prof files are written
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
 
 
@@ -19,6 +21,24 @@ class AIModelError(HTTPException):
         )
 
 
+class AIUpstreamError(AIModelError):
+    """The AI provider was unreachable, rate limited us or failed (429, 5xx, connection errors)"""
+    pass
+
+
+class AIServiceUnavailableError(AIModelError):
+    def __init__(self, detail: str, retry_after: Optional[int] = None):
+        headers = {"X-Error-Code": "ai_service_unavailable"}
+        if retry_after:
+            headers["Retry-After"] = str(retry_after)
+        HTTPException.__init__(
+            self,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers=headers
+        )
+
+
 class RateLimitExceededError(HTTPException):
     def __init__(self, detail: str = "Rate limit exceeded. Try again later."):
         super().__init__(
@@ -28,6 +48,17 @@ class RateLimitExceededError(HTTPException):
         )
 
 
+class ServiceOverloadedError(HTTPException):
+    """The job queue is too long for a new job to finish in useful time"""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"X-Error-Code": "service_overloaded", "Retry-After": str(retry_after)}
+        )
+
+
 class ProcessingError(HTTPException):
     def __init__(self, detail: str):
         super().__init__(
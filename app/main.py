@@ -10,11 +10,37 @@ from app.core.config import settings
 from app.middleware.logging import logging_middleware
 from app.middleware.rate_limit import rate_limit_middleware
 
+# Create a lifespan context manager
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: Initialize services, background tasks, etc.
+    # Import here to avoid circular imports
+    from app.services.duplicate_index import load_duplicate_index
+    from app.services.search_index import load_search_index
+    from app.tasks.scheduled import save_indexes, schedule_tasks
+    load_search_index()
+    load_duplicate_index()
+    # Start scheduled tasks in the background
+    task = asyncio.create_task(schedule_tasks())
+
+    yield  # This is where the application runs
+
+    # Shutdown: Clean up resources
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        # Task was cancelled, which is expected
+        pass
+    save_indexes()
+
+
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # CORS middleware with environment-based configuration
@@ -60,29 +86,6 @@ app.add_middleware(BaseHTTPMiddleware, dispatch=logging_middleware)
 app.include_router(api_router, prefix="/api/v1")
 
 
-# Create the scheduled tasks module (app/tasks/scheduled.py)
-# with the code from Step 3 in the previous response
-
-# Create a lifespan context manager
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Initialize services, background tasks, etc.
-    # Import here to avoid circular imports
-    from app.tasks.scheduled import schedule_tasks
-    # Start scheduled tasks in the background
-    task = asyncio.create_task(schedule_tasks())
-
-    yield  # This is where the application runs
-
-    # Shutdown: Clean up resources
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        # Task was cancelled, which is expected
-        pass
-
-
 @app.get("/", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
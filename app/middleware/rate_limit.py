@@ -1,15 +1,20 @@
 import json
 import logging
+import re
 from datetime import datetime
 
 from fastapi import Request, Response
 
 from app.core.config import settings
+from app.services.job_scheduler import client_identity, idempotency_key
 from app.services.redis_service import RedisService
 
 # Set up logger
 logger = logging.getLogger("rate_limit_middleware")
 
+# Retrying a job re-runs its pipeline, so retries count against the same limit as new jobs
+RE_RETRY_PATH = re.compile(r"^/api/v1/combined/[^/]+/retry$")
+
 
 async def rate_limit_middleware(request: Request, call_next):
     """Middleware to implement sliding window rate limiting (full hour from each request)"""
@@ -39,7 +44,7 @@ async def rate_limit_middleware(request: Request, call_next):
     should_rate_limit = (
             not is_excluded and
             request.method == "POST" and
-            any(normalized_path == path for path in rate_limited_paths)
+            (any(normalized_path == path for path in rate_limited_paths) or RE_RETRY_PATH.match(normalized_path))
     )
 
     # Get client IP
@@ -48,6 +53,12 @@ async def rate_limit_middleware(request: Request, call_next):
     # Initialize Redis
     redis = RedisService()
 
+    # A repeated Idempotency-Key only returns the original job's status
+    idempotency_header = request.headers.get("Idempotency-Key")
+    if should_rate_limit and idempotency_header:
+        if await redis.exists(idempotency_key(client_identity(request), idempotency_header)):
+            should_rate_limit = False
+
     # Create rate limit key
     rate_limit_key = f"ratelimit:{client_ip}"
 
@@ -92,6 +103,18 @@ async def rate_limit_middleware(request: Request, call_next):
     # Process the request
     response = await call_next(request)
 
+    # A request shed by admission control, replayed through its Idempotency-Key or a rejected
+    # retry started no job, so it does not count against the limit
+    if should_rate_limit and (
+            response.headers.get("X-Error-Code") == "service_overloaded"
+            or response.headers.get("Idempotent-Replayed") == "true"
+            or (RE_RETRY_PATH.match(normalized_path) and response.status_code >= 400)
+    ):
+        try:
+            current_count = await redis.increment(rate_limit_key, -1)
+        except Exception as e:
+            logger.error(f"Error refunding rate limit: {str(e)}")
+
     # Add rate limit headers to all responses
     remaining = max(0, settings.RATE_LIMIT_REQUESTS - current_count)
     response.headers["X-RateLimit-Limit"] = str(settings.RATE_LIMIT_REQUESTS)
@@ -1,20 +1,69 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.utils.validators import validate_language_code
+
+LANGUAGES_DESCRIPTION = "Caption languages in order of preference, e.g. [\"de\", \"en\"] (\"*\" for any); " \
+                        "manual captions are preferred over auto-generated ones (defaults to the server configuration)"
+
+
+def check_languages(languages: Optional[List[str]]) -> Optional[List[str]]:
+    """Validate a list of caption language codes"""
+    for lang in languages or []:
+        if not validate_language_code(lang):
+            raise ValueError(f"Invalid language code: {lang}")
+    return languages
 
 
 class TranscriptRequest(BaseModel):
     video_id: str = Field(..., description="YouTube video ID")
+    languages: Optional[List[str]] = Field(None, min_length=1, max_length=10, description=LANGUAGES_DESCRIPTION)
+
+    _check_languages = field_validator("languages")(check_languages)
 
 
 class TranscriptResponse(BaseModel):
     video_id: str
     transcript: str
+    language: Optional[str] = Field(None, description="Language code of the caption track")
+
+
+class MultiTranscriptRequest(BaseModel):
+    video_id: str = Field(..., description="YouTube video ID")
+    languages: List[str] = Field(..., min_length=1, max_length=10, description="Caption languages to fetch")
+
+    _check_languages = field_validator("languages")(check_languages)
+
+
+class MultiTranscriptResponse(BaseModel):
+    video_id: str
+    transcripts: Dict[str, str] = Field(..., description="Transcript per requested language the video has")
+    missing: List[str] = Field(default_factory=list, description="Requested languages the video has no captions in")
+
+
+class CaptionTrack(BaseModel):
+    language_code: str = Field(..., description="Language code of the track")
+    name: str = Field(..., description="Display name of the track")
+    auto_generated: bool = Field(..., description="Whether the captions were generated by speech recognition")
+
+
+class CaptionTracksResponse(BaseModel):
+    video_id: str
+    title: str = Field(..., description="Video title")
+    tracks: List[CaptionTrack] = Field(..., description="Caption tracks of the video")
 
 
 class InsightsRequest(BaseModel):
     text: str = Field(..., description="Text to extract insights from")
-    model: Optional[str] = Field("deepseek/deepseek-chat:free", description="AI model to use")
+    model: Optional[str] = Field(
+        "deepseek/deepseek-chat:free",
+        description="AI model to use, or \"local/extractive\" for local extractive insights without an LLM"
+    )
+    fallback_models: Optional[List[str]] = Field(
+        None,
+        description="Models to hedge or fail over to, in order (defaults to the server configuration)"
+    )
 
 
 class InsightsResponse(BaseModel):
@@ -24,7 +73,22 @@ class InsightsResponse(BaseModel):
 class CombinedRequest(BaseModel):
     video_id: Optional[str] = Field(None, description="YouTube video ID")
     url: Optional[str] = Field(None, description="YouTube video URL")
-    model: Optional[str] = Field("deepseek/deepseek-chat:free", description="AI model to use")
+    model: Optional[str] = Field(
+        "deepseek/deepseek-chat:free",
+        description="AI model to use, \"auto\" for the fastest healthy model that fits the transcript, or "
+                    "\"local/extractive\" for local extractive insights without an LLM"
+    )
+    fallback_models: Optional[List[str]] = Field(
+        None,
+        description="Models to hedge or fail over to, in order (defaults to the server configuration)"
+    )
+    languages: Optional[List[str]] = Field(None, min_length=1, max_length=10, description=LANGUAGES_DESCRIPTION)
+    cancel_on_disconnect: bool = Field(
+        False,
+        description="Cancel the job when its last WebSocket subscriber disconnects before the result is requested"
+    )
+
+    _check_languages = field_validator("languages")(check_languages)
 
     @model_validator(mode='after')
     def check_video_source(self):
@@ -39,10 +103,44 @@ class CombinedResponse(BaseModel):
     transcript: str = Field(..., description="Video transcript")
     insights: Optional[str] = Field(None, description="AI-generated insights about the video")
     processing_time: Optional[float] = Field(None, description="Processing time in seconds")
+    model_used: Optional[str] = Field(None, description="Model whose answer was used for the insights")
+    llm_attempts: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Every model request made for the insights, with its outcome and latency"
+    )
+    fallback_reason: Optional[str] = Field(
+        None,
+        description="Why the insights came from the local extractive engine instead of the requested model"
+    )
+    language: Optional[str] = Field(None, description="Language code of the caption track the transcript is from")
+    duplicate_of: Optional[str] = Field(
+        None,
+        description="Already processed video whose insights were reused because its transcript is nearly identical"
+    )
+    duplicate_similarity: Optional[float] = Field(
+        None,
+        description="Estimated Jaccard similarity (0.0 to 1.0) of the transcript to that of duplicate_of"
+    )
+    normalization: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Estimated transcript tokens before and after normalization and the reduction ratio"
+    )
+    resumed_stages: Optional[List[str]] = Field(
+        None,
+        description="Stages restored from checkpoints instead of re-run (transcript, normalized, insights)"
+    )
+    timings: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Per-stage span timeline of the job (queue wait, YouTube fetch, parse, Redis writes, LLM call)"
+    )
 
 
 class ProcessingStatusResponse(BaseModel):
-    status: str = Field(..., description="Status of the request: pending, processing, completed, failed")
+    status: str = Field(
+        ...,
+        description="Status of the request: pending, processing, completed, partial_success, failed, timed_out, "
+                    "cancelled"
+    )
     progress: float = Field(..., description="Progress from 0.0 to 1.0")
     message: str = Field(..., description="Status message")
     request_id: Optional[str] = Field(None, description="Request ID")
@@ -50,8 +148,30 @@ class ProcessingStatusResponse(BaseModel):
     error: Optional[str] = Field(None, description="Error message if status is failed")
     transcript: Optional[str] = Field(None, description="Transcript if available")
     insights: Optional[str] = Field(None, description="Insights if available")
+    model_used: Optional[str] = Field(None, description="Model whose answer was used for the insights")
+    queue_position: Optional[int] = Field(None, description="Position among all queued jobs while pending")
+    client_queue_position: Optional[int] = Field(
+        None, description="Position among the same client's queued jobs while pending"
+    )
 
 
 class ErrorResponse(BaseModel):
     detail: str
     error_code: Optional[str] = None
+
+
+class SearchHit(BaseModel):
+    video_id: str = Field(..., description="YouTube video ID")
+    request_id: str = Field(..., description="Request ID of the job that processed the video")
+    score: float = Field(..., description="BM25 relevance score")
+    start: Optional[float] = Field(
+        None, description="Start in seconds of the caption segment matching most query terms"
+    )
+    url: str = Field(..., description="Link to the video at the matching segment")
+    matched_terms: List[str] = Field(..., description="Query terms found in the video")
+
+
+class SearchResponse(BaseModel):
+    query: str = Field(..., description="The search query")
+    results: List[SearchHit] = Field(..., description="Matching videos, best first")
+    took_ms: float = Field(..., description="Time spent searching in milliseconds")
@@ -0,0 +1,86 @@
+# app/services/admission_service.py
+import math
+import threading
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.services.eta_service import eta_estimator
+from app.services.executors import job_executor
+from app.services.extractive_service import EXTRACTIVE_MODEL
+from app.services.job_scheduler import job_scheduler
+from app.services.transcript_service import TranscriptService
+
+# Priority classes of combined jobs
+PRIORITY_CACHED = "cached"  # Transcript already cached: no YouTube fetch
+PRIORITY_CHEAP = "cheap"  # Local extractive model: no LLM call
+PRIORITY_NORMAL = "normal"
+
+# Classes admitted however long the job queue is
+BYPASS_SHED = {PRIORITY_CACHED, PRIORITY_CHEAP}
+
+
+class AdmissionController:
+    """
+    Load shedding for POST /combined.
+
+    The wait a new job would see follows from the jobs the fair-share scheduler would start
+    before it and the observed job duration, so a client with a long queue of its own is
+    shed before others are. Above ADMISSION_MAX_WAIT, normal jobs are rejected with 503 and a
+    Retry-After of when the queue should have drained below the threshold. Jobs for
+    cached transcripts and local extractive jobs are cheap and always admitted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._admitted: Dict[str, int] = {}
+        self._shed = 0
+
+    @staticmethod
+    def predicted_wait(client: str) -> float:
+        """Seconds a job client submits now is expected to wait for a job worker"""
+        return eta_estimator.queue_wait(job_scheduler.jobs_ahead(client), job_executor.max_workers)
+
+    @staticmethod
+    async def priority(video_id: str, model: str, lang: str = "en") -> str:
+        if model == EXTRACTIVE_MODEL:
+            return PRIORITY_CHEAP
+        if await TranscriptService.is_cached(video_id, lang):
+            return PRIORITY_CACHED
+        return PRIORITY_NORMAL
+
+    async def admit(self, video_id: str, model: str, client: str, lang: str = "en") -> Dict[str, Any]:
+        """
+        Admit a job or raise ServiceOverloadedError.
+
+        Returns the job's priority class and predicted queue wait.
+        """
+        priority = await self.priority(video_id, model, lang)
+        wait = self.predicted_wait(client)
+
+        max_wait = settings.ADMISSION_MAX_WAIT
+        if max_wait > 0 and wait > max_wait and priority not in BYPASS_SHED:
+            with self._lock:
+                self._shed += 1
+            retry_after = max(1, math.ceil(wait - max_wait))
+            print(f"Shedding combined request: predicted wait {wait:.0f}s over {max_wait:g}s")
+            raise ServiceOverloadedError(
+                f"The service is busy (estimated wait {wait:.0f} seconds). "
+                f"Please retry in {retry_after} seconds.",
+                retry_after=retry_after
+            )
+
+        with self._lock:
+            self._admitted[priority] = self._admitted.get(priority, 0) + 1
+        return {"priority": priority, "queue_wait": wait}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_wait": settings.ADMISSION_MAX_WAIT,
+                "admitted": dict(self._admitted),
+                "shed": self._shed
+            }
+
+
+admission_controller = AdmissionController()
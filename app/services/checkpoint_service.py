@@ -0,0 +1,75 @@
+# app/services/checkpoint_service.py
+import hashlib
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.extractive_service import EXTRACTIVE_MODEL
+from app.services.redis_service import RedisService
+from app.utils.timing import span
+
+# Stages of a combined job that are checkpointed per video (the transcript checkpoint is the
+# transcript cache, see TranscriptService)
+TRANSCRIPT = "transcript"
+NORMALIZED = "normalized"
+INSIGHTS = "insights"
+
+
+def normalization_variant() -> str:
+    """Short hash of the normalization settings the normalized text (and the insights) depend on"""
+    normalization = (settings.NORMALIZE_TRANSCRIPT, settings.NORMALIZE_DROP_FILLERS, settings.NORMALIZE_MIN_OVERLAP)
+    return hashlib.blake2b(repr(normalization).encode(), digest_size=4).hexdigest()
+
+
+def normalized_key(video_id: str, lang: str = "en") -> str:
+    return f"checkpoint:{video_id}:{lang}:{NORMALIZED}:{normalization_variant()}"
+
+
+def insights_key(video_id: str, model: str, lang: str = "en") -> str:
+    # The insights were generated from the normalized text, so they are kept per variant as well
+    return f"checkpoint:{video_id}:{lang}:{INSIGHTS}:{normalization_variant()}:{model}"
+
+
+class CheckpointService:
+    """
+    Results of completed stages of combined jobs, so a retried job or a new job for the same
+    video resumes after the last completed stage instead of starting over. Checkpoints are kept
+    per caption language.
+    """
+
+    @staticmethod
+    async def _load(stage: str, key: str) -> Optional[Dict[str, Any]]:
+        if settings.CHECKPOINT_TTL <= 0:
+            return None
+        with span("checkpoint.load", stage=stage) as load_span:
+            value = await RedisService().get(key, decompress=True, local=True)
+            load_span.update(hit=bool(value))
+        return value or None
+
+    @staticmethod
+    async def _save(stage: str, key: str, value: Dict[str, Any]) -> None:
+        if settings.CHECKPOINT_TTL <= 0:
+            return
+        with span("checkpoint.save", stage=stage):
+            await RedisService().set(key, value, ttl=settings.CHECKPOINT_TTL, compress=True, local=True)
+
+    @staticmethod
+    async def get_normalized(video_id: str, lang: str = "en") -> Optional[Dict[str, Any]]:
+        """normalize_transcript result ({text, stats}) of the video, if checkpointed"""
+        return await CheckpointService._load(NORMALIZED, normalized_key(video_id, lang))
+
+    @staticmethod
+    async def save_normalized(video_id: str, normalized: Dict[str, Any], lang: str = "en") -> None:
+        await CheckpointService._save(NORMALIZED, normalized_key(video_id, lang), normalized)
+
+    @staticmethod
+    async def get_insights(video_id: str, model: str, lang: str = "en") -> Optional[Dict[str, Any]]:
+        """InsightsService.generate result for the video and requested model, if checkpointed"""
+        return await CheckpointService._load(INSIGHTS, insights_key(video_id, model, lang))
+
+    @staticmethod
+    async def save_insights(video_id: str, model: str, generation: Dict[str, Any], lang: str = "en") -> None:
+        # Local fallback answers are not checkpointed, so a retry asks the LLM again; explicit
+        # local answers are cheaper to recompute than to store
+        if generation.get("fallback_reason") or model == EXTRACTIVE_MODEL:
+            return
+        await CheckpointService._save(INSIGHTS, insights_key(video_id, model, lang), generation)
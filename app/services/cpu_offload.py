@@ -0,0 +1,142 @@
+# app/services/cpu_offload.py
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.youtube_transcript import TranscriptResponse, YoutubeTranscript
+
+# Separates segment texts in the parse result (never produced by caption XML)
+TEXT_SEPARATOR = "\x00"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def process_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared process pool, created on first use; None unless CPU_PROCESS_POOL is set"""
+    global _pool
+    if not settings.CPU_PROCESS_POOL:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads and event loops is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.CPU_PROCESS_WORKERS or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def payload_size(value: Any) -> int:
+    """Characters of text in a str or in the top-level strings of a dict or list"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return 0
+    return sum(len(item) for item in value if isinstance(item, str))
+
+
+def _offload_pool(size: int) -> Optional[ProcessPoolExecutor]:
+    if size < settings.CPU_PROCESS_THRESHOLD:
+        return None
+    return process_pool()
+
+
+def _run_in_pool(pool: ProcessPoolExecutor, fn: Callable, *args) -> Any:
+    """Run fn in pool; a broken pool (a worker died) is discarded and recreated on next use"""
+    global _pool
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        raise
+
+
+def _parse_in_process(transcript_xml: bytes, lang: str) -> Tuple[bytes, bytes, bytes]:
+    """
+    Worker side of parse_transcript_xml.
+
+    Segments travel back as two packed float arrays and one separator-joined text blob
+    instead of a pickled list of objects.
+    """
+    items = YoutubeTranscript.parse_transcript_xml(transcript_xml.decode("utf-8"), lang)
+    offsets = array("d", (item.offset for item in items))
+    durations = array("d", (item.duration for item in items))
+    texts = TEXT_SEPARATOR.join(item.text for item in items)
+    return offsets.tobytes(), durations.tobytes(), texts.encode("utf-8")
+
+
+def parse_transcript_xml(transcript_xml: str, lang: str = "") -> List[TranscriptResponse]:
+    """YoutubeTranscript.parse_transcript_xml, in the process pool for captions above CPU_PROCESS_THRESHOLD"""
+    pool = _offload_pool(len(transcript_xml))
+    if pool is None:
+        return YoutubeTranscript.parse_transcript_xml(transcript_xml, lang)
+
+    try:
+        offsets_bytes, durations_bytes, texts = _run_in_pool(
+            pool, _parse_in_process, transcript_xml.encode("utf-8"), lang
+        )
+    except BrokenProcessPool:
+        return YoutubeTranscript.parse_transcript_xml(transcript_xml, lang)
+    if not texts and not offsets_bytes:
+        return []
+
+    offsets = array("d")
+    offsets.frombytes(offsets_bytes)
+    durations = array("d")
+    durations.frombytes(durations_bytes)
+    return [
+        TranscriptResponse(text=text, duration=duration, offset=offset, lang=lang)
+        for text, offset, duration in zip(texts.decode("utf-8").split(TEXT_SEPARATOR), offsets, durations)
+    ]
+
+
+def _compress_in_process(value: Any) -> bytes:
+    from app.services.redis_service import RedisService
+    return RedisService.compress_value(value).encode("ascii")
+
+
+def compress_value(value: Any) -> str:
+    """
+    RedisService.compress_value, in the process pool for payloads above CPU_PROCESS_THRESHOLD.
+
+    Stored values are strings or shallow dicts of a few large strings, which pickle as flat
+    buffers; the compressed result comes back as bytes.
+    """
+    from app.services.redis_service import RedisService
+
+    pool = _offload_pool(payload_size(value))
+    if pool is None:
+        return RedisService.compress_value(value)
+    try:
+        return _run_in_pool(pool, _compress_in_process, value).decode("ascii")
+    except BrokenProcessPool:
+        return RedisService.compress_value(value)
+
+
+def _decompress_in_process(value: bytes) -> Any:
+    from app.services.redis_service import RedisService
+    return RedisService.decompress_value(value.decode("ascii"))
+
+
+def decompress_value(value: str) -> Any:
+    """RedisService.decompress_value, in the process pool for payloads above CPU_PROCESS_THRESHOLD"""
+    from app.services.redis_service import RedisService
+
+    pool = _offload_pool(len(value))
+    if pool is None:
+        return RedisService.decompress_value(value)
+    try:
+        return _run_in_pool(pool, _decompress_in_process, value.encode("ascii"))
+    except BrokenProcessPool:
+        return RedisService.decompress_value(value)
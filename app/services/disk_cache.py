@@ -0,0 +1,162 @@
+# app/services/disk_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# Last-access times are only rewritten when older than this many seconds, so hot keys do not
+# turn every read into a write
+ACCESS_GRANULARITY = 30.0
+# Eviction frees space down to this fraction of DISK_CACHE_MAX_BYTES
+LOW_WATER = 0.9
+# Values larger than this fraction of DISK_CACHE_MAX_BYTES are not cached
+MAX_VALUE_FRACTION = 0.1
+EVICT_BATCH = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class DiskCache:
+    """
+    Node-local cache tier on disk in front of the remote store, backed by SQLite.
+
+    The database runs in WAL mode, so a crash mid-write leaves the last committed state
+    intact, and is read through a memory map of up to max_bytes. Entries expire after their
+    TTL and the least recently read entries are evicted once the values exceed max_bytes.
+    The file outlives the process, so a restarted worker starts warm.
+
+    Values are stored as they are in Redis (serialized, possibly compressed). All methods
+    are blocking and meant to run in the storage pool.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database (lock held), recreating it if the file is not a usable cache"""
+        if self._connection is None:
+            try:
+                self._connection = self._open()
+            except sqlite3.DatabaseError as e:
+                print(f"Recreating disk cache {self.path}: {str(e)}")
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(self.path + suffix):
+                        os.remove(self.path + suffix)
+                self._connection = self._open()
+        return self._connection
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode NORMAL only syncs at checkpoints: a power loss may drop the latest
+            # writes but never corrupts the database, which is all a cache needs
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.max_bytes)}")
+            connection.executescript(SCHEMA)
+            self._size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, size, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or (row[2] is not None and row[2] <= now):
+                if row is not None:
+                    connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._size -= row[1]
+                self._misses += 1
+                return None
+            if now - row[3] > ACCESS_GRANULARITY:
+                connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return bytes(row[0]).decode("utf-8")
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        """Store value for ttl seconds; False if it is too large to cache"""
+        data = value.encode("utf-8")
+        if len(data) > MAX_VALUE_FRACTION * self.max_bytes:
+            self.delete(key)
+            return False
+
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous = connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(data), len(data), now + ttl if ttl else None, now)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            self._size += len(data) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict(connection, now)
+        return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            connection = self._connect()
+            for key in keys:
+                row = connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._size -= row[0]
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently read ones down to LOW_WATER (lock held)"""
+        connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        while True:
+            self._size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if self._size <= LOW_WATER * self.max_bytes:
+                return
+            evicted = connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (EVICT_BATCH,)
+            ).rowcount
+            self._evictions += evicted
+            if not evicted:
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions
+            }
+
+
+disk_cache = DiskCache(settings.DISK_CACHE_PATH, settings.DISK_CACHE_MAX_BYTES) if settings.DISK_CACHE_PATH else None
@@ -0,0 +1,171 @@
+# app/services/duplicate_index.py
+import os
+import pickle
+import threading
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.extractive_service import RE_TERM
+from app.services.index_snapshots import IndexSnapshots
+
+# Words per shingle
+SHINGLE_WORDS = 5
+# MinHash signature length, split into BANDS bands of ROWS rows for locality-sensitive hashing. Two videos
+# share a band (and are compared) with probability 1 - (1 - s^ROWS)^BANDS for Jaccard similarity s, which
+# is above 0.99 for s >= 0.8 and below 0.05 for s <= 0.45
+BANDS = 16
+ROWS = 8
+NUM_HASHES = BANDS * ROWS
+# Transcripts with fewer shingles are too short to tell re-uploads from videos that merely start alike
+MIN_SHINGLES = 50
+# Shingles hashed per block, bounding the (block x NUM_HASHES) intermediate matrix
+HASH_BLOCK = 4096
+# Universal hash family h(x) = (a * x + b) mod PRIME over 32-bit shingle hashes; a * x + b fits in 64 bits
+PRIME = np.uint64(4294967311)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+INDEX_VERSION = 1
+
+_random = np.random.RandomState(1)
+_A = _random.randint(1, 1 << 32, size=NUM_HASHES, dtype=np.uint64)
+_B = _random.randint(0, 1 << 32, size=NUM_HASHES, dtype=np.uint64)
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (NUM_HASHES uint32) of the word shingles of text, None if text is too short"""
+    words = RE_TERM.findall(text.lower())
+    if len(words) < SHINGLE_WORDS + MIN_SHINGLES - 1:
+        return None
+    hashes = np.unique(np.fromiter(
+        (zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode()) for i in range(len(words) - SHINGLE_WORDS + 1)),
+        dtype=np.uint64
+    ))
+    if len(hashes) < MIN_SHINGLES:
+        return None
+
+    minimum = np.full(NUM_HASHES, MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), HASH_BLOCK):
+        block = hashes[start:start + HASH_BLOCK, np.newaxis]
+        np.minimum(minimum, ((block * _A + _B) % PRIME & MAX_HASH).min(axis=0), out=minimum)
+    return minimum.astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.count_nonzero(first == second)) / NUM_HASHES
+
+
+class DuplicateIndex:
+    """
+    LSH index over the MinHash signatures of processed transcripts, to find re-uploads and
+    mirrors of a video under another video ID.
+
+    Each video keeps its signature (NUM_HASHES * 4 bytes); each of its BANDS bands is bucketed
+    by a hash of the band, and a lookup only compares the videos sharing a bucket with it.
+    Like the search index it lives in this process and is snapshotted per worker next to
+    DUPLICATE_INDEX_PATH, merging the other workers' snapshots.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+        # Changed since the last snapshot
+        self.dirty = False
+
+    @property
+    def size(self) -> int:
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(video_signature: np.ndarray) -> List[Tuple[int, int]]:
+        return [
+            (band, zlib.crc32(video_signature[band * ROWS:(band + 1) * ROWS].tobytes()))
+            for band in range(BANDS)
+        ]
+
+    def add(self, video_id: str, video_signature: np.ndarray) -> None:
+        with self._lock:
+            previous = self._signatures.get(video_id)
+            if previous is not None:
+                if np.array_equal(previous, video_signature):
+                    return
+                for bucket in self._bands(previous):
+                    self._buckets[bucket].remove(video_id)
+                    if not self._buckets[bucket]:
+                        del self._buckets[bucket]
+            self._signatures[video_id] = video_signature
+            for bucket in self._bands(video_signature):
+                self._buckets[bucket].append(video_id)
+            self.dirty = True
+
+    def find(self, video_id: str, video_signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        """Other videos with an estimated similarity of at least threshold, most similar first"""
+        with self._lock:
+            candidates = {
+                other for bucket in self._bands(video_signature) for other in self._buckets.get(bucket, ())
+                if other != video_id
+            }
+            matches = [(other, similarity(video_signature, self._signatures[other])) for other in candidates]
+        return sorted(
+            (match for match in matches if match[1] >= threshold), key=lambda match: match[1], reverse=True
+        )
+
+    def save(self, path: str) -> None:
+        """Write a snapshot of the index (atomically replacing path)"""
+        with self._lock:
+            videos = list(self._signatures)
+            state = {
+                "version": INDEX_VERSION,
+                "videos": videos,
+                "signatures": np.stack([self._signatures[video_id] for video_id in videos]) if videos else None
+            }
+            temporary = f"{path}.tmp"
+            with open(temporary, "wb") as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self.dirty = False
+
+    def merge(self, path: str) -> int:
+        """Add the videos of the snapshot at path that are not indexed yet; returns their number"""
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+        if state.get("version") != INDEX_VERSION:
+            return 0
+
+        added = 0
+        with self._lock:
+            for video_id, video_signature in zip(state["videos"], state["signatures"] if state["videos"] else ()):
+                if video_id not in self._signatures:
+                    self.add(video_id, video_signature)
+                    added += 1
+        return added
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "videos": len(self._signatures),
+                "buckets": len(self._buckets),
+                "signature_bytes": len(self._signatures) * NUM_HASHES * 4
+            }
+
+
+duplicate_index = DuplicateIndex()
+_snapshots = IndexSnapshots(duplicate_index, settings.DUPLICATE_INDEX_PATH, "duplicate index") \
+    if settings.DUPLICATE_INDEX_PATH else None
+
+
+def save_duplicate_index() -> None:
+    if _snapshots:
+        _snapshots.sync()
+
+
+def load_duplicate_index() -> None:
+    if _snapshots:
+        try:
+            _snapshots.load()
+        except Exception as e:
+            print(f"Error loading duplicate index: {str(e)}")
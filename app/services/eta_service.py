@@ -0,0 +1,119 @@
+# app/services/eta_service.py
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Priors (seconds) used until a stage has been observed
+DEFAULT_FETCH_TIME = 3.0
+DEFAULT_LLM_TIME = 30.0
+DEFAULT_STORE_TIME = 0.5
+# Videos whose caption size is remembered, so repeat requests are estimated by size
+MAX_KNOWN_VIDEOS = 10000
+
+FETCHING = "fetching"
+GENERATING = "generating"
+STORING = "storing"
+
+
+def _bucket(value: int) -> int:
+    """Power-of-two size class, so similar caption sizes and token counts share a timing"""
+    return 1 << max(0, int(value).bit_length() - 1) if value > 0 else 0
+
+
+class EtaEstimator:
+    """
+    Exponentially weighted per-stage timings of combined jobs, used for
+    estimated_completion_time.
+
+    Transcript fetch time is kept per caption size class and LLM time per model and
+    transcript token class, each with a coarser fallback for classes not seen yet. The
+    queue wait follows from the job pool's queue depth and the average job duration.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self._averages: Dict[str, float] = {}
+        self._caption_sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _observe(self, key: str, seconds: float) -> None:
+        previous = self._averages.get(key)
+        self._averages[key] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def _expected(self, *keys: str, default: float) -> float:
+        with self._lock:
+            for key in keys:
+                if key in self._averages:
+                    return self._averages[key]
+        return default
+
+    def record_fetch(self, video_id: str, caption_bytes: int, seconds: float) -> None:
+        with self._lock:
+            self._observe(f"fetch:{_bucket(caption_bytes)}", seconds)
+            self._observe("fetch", seconds)
+            self._caption_sizes[video_id] = caption_bytes
+            self._caption_sizes.move_to_end(video_id)
+            if len(self._caption_sizes) > MAX_KNOWN_VIDEOS:
+                self._caption_sizes.popitem(last=False)
+
+    def caption_size(self, video_id: str) -> Optional[int]:
+        """Caption size of the video's last fetch, if remembered"""
+        with self._lock:
+            return self._caption_sizes.get(video_id)
+
+    def record_llm(self, model: str, tokens: int, seconds: float) -> None:
+        with self._lock:
+            self._observe(f"llm:{model}:{_bucket(tokens)}", seconds)
+            self._observe(f"llm:{model}", seconds)
+            self._observe("llm", seconds)
+
+    def record_store(self, seconds: float) -> None:
+        with self._lock:
+            self._observe("store", seconds)
+
+    def record_job(self, seconds: float) -> None:
+        with self._lock:
+            self._observe("job", seconds)
+
+    def fetch_time(self, caption_bytes: Optional[int] = None) -> float:
+        keys = [f"fetch:{_bucket(caption_bytes)}"] if caption_bytes else []
+        return self._expected(*keys, "fetch", default=DEFAULT_FETCH_TIME)
+
+    def llm_time(self, model: str, tokens: Optional[int] = None) -> float:
+        keys = [f"llm:{model}:{_bucket(tokens)}"] if tokens else []
+        return self._expected(*keys, f"llm:{model}", "llm", default=DEFAULT_LLM_TIME)
+
+    def store_time(self) -> float:
+        return self._expected("store", default=DEFAULT_STORE_TIME)
+
+    def queue_wait(self, queued: int, workers: int) -> float:
+        """Expected wait of a job with queued jobs ahead of it and workers pool workers"""
+        if queued <= 0:
+            return 0.0
+        job_time = self._expected(
+            "job", default=self.fetch_time() + self.llm_time("") + self.store_time()
+        )
+        return math.ceil(queued / max(1, workers)) * job_time
+
+    def remaining(self, stage: str, model: str, tokens: Optional[int] = None,
+                  caption_bytes: Optional[int] = None) -> float:
+        """Expected seconds until a job at stage finishes"""
+        seconds = self.store_time()
+        if stage in (FETCHING, GENERATING):
+            seconds += self.llm_time(model, tokens)
+        if stage == FETCHING:
+            seconds += self.fetch_time(caption_bytes)
+        return seconds
+
+    def completion_time(self, stage: str, model: str, tokens: Optional[int] = None,
+                        caption_bytes: Optional[int] = None, queue_wait: float = 0.0) -> str:
+        """estimated_completion_time in ISO format"""
+        seconds = queue_wait + self.remaining(stage, model, tokens, caption_bytes)
+        return (datetime.utcnow() + timedelta(seconds=seconds)).isoformat()
+
+
+eta_estimator = EtaEstimator(settings.ETA_ALPHA)
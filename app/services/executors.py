@@ -0,0 +1,97 @@
+# app/services/executors.py
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+# Wait times kept per pool for the percentiles
+WAIT_SAMPLES = 1000
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class BoundedExecutor:
+    """
+    Named thread pool of fixed size with queue-depth and wait-time metrics.
+
+    Work is dispatched with a copy of the caller's context, so the job timeline and
+    deadline follow it into the worker thread.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        submitted = time.monotonic()
+        with self._lock:
+            self._queued += 1
+
+        def call():
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._waits.append(time.monotonic() - submitted)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        try:
+            return self._pool.submit(call)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn in the pool and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = list(self._waits)
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "wait_p50": percentile(waits, 50),
+                "wait_p95": percentile(waits, 95),
+                "wait_max": max(waits) if waits else None
+            }
+
+
+# Combined jobs, each holding a worker for its whole run (its own event loop)
+job_executor = BoundedExecutor("jobs", settings.JOB_WORKERS)
+# Blocking YouTube page and caption fetches
+youtube_executor = BoundedExecutor("youtube", settings.YOUTUBE_WORKERS)
+# Blocking storage operations (Upstash REST, Redis protocol)
+storage_executor = BoundedExecutor("storage", settings.STORAGE_WORKERS)
+# CPU work: compression, normalization, extractive insights
+cpu_executor = BoundedExecutor("cpu", settings.CPU_WORKERS or os.cpu_count() or 1)
+
+
+def all_executors() -> List[BoundedExecutor]:
+    return [job_executor, youtube_executor, storage_executor, cpu_executor]
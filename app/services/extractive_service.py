@@ -0,0 +1,161 @@
+# app/services/extractive_service.py
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.timing import span
+
+EXTRACTIVE_MODEL = "local/extractive"
+
+RE_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+RE_TERM = re.compile(r"[a-z0-9']+")
+
+# Caption text often has no punctuation; sentences longer than this are cut into windows
+MAX_SENTENCE_WORDS = 40
+WINDOW_WORDS = 25
+MAX_VOCABULARY = 2000
+DAMPING = 0.85
+ITERATIONS = 30
+# Selected sentences more similar than this to an already selected one are skipped
+MAX_REDUNDANCY = 0.6
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between both
+but by can could did do does doing don't down during each even few for from further get gets getting go going gonna
+got had has have having he her here hers herself him himself his how i i'm if in into is it it's its itself just
+know let's like me more most my myself no nor not now of off on once one only or other our ours ourselves out over
+own really right said same say says see she should so some something such than that that's the their theirs them
+themselves then there there's these they they're thing things think this those through to too um uh under until up
+us very want was we we're well were what when where which while who whom why will with would yeah you you're your
+yours yourself yourselves
+""".split())
+
+
+class ExtractiveService:
+    """
+    CPU-only insights from the transcript itself, used when no LLM can answer.
+
+    Sentences are weighted with TF-IDF and ranked with TextRank over their cosine
+    similarity graph; the top-ranked, non-redundant sentences are returned in
+    transcript order together with the most characteristic terms.
+    """
+
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        sentences = []
+        for sentence in RE_SENTENCE_END.split(text):
+            words = sentence.split()
+            if len(words) <= MAX_SENTENCE_WORDS:
+                if words:
+                    sentences.append(" ".join(words))
+                continue
+            for start in range(0, len(words), WINDOW_WORDS):
+                sentences.append(" ".join(words[start:start + WINDOW_WORDS]))
+        return sentences
+
+    @staticmethod
+    def _tfidf(sentences: List[str]):
+        """L2-normalized sentence x term TF-IDF matrix and the vocabulary"""
+        tokenized = [
+            [term for term in RE_TERM.findall(sentence.lower()) if len(term) > 2 and term not in STOPWORDS]
+            for sentence in sentences
+        ]
+        document_frequency = Counter(term for terms in tokenized for term in set(terms))
+        vocabulary = [term for term, _ in document_frequency.most_common(MAX_VOCABULARY)]
+        index = {term: i for i, term in enumerate(vocabulary)}
+
+        counts = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(tokenized):
+            for term in terms:
+                column = index.get(term)
+                if column is not None:
+                    counts[row, column] += 1.0
+
+        df = np.array([document_frequency[term] for term in vocabulary], dtype=np.float32)
+        matrix = counts * (np.log((1.0 + len(sentences)) / (1.0 + df)) + 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix, vocabulary
+
+    @staticmethod
+    def _textrank(matrix: np.ndarray) -> np.ndarray:
+        """
+        TextRank scores over the cosine similarity graph of the rows of matrix.
+
+        The similarity matrix is never materialized: S @ v is computed as
+        matrix @ (matrix.T @ v) minus the self-similarity, which keeps memory linear in
+        the number of sentences for hour-long transcripts.
+        """
+        n = matrix.shape[0]
+        self_similarity = np.einsum("ij,ij->i", matrix, matrix)
+
+        def similarity_dot(vector: np.ndarray) -> np.ndarray:
+            return matrix @ (matrix.T @ vector) - self_similarity * vector
+
+        degree = similarity_dot(np.ones(n, dtype=np.float32))
+        degree[degree <= 0] = 1.0
+
+        scores = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(ITERATIONS):
+            updated = (1 - DAMPING) / n + DAMPING * similarity_dot(scores / degree)
+            if np.abs(updated - scores).sum() < 1e-6:
+                return updated
+            scores = updated
+        return scores
+
+    @classmethod
+    def summarize(cls, text: str, max_points: Optional[int] = None) -> str:
+        """
+        Extract the key sentences and terms of text.
+
+        Args:
+            text: Transcript text
+            max_points: Sentences to return (default: EXTRACTIVE_MAX_POINTS)
+
+        Returns:
+            Markdown with the key terms and the key sentences in transcript order
+        """
+        max_points = max_points or settings.EXTRACTIVE_MAX_POINTS
+        sentences = cls.split_sentences(text)
+        if not sentences:
+            return ""
+
+        matrix, vocabulary = cls._tfidf(sentences)
+        if not vocabulary:
+            return "\n".join(f"- {sentence}" for sentence in sentences[:max_points])
+
+        scores = cls._textrank(matrix)
+
+        selected: List[int] = []
+        for candidate in np.argsort(-scores):
+            if len(selected) >= max_points:
+                break
+            if selected and float((matrix[selected] @ matrix[candidate]).max()) > MAX_REDUNDANCY:
+                continue
+            selected.append(int(candidate))
+
+        term_weights = matrix.sum(axis=0)
+        key_terms = [vocabulary[i] for i in np.argsort(-term_weights)[:8]]
+
+        lines = [f"**Key topics:** {', '.join(key_terms)}", "", "**Key points:**"]
+        lines.extend(f"- {sentences[i]}" for i in sorted(selected))
+        return "\n".join(lines)
+
+    @classmethod
+    def generate(cls, text: str) -> Dict[str, Any]:
+        """Extractive insights in the result format of InsightsService.generate"""
+        start = time.monotonic()
+        with span("extractive.summarize", chars=len(text)):
+            insights = cls.summarize(text)
+        latency = time.monotonic() - start
+        return {
+            "insights": insights,
+            "model": EXTRACTIVE_MODEL,
+            "ttft": latency,
+            "latency": latency,
+            "usage": None
+        }
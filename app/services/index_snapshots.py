@@ -0,0 +1,98 @@
+# app/services/index_snapshots.py
+import glob
+import os
+import re
+import time
+from typing import Any, Dict
+
+from app.core.config import settings
+
+# Snapshot files of other workers not rewritten for this many snapshot intervals belong to
+# workers that are gone; once merged and saved here they are removed
+STALE_INTERVALS = 10
+
+
+class IndexSnapshots:
+    """
+    Per-worker snapshot files of an in-process index, merged across workers.
+
+    Every uvicorn worker keeps its own index of the videos it processed and writes it to
+    <root>.<pid><ext> next to the configured path, so workers never overwrite each other.
+    On startup a worker merges all snapshot files; afterwards each sync merges the files
+    other workers have rewritten since, so every worker converges on the videos all of
+    them processed within a snapshot interval. Files of workers that are gone (and a
+    single-file snapshot of an older version at the configured path) are removed once
+    their videos are part of this worker's own file.
+
+    The index must provide save(path), merge(path) -> number of videos added, and dirty.
+    """
+
+    def __init__(self, index: Any, path: str, name: str):
+        self.index = index
+        self.path = path
+        self.name = name
+        root, ext = os.path.splitext(path)
+        self.own_path = f"{root}.{os.getpid()}{ext}"
+        self._pattern = re.compile(re.escape(root) + r"\.\d+" + re.escape(ext) + "$")
+        self._glob = f"{glob.escape(root)}.*{ext}"
+        # Peer snapshot file -> modification time when it was last merged
+        self._merged: Dict[str, float] = {}
+
+    def _peers(self) -> Dict[str, float]:
+        """Snapshot files of other workers (and the legacy single file) by modification time"""
+        paths = [path for path in glob.glob(self._glob) if self._pattern.match(path)]
+        if os.path.exists(self.path):
+            paths.append(self.path)
+        peers = {}
+        for path in paths:
+            if path == self.own_path:
+                continue
+            try:
+                peers[path] = os.path.getmtime(path)
+            except OSError:
+                # Removed by its worker meanwhile
+                pass
+        return peers
+
+    def _merge_peers(self) -> int:
+        added = 0
+        for path, modified in self._peers().items():
+            if self._merged.get(path) == modified:
+                continue
+            try:
+                added += self.index.merge(path)
+                self._merged[path] = modified
+            except Exception as e:
+                print(f"Error merging {self.name} snapshot {path}: {str(e)}")
+        return added
+
+    def load(self) -> None:
+        """Merge the snapshots of all workers into the (empty) index at startup"""
+        added = 0
+        if os.path.exists(self.own_path):
+            # Left by an earlier worker that had the same process ID
+            added += self.index.merge(self.own_path)
+        added += self._merge_peers()
+        if added:
+            print(f"Loaded {self.name} with {added} videos")
+
+    def sync(self) -> None:
+        """Merge what other workers saved since the last sync, then save this worker's snapshot"""
+        self._merge_peers()
+        if self.index.dirty:
+            self.index.save(self.own_path)
+        elif os.path.exists(self.own_path):
+            # Heartbeat, so other workers do not take the file for one of a worker that is gone
+            os.utime(self.own_path)
+        else:
+            return
+
+        stale_before = time.time() - STALE_INTERVALS * settings.SEARCH_INDEX_SAVE_INTERVAL
+        for path, modified in list(self._merged.items()):
+            if modified < stale_before:
+                try:
+                    if os.path.getmtime(path) == modified:
+                        os.remove(path)
+                except OSError:
+                    pass
+                del self._merged[path]
@@ -1,20 +1,37 @@
+import asyncio
 import json
+import time
+from typing import Any, Dict, List, Optional
 
-import requests
+import httpx
 
 from app.core.config import settings
-from app.core.exceptions import AIModelError
+from app.core.exceptions import AIModelError, AIServiceUnavailableError, AIUpstreamError
+from app.services.executors import cpu_executor, percentile
+from app.services.extractive_service import EXTRACTIVE_MODEL, ExtractiveService
+from app.services.llm_control import CircuitBreaker, llm_limiter
+from app.services.model_router import AUTO_MODEL, rank_models
+from app.services.model_telemetry import model_telemetry
+from app.utils.deadline import current_deadline
+from app.utils.timing import span
+
+DEFAULT_MODEL = "deepseek/deepseek-chat:free"
+# Part of a job's deadline kept for the extractive fallback and the final writes
+DEADLINE_RESERVE = 2.0
+SYSTEM_PROMPT = "I found transcript of Youtube video. Be concise. I need key insights from it not the whole video."
 
 
 class InsightsService:
     @staticmethod
-    async def get_insights(text: str, model: str = "deepseek/deepseek-chat:free") -> str:
+    async def get_insights(text: str, model: str = DEFAULT_MODEL, fallback_models: Optional[List[str]] = None) -> str:
         """
         Extracts key insights from text using an AI model.
 
         Args:
             text: Text to analyze
-            model: AI model to use
+            model: AI model to use, "auto" for the fastest healthy model that fits the text, or
+                "local/extractive" for local extractive insights without an LLM
+            fallback_models: Models to hedge or fail over to, in order (default: LLM_FALLBACK_MODELS)
 
         Returns:
             Key insights extracted from the text
@@ -22,59 +39,318 @@ class InsightsService:
         Raises:
             AIModelError: If insights cannot be generated
         """
+        result = await InsightsService.generate(text, model, fallback_models)
+        return result["insights"]
+
+    @classmethod
+    async def generate(cls, text: str, model: str = DEFAULT_MODEL,
+                       fallback_models: Optional[List[str]] = None,
+                       extractive_fallback: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Generate insights, falling back to the local extractive engine.
+
+        With model "local/extractive" no LLM is called. Otherwise the LLM models are tried
+        (see _generate_remote); if all of them fail or they do not answer within
+        LLM_DEADLINE (or what is left of the job deadline), the extractive engine answers instead unless the fallback is
+        disabled (EXTRACTIVE_FALLBACK).
+
+        Returns:
+            Dict with the insights, the winning model, its time to first token and latency,
+            token usage and the outcome of every attempt
+
+        Raises:
+            AIModelError: If every model failed and the fallback is disabled
+        """
+        attempts: List[Dict[str, Any]] = []
+        if model == EXTRACTIVE_MODEL:
+            return await cls._generate_extractive(text, attempts)
+
+        timeout = settings.LLM_DEADLINE
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline.remaining() - DEADLINE_RESERVE))
+
         try:
-            print(settings.OPENROUTER_API_KEY, "api key")
-            headers = {
-                "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
-                "Content-Type": "application/json",
-            }
-
-            # Add optional headers if configured
-            if settings.OPENROUTER_SITE_URL:
-                headers["HTTP-Referer"] = settings.OPENROUTER_SITE_URL
-            if settings.OPENROUTER_SITE_NAME:
-                headers["X-Title"] = settings.OPENROUTER_SITE_NAME
-
-            payload = {
-                "model": model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "I found transcript of Youtube video. Be concise. I need key insights from it not the whole video."
-                    },
-                    {
-                        "role": "user",
-                        "content": text
-                    }
-                ]
-            }
-
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                data=json.dumps(payload)
-            )
+            return await asyncio.wait_for(cls._generate_remote(text, model, fallback_models, attempts), timeout)
+        except (AIModelError, asyncio.TimeoutError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = AIUpstreamError(f"The AI model did not answer within {timeout:.1f} seconds")
+            if not (settings.EXTRACTIVE_FALLBACK if extractive_fallback is None else extractive_fallback):
+                raise e
+            print(f"Falling back to extractive insights: {e.detail}")
+            result = await cls._generate_extractive(text, attempts)
+            result["fallback_reason"] = e.detail
+            return result
+
+    @staticmethod
+    async def _generate_extractive(text: str, attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # CPU-bound; keep the event loop free for the other jobs' I/O
+        result = await cpu_executor.run(ExtractiveService.generate, text)
+        if not result["insights"]:
+            raise AIModelError("No insights were generated. The transcript has no text to extract from.")
+        attempts.append({"model": EXTRACTIVE_MODEL, "outcome": "won", "latency": result["latency"]})
+        result["attempts"] = attempts
+        return result
+
+    @classmethod
+    async def _generate_remote(cls, text: str, model: str, fallback_models: Optional[List[str]],
+                               attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Generate insights with hedged requests across an ordered list of models.
+
+        The first model is asked immediately. If it has not produced a first token within
+        its p95 time to first token (LLM_HEDGE_DELAY until enough samples exist), the next
+        model is asked as well. Any failure (429, 5xx, connection error) fails over to the
+        next model at once. The first complete answer wins and the other requests are
+        cancelled. With model "auto" the candidates are ranked from live telemetry.
+
+        Raises:
+            AIModelError: If every model failed
+        """
+        if model == AUTO_MODEL:
+            ranked = await rank_models(text)
+            models = cls.resolve_models(ranked[0], ranked[1:] + (fallback_models or []))
+        else:
+            models = cls.resolve_models(model, fallback_models)
+        first_token = asyncio.Event()
+        pending: Dict[asyncio.Task, str] = {}
+        next_index = 0
+        last_error: Optional[AIModelError] = None
+
+        # No overall timeout: answers stream for a while; generate() bounds the total
+        timeout = httpx.Timeout(settings.LLM_READ_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            def launch() -> float:
+                nonlocal next_index
+                candidate = models[next_index]
+                next_index += 1
+                task = asyncio.create_task(cls._request(client, text, candidate, first_token, attempts))
+                pending[task] = candidate
+                return time.monotonic() + cls.hedge_delay(candidate)
+
+            hedge_at = launch()
+            try:
+                while pending:
+                    # Keep hedging only while nobody has started answering
+                    can_hedge = next_index < len(models) and not first_token.is_set()
+                    waiters = set(pending)
+                    token_waiter = None
+                    if can_hedge:
+                        token_waiter = asyncio.create_task(first_token.wait())
+                        waiters.add(token_waiter)
+
+                    timeout = max(0.0, hedge_at - time.monotonic()) if can_hedge else None
+                    done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                    if token_waiter is not None and not token_waiter.done():
+                        token_waiter.cancel()
 
-            if response.status_code != 200:
-                raise AIModelError(f"API request failed with status {response.status_code}: {response.text}")
+                    for task in done:
+                        if task not in pending:
+                            continue
+                        pending.pop(task)
+                        try:
+                            return task.result()
+                        except AIModelError as e:
+                            last_error = e
 
-            response_data = response.json()
-            insights = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                        # Fail over immediately to the next model
+                        if next_index < len(models) and (not pending or not first_token.is_set()):
+                            hedge_at = launch()
 
-            if not insights:
-                raise AIModelError("No insights were generated. The AI model couldn't extract meaningful information.")
+                    if not done and can_hedge:
+                        # Hedge: the slowest-case budget of the current attempts is used up
+                        hedge_at = launch()
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
 
-            return insights
+        raise last_error or AIModelError("No insights were generated. The AI model couldn't extract meaningful information.")
 
-        except requests.RequestException as e:
-            raise AIModelError(f"API connection error: {str(e)}")
+    @staticmethod
+    def resolve_models(model: Optional[str], fallback_models: Optional[List[str]] = None) -> List[str]:
+        """Ordered, de-duplicated list of models to try"""
+        fallbacks = settings.LLM_FALLBACK_MODELS if fallback_models is None else fallback_models
+        models: List[str] = []
+        for candidate in [model or DEFAULT_MODEL, *fallbacks]:
+            if candidate and candidate not in models:
+                models.append(candidate)
+        return models
+
+    @staticmethod
+    def hedge_delay(model: str) -> float:
+        """Seconds to wait for a first token from model before hedging to the next one"""
+        samples = model_telemetry.ttft_samples(model)
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DELAY
+        # Same p95 as the ttft_p95 of /models/leaderboard
+        return max(settings.LLM_HEDGE_MIN_DELAY, percentile(samples, 95))
+
+    @staticmethod
+    def _headers() -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
+            "Content-Type": "application/json",
+        }
+
+        # Add optional headers if configured
+        if settings.OPENROUTER_SITE_URL:
+            headers["HTTP-Referer"] = settings.OPENROUTER_SITE_URL
+        if settings.OPENROUTER_SITE_NAME:
+            headers["X-Title"] = settings.OPENROUTER_SITE_NAME
+        return headers
 
-        except json.JSONDecodeError:
-            raise AIModelError("Failed to parse API response")
+    @classmethod
+    async def _request(cls, client: httpx.AsyncClient, text: str, model: str,
+                       first_token: asyncio.Event, attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Stream one chat completion from model, behind its circuit breaker and the concurrency limiter"""
+        attempt: Dict[str, Any] = {"model": model, "outcome": "cancelled"}
+        attempts.append(attempt)
 
+        breaker = CircuitBreaker.for_model(model)
+        if not breaker.allow():
+            attempt["outcome"] = "circuit_open"
+            raise AIServiceUnavailableError(
+                f"The AI model {model} is temporarily unavailable after repeated failures.",
+                retry_after=breaker.retry_after()
+            )
+
+        try:
+            with span("llm.queue_wait", model=model):
+                await llm_limiter.acquire(settings.LLM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            breaker.release_probe()
+            attempt["outcome"] = "queue_timeout"
+            raise AIServiceUnavailableError("The AI service is at capacity. Try again later.",
+                                            retry_after=int(settings.LLM_QUEUE_TIMEOUT))
+        except BaseException:
+            breaker.release_probe()
+            raise
+
+        ttft = None
+        healthy = None  # True/False once the upstream answered or failed, None if cancelled
+        try:
+            result = await cls._stream_completion(client, text, model, first_token, attempt)
+            ttft = result["ttft"]
+            healthy = True
+            model_telemetry.record_success(model, ttft, result["latency"], result["usage"])
+            result["attempts"] = attempts
+            return result
         except AIModelError as e:
-            # Re-raise AI model specific errors
-            raise e
+            model_telemetry.record_failure(model, attempt.get("latency"))
+            # Rate limits, server errors and connection failures mean the upstream is unhealthy;
+            # other errors (bad request, empty answer) say nothing about its health
+            healthy = False if isinstance(e, AIUpstreamError) else None
+            raise
+        finally:
+            llm_limiter.release(latency=ttft, overloaded=healthy is False)
+            if healthy is True:
+                breaker.record_success()
+            elif healthy is False:
+                breaker.record_failure()
+            else:
+                breaker.release_probe()
+
+    @classmethod
+    async def _stream_completion(cls, client: httpx.AsyncClient, text: str, model: str,
+                                 first_token: asyncio.Event, attempt: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one streaming chat completion request and collect the answer"""
+        payload = {
+            "model": model,
+            "stream": True,
+            # Ask OpenRouter to report token counts and cost in the final chunk
+            "usage": {"include": True},
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": text
+                }
+            ]
+        }
+
+        start = time.monotonic()
+
+        with span("llm.request", model=model) as llm_span:
+            try:
+                parts: List[str] = []
+                usage = None
+                ttft = None
+
+                async with client.stream(
+                        "POST",
+                        f"{settings.OPENROUTER_BASE_URL}/chat/completions",
+                        headers=cls._headers(),
+                        json=payload
+                ) as response:
+                    llm_span["status_code"] = response.status_code
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        message = f"API request failed with status {response.status_code}: {body}"
+                        if response.status_code == 429 or response.status_code >= 500:
+                            raise AIUpstreamError(message)
+                        raise AIModelError(message)
+
+                    async for line in response.aiter_lines():
+                        # SSE comments (": OPENROUTER PROCESSING") and blank separators carry no data
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+
+                        chunk = json.loads(data)
+                        if chunk.get("error"):
+                            raise AIUpstreamError(
+                                f"API request failed: {chunk['error'].get('message', chunk['error'])}")
+                        if chunk.get("usage"):
+                            usage = chunk["usage"]
+
+                        choices = chunk.get("choices") or [{}]
+                        content = choices[0].get("delta", {}).get("content")
+                        if content:
+                            if ttft is None:
+                                ttft = time.monotonic() - start
+                                llm_span["ttft"] = round(ttft, 6)
+                                first_token.set()
+                            parts.append(content)
+
+                insights = "".join(parts)
+                if not insights:
+                    raise AIModelError(
+                        "No insights were generated. The AI model couldn't extract meaningful information.")
+
+                latency = time.monotonic() - start
+                attempt.update(outcome="won", ttft=ttft, latency=latency)
+                return {
+                    "insights": insights,
+                    "model": model,
+                    "ttft": ttft,
+                    "latency": latency,
+                    "usage": usage
+                }
+
+            except asyncio.CancelledError:
+                attempt["latency"] = time.monotonic() - start
+                raise
+
+            except httpx.HTTPError as e:
+                attempt.update(outcome="failed", error=str(e), latency=time.monotonic() - start)
+                raise AIUpstreamError(f"API connection error: {str(e)}")
+
+            except json.JSONDecodeError:
+                attempt.update(outcome="failed", error="invalid response", latency=time.monotonic() - start)
+                raise AIModelError("Failed to parse API response")
+
+            except AIModelError as e:
+                attempt.update(outcome="failed", error=e.detail, latency=time.monotonic() - start)
+                raise e
 
-        except Exception as e:
-            raise AIModelError(f"Unexpected error: {str(e)}")
+            except Exception as e:
+                attempt.update(outcome="failed", error=str(e), latency=time.monotonic() - start)
+                raise AIModelError(f"Unexpected error: {str(e)}")
@@ -0,0 +1,79 @@
+# app/services/job_registry.py
+import asyncio
+import threading
+from typing import Dict, Optional
+
+
+class _Job:
+    __slots__ = ("task", "cancel_on_disconnect", "result_requested", "cancel_reason")
+
+    def __init__(self, cancel_on_disconnect: bool):
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.result_requested = False
+        self.cancel_reason: Optional[str] = None
+
+
+class JobRegistry:
+    """
+    Combined jobs accepted by this process, so request handlers can cancel them.
+
+    Every job runs on its own event loop in a worker thread, so cancellation is handed to
+    that loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, request_id: str, cancel_on_disconnect: bool = False) -> None:
+        with self._lock:
+            self._jobs[request_id] = _Job(cancel_on_disconnect)
+
+    def attach(self, request_id: str, task: asyncio.Task) -> bool:
+        """Register the task running the job; False if the job was cancelled before it started"""
+        with self._lock:
+            job = self._jobs.setdefault(request_id, _Job(False))
+            job.task = task
+            return job.cancel_reason is None
+
+    def remove(self, request_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(request_id, None)
+
+    def mark_result_requested(self, request_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(request_id)
+            if job is not None:
+                job.result_requested = True
+
+    def cancel_on_disconnect(self, request_id: str) -> bool:
+        """Whether the job should stop once its last WebSocket subscriber is gone"""
+        with self._lock:
+            job = self._jobs.get(request_id)
+            return job is not None and job.cancel_on_disconnect and not job.result_requested
+
+    def cancel_reason(self, request_id: str) -> Optional[str]:
+        with self._lock:
+            job = self._jobs.get(request_id)
+            return job.cancel_reason if job is not None else None
+
+    def cancel(self, request_id: str, reason: str) -> bool:
+        """Cancel the job if it belongs to this process; returns whether it did"""
+        with self._lock:
+            job = self._jobs.get(request_id)
+            if job is None:
+                return False
+            job.cancel_reason = job.cancel_reason or reason
+            task = job.task
+
+        if task is not None and not task.done():
+            try:
+                task.get_loop().call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # The job's loop has already closed
+                pass
+        return True
+
+
+job_registry = JobRegistry()
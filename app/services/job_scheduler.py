@@ -0,0 +1,200 @@
+# app/services/job_scheduler.py
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.services.executors import BoundedExecutor, job_executor
+
+
+def client_identity(request: Request) -> str:
+    """Identity jobs are queued fairly by (the client IP, as used for rate limiting)"""
+    return f"ip:{request.client.host}"
+
+
+def idempotency_key(client: str, key: str) -> str:
+    # Scoped per client, so two clients picking the same key do not see each other's jobs
+    return f"idempotency:{client}:{key}"
+
+
+class _Entry:
+    __slots__ = ("request_id", "client", "estimate", "enqueued_at", "rank", "context", "fn", "args")
+
+    def __init__(self, request_id: str, client: str, estimate: float, rank: float,
+                 fn: Callable, args: Tuple[Any, ...]):
+        self.request_id = request_id
+        self.client = client
+        self.estimate = estimate
+        self.enqueued_at = time.monotonic()
+        self.rank = rank
+        # Context of the submitting request, so the job does not inherit the dispatching thread's
+        self.context = contextvars.copy_context()
+        self.fn = fn
+        self.args = args
+
+
+class FairScheduler:
+    """
+    Fair-share queue in front of the job pool.
+
+    Clients take turns (SCHEDULER_CLIENT_WEIGHTS jobs per turn, default one), so one client
+    submitting many long videos only delays its own jobs. Within a client the job with the
+    shortest estimated run time goes first. Each second a job waits counts as
+    SCHEDULER_AGING seconds less of estimated work, so long jobs are not starved: since the
+    aging term grows equally for all of a client's jobs, a job's rank is fixed at
+    estimate + aging * enqueue time.
+
+    At most max_workers jobs are handed to the executor at a time; the rest wait here.
+    """
+
+    def __init__(self, executor: BoundedExecutor):
+        self.executor = executor
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[Tuple[float, int, _Entry]]] = {}
+        self._turns: Deque[str] = deque()
+        self._turn_left = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._sequence = itertools.count()
+        self._running = 0
+
+    @staticmethod
+    def _weight(client: str) -> int:
+        return max(1, settings.SCHEDULER_CLIENT_WEIGHTS.get(client, 1))
+
+    def submit(self, client: str, request_id: str, estimate: float, fn: Callable, *args) -> None:
+        """Queue fn(*args) for client; estimate is the expected run time in seconds"""
+        entry = _Entry(request_id, client, estimate, estimate + settings.SCHEDULER_AGING * time.monotonic(),
+                       fn, args)
+        with self._lock:
+            queue = self._queues.get(client)
+            if queue is None:
+                queue = self._queues[client] = []
+                self._turns.append(client)
+            heapq.heappush(queue, (entry.rank, next(self._sequence), entry))
+            self._entries[request_id] = entry
+        self._dispatch()
+
+    def remove(self, request_id: str) -> bool:
+        """Drop a job that has not started; returns whether it was still queued"""
+        with self._lock:
+            entry = self._entries.pop(request_id, None)
+            if entry is None:
+                return False
+            queue = self._queues[entry.client]
+            queue[:] = [item for item in queue if item[2] is not entry]
+            heapq.heapify(queue)
+            if not queue:
+                self._drop_client(entry.client)
+            return True
+
+    def _drop_client(self, client: str) -> None:
+        del self._queues[client]
+        if self._turns and self._turns[0] == client:
+            self._turn_left = 0
+        self._turns.remove(client)
+
+    def _next(self) -> _Entry:
+        """Pop the next job (lock held, queue not empty)"""
+        client = self._turns[0]
+        if self._turn_left <= 0:
+            self._turn_left = self._weight(client)
+        queue = self._queues[client]
+        entry = heapq.heappop(queue)[2]
+        del self._entries[entry.request_id]
+
+        self._turn_left -= 1
+        if not queue:
+            self._drop_client(client)
+        elif self._turn_left <= 0:
+            self._turns.rotate(-1)
+        return entry
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._running >= self.executor.max_workers or not self._turns:
+                    return
+                entry = self._next()
+                self._running += 1
+            self.executor.submit(self._run, entry)
+
+    def _run(self, entry: _Entry) -> None:
+        try:
+            entry.context.run(entry.fn, *entry.args)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+    def _order(self) -> List[str]:
+        """Request ids in the order they will be dispatched if nothing else is submitted (lock held)"""
+        queues = {client: sorted(queue) for client, queue in self._queues.items()}
+        turns = deque(self._turns)
+        turn_left = self._turn_left
+        order = []
+        while turns:
+            client = turns[0]
+            if turn_left <= 0:
+                turn_left = self._weight(client)
+            queue = queues[client]
+            order.append(queue.pop(0)[2].request_id)
+            turn_left -= 1
+            if not queue:
+                turns.popleft()
+                turn_left = 0
+            elif turn_left <= 0:
+                turns.rotate(-1)
+        return order
+
+    def position(self, request_id: str) -> Optional[Dict[str, int]]:
+        """
+        1-based queue_position among all queued jobs and client_queue_position among the
+        client's own, or None if the job is not queued here.
+        """
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None:
+                return None
+            order = self._order()
+            own = [other_id for other_id in order if self._entries[other_id].client == entry.client]
+        return {
+            "queue_position": order.index(request_id) + 1,
+            "client_queue_position": own.index(request_id) + 1
+        }
+
+    def jobs_ahead(self, client: str) -> int:
+        """
+        Jobs that would start before a new job of client: the client's own queued jobs plus,
+        per other client, as many as get a turn meanwhile, plus one if no worker is free.
+        """
+        with self._lock:
+            own = len(self._queues.get(client, ()))
+            rounds = -(-(own + 1) // self._weight(client))
+            ahead = own + sum(
+                min(len(queue), rounds * self._weight(other))
+                for other, queue in self._queues.items() if other != client
+            )
+            return ahead + (1 if self._running >= self.executor.max_workers else 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregate queue state; client identities (IP addresses) are never reported"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "running": self._running,
+                "queued": len(self._entries),
+                "queued_clients": len(self._queues),
+                "max_queued_per_client": max((len(queue) for queue in self._queues.values()), default=0),
+                "oldest_wait": max(
+                    (now - item[2].enqueued_at for queue in self._queues.values() for item in queue), default=None
+                )
+            }
+
+
+job_scheduler = FairScheduler(job_executor)
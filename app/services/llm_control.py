@@ -0,0 +1,231 @@
+# app/services/llm_control.py
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.services.executors import WAIT_SAMPLES, percentile
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for calls to the LLM upstream.
+
+    The limit grows by about one slot per limit's worth of healthy responses and is cut
+    multiplicatively when the upstream signals overload (429, 5xx, connection errors) or
+    when time to first token exceeds LLM_LATENCY_TOLERANCE times the no-load baseline.
+    Callers over the limit wait in FIFO order with a deadline. Jobs run on their own
+    event loops in worker threads, so waiters are woken with call_soon_threadsafe.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        # No-load latency estimate: follows drops quickly, rises slowly
+        self._baseline: Optional[float] = None
+        self.rejected = 0
+        # Recent queue wait times, for the executor metrics
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    async def acquire(self, timeout: float) -> None:
+        """Wait up to timeout seconds for a slot; raises asyncio.TimeoutError on expiry"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                self._waits.append(0.0)
+                return
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+            with self._lock:
+                self._waits.append(time.monotonic() - queued_at)
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    # The slot was handed over as we gave up; pass it on
+                    self._in_flight -= 1
+                    self._grant_locked()
+                else:
+                    self._waiters.remove(waiter)
+                    self.rejected += 1
+            raise
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        """
+        Return a slot and adapt the limit.
+
+        Args:
+            latency: Time to first token of a successful call (None for cancelled calls)
+            overloaded: The upstream rejected or failed the call
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if overloaded:
+                self._limit = max(self.min_limit, self._limit * settings.LLM_LIMIT_BACKOFF)
+            elif latency is not None:
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency if self._baseline is None else (self._baseline + latency) / 2
+                else:
+                    self._baseline += 0.01 * (latency - self._baseline)
+
+                if latency > self._baseline * settings.LLM_LATENCY_TOLERANCE:
+                    # Queueing upstream: back off gently
+                    self._limit = max(self.min_limit, self._limit * 0.9)
+                else:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._grant_locked()
+
+    def _grant_locked(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = list(self._waits)
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "baseline_latency": self._baseline,
+                "rejected": self.rejected,
+                "wait_p50": percentile(waits, 50),
+                "wait_p95": percentile(waits, 95),
+                "wait_max": max(waits) if waits else None
+            }
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker.
+
+    Opens after LLM_BREAKER_CONSECUTIVE_FAILURES failures in a row, or when the error rate
+    over the last LLM_BREAKER_WINDOW calls reaches LLM_BREAKER_ERROR_RATE. While open,
+    calls fail fast; after LLM_BREAKER_COOLDOWN seconds one probe call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _breakers: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=settings.LLM_BREAKER_WINDOW)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_model(cls, model: str) -> "CircuitBreaker":
+        with cls._registry_lock:
+            if model not in cls._breakers:
+                cls._breakers[model] = cls(model)
+            return cls._breakers[model]
+
+    @classmethod
+    def all(cls) -> Dict[str, "CircuitBreaker"]:
+        with cls._registry_lock:
+            return dict(cls._breakers)
+
+    def allow(self) -> bool:
+        """Whether a call may be made now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= settings.LLM_BREAKER_COOLDOWN:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a probe through"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0
+            return max(1, int(settings.LLM_BREAKER_COOLDOWN - (time.monotonic() - self._opened_at)))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+            failures = self._outcomes.count(False)
+            error_rate = failures / len(self._outcomes)
+
+            if (
+                    self.state == self.HALF_OPEN
+                    or self._consecutive_failures >= settings.LLM_BREAKER_CONSECUTIVE_FAILURES
+                    or (len(self._outcomes) >= self._outcomes.maxlen and error_rate >= settings.LLM_BREAKER_ERROR_RATE)
+            ):
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker for {self.name} opened ({failures}/{len(self._outcomes)} failures)")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose call ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive_failures,
+                "error_rate": self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+            }
+
+
+llm_limiter = AdaptiveConcurrencyLimiter(
+    initial=settings.LLM_CONCURRENCY_INITIAL,
+    min_limit=settings.LLM_CONCURRENCY_MIN,
+    max_limit=settings.LLM_CONCURRENCY_MAX
+)
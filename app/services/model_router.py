@@ -0,0 +1,117 @@
+# app/services/model_router.py
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.llm_control import CircuitBreaker
+from app.services.model_telemetry import model_telemetry
+
+AUTO_MODEL = "auto"
+
+# Rough characters per token for English transcripts
+CHARS_PER_TOKEN = 4
+
+
+class ModelCatalog:
+    """Context lengths of OpenRouter models, from /models with MODEL_CONTEXT_LENGTHS overrides"""
+
+    _context_lengths: Dict[str, int] = {}
+    _fetched_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    async def refresh(cls) -> None:
+        """Reload the catalog if it is older than MODEL_CATALOG_TTL"""
+        with cls._lock:
+            if time.monotonic() - cls._fetched_at < settings.MODEL_CATALOG_TTL and cls._fetched_at:
+                return
+            cls._fetched_at = time.monotonic()
+
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(f"{settings.OPENROUTER_BASE_URL}/models")
+                response.raise_for_status()
+                models = response.json().get("data", [])
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Error fetching model catalog: {str(e)}")
+            return
+
+        with cls._lock:
+            cls._context_lengths = {
+                model["id"]: int(model["context_length"])
+                for model in models
+                if model.get("id") and model.get("context_length")
+            }
+
+    @classmethod
+    def context_length(cls, model: str) -> int:
+        if model in settings.MODEL_CONTEXT_LENGTHS:
+            return settings.MODEL_CONTEXT_LENGTHS[model]
+        with cls._lock:
+            return cls._context_lengths.get(model, settings.DEFAULT_CONTEXT_LENGTH)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def is_healthy(model: str) -> bool:
+    breaker = CircuitBreaker.all().get(model)
+    if breaker is not None and breaker.snapshot()["state"] == CircuitBreaker.OPEN:
+        return False
+    stats = model_telemetry.stats(model)
+    # A single early failure should not bench a model
+    return stats["requests"] < 3 or stats["error_rate"] < settings.MODEL_ROUTER_MAX_ERROR_RATE
+
+
+async def rank_models(text: str, candidates: Optional[List[str]] = None) -> List[str]:
+    """
+    Order candidate models for the "auto" option.
+
+    Models whose context window cannot hold the transcript are dropped. Healthy models come
+    first, fastest expected answer first; models without telemetry yet are tried before the
+    measured ones so every candidate gets measured. Unhealthy models are kept last as a
+    final fallback.
+    """
+    await ModelCatalog.refresh()
+    candidates = candidates or settings.MODEL_ROUTER_CANDIDATES
+    needed = estimate_tokens(text) + settings.MODEL_ROUTER_COMPLETION_TOKENS
+
+    fitting = [model for model in candidates if ModelCatalog.context_length(model) >= needed]
+    if not fitting:
+        # Nothing fits; the largest window has the best chance
+        fitting = sorted(candidates, key=ModelCatalog.context_length, reverse=True)[:1]
+
+    def score(model: str) -> float:
+        expected = model_telemetry.expected_latency(model, settings.MODEL_ROUTER_COMPLETION_TOKENS)
+        return 0.0 if expected is None else expected
+
+    healthy = sorted((model for model in fitting if is_healthy(model)), key=score)
+    unhealthy = [model for model in fitting if model not in healthy]
+    return healthy + unhealthy
+
+
+def leaderboard() -> List[Dict]:
+    """Per-model telemetry, fastest healthy models first"""
+    models = set(model_telemetry.models()) | set(settings.MODEL_ROUTER_CANDIDATES)
+    rows = []
+    for model in models:
+        stats = model_telemetry.stats(model)
+        breaker = CircuitBreaker.all().get(model)
+        stats.update(
+            healthy=is_healthy(model),
+            circuit=breaker.snapshot()["state"] if breaker else CircuitBreaker.CLOSED,
+            context_length=ModelCatalog.context_length(model),
+            expected_latency=model_telemetry.expected_latency(model, settings.MODEL_ROUTER_COMPLETION_TOKENS)
+        )
+        rows.append(stats)
+
+    rows.sort(key=lambda row: (
+        not row["healthy"],
+        row["expected_latency"] is None,
+        row["expected_latency"] or 0.0
+    ))
+    return rows
@@ -0,0 +1,115 @@
+# app/services/model_telemetry.py
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.executors import percentile
+
+
+class _Sample:
+    __slots__ = ("at", "ok", "ttft", "latency", "prompt_tokens", "completion_tokens", "cost")
+
+    def __init__(self, ok: bool, ttft: Optional[float] = None, latency: Optional[float] = None,
+                 prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+                 cost: Optional[float] = None):
+        self.at = time.monotonic()
+        self.ok = ok
+        self.ttft = ttft
+        self.latency = latency
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cost = cost
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.completion_tokens or self.latency is None or self.ttft is None:
+            return None
+        generation_time = self.latency - self.ttft
+        return self.completion_tokens / generation_time if generation_time > 0 else None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+class ModelTelemetry:
+    """
+    Rolling per-model statistics of LLM calls.
+
+    Keeps the calls of the last MODEL_TELEMETRY_WINDOW seconds (at most
+    MODEL_TELEMETRY_MAX_SAMPLES per model) in memory.
+    """
+
+    def __init__(self):
+        self._samples: Dict[str, Deque[_Sample]] = defaultdict(lambda: deque(maxlen=settings.MODEL_TELEMETRY_MAX_SAMPLES))
+        self._lock = threading.Lock()
+
+    def record_success(self, model: str, ttft: Optional[float], latency: float,
+                       usage: Optional[Dict[str, Any]] = None) -> None:
+        usage = usage or {}
+        sample = _Sample(
+            ok=True,
+            ttft=ttft,
+            latency=latency,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            cost=usage.get("cost")
+        )
+        with self._lock:
+            self._samples[model].append(sample)
+
+    def record_failure(self, model: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self._samples[model].append(_Sample(ok=False, latency=latency))
+
+    def _window(self, model: str) -> List[_Sample]:
+        cutoff = time.monotonic() - settings.MODEL_TELEMETRY_WINDOW
+        with self._lock:
+            samples = self._samples.get(model)
+            if not samples:
+                return []
+            while samples and samples[0].at < cutoff:
+                samples.popleft()
+            return list(samples)
+
+    def models(self) -> List[str]:
+        with self._lock:
+            return list(self._samples)
+
+    def ttft_samples(self, model: str) -> List[float]:
+        return [sample.ttft for sample in self._window(model) if sample.ok and sample.ttft is not None]
+
+    def stats(self, model: str) -> Dict[str, Any]:
+        samples = self._window(model)
+        successes = [sample for sample in samples if sample.ok]
+        ttfts = [sample.ttft for sample in successes if sample.ttft is not None]
+        rates = [rate for rate in (sample.tokens_per_second for sample in successes) if rate is not None]
+        costs = [sample.cost for sample in successes if sample.cost is not None]
+
+        return {
+            "model": model,
+            "requests": len(samples),
+            "error_rate": (len(samples) - len(successes)) / len(samples) if samples else 0.0,
+            "ttft_p50": percentile(ttfts, 50),
+            "ttft_p95": percentile(ttfts, 95),
+            "latency_p50": percentile([sample.latency for sample in successes], 50),
+            "tokens_per_second": _mean(rates),
+            "prompt_tokens_avg": _mean([s.prompt_tokens for s in successes if s.prompt_tokens is not None]),
+            "completion_tokens_avg": _mean([s.completion_tokens for s in successes if s.completion_tokens is not None]),
+            "cost_total": sum(costs) if costs else None,
+            "cost_per_request": _mean(costs),
+        }
+
+    def expected_latency(self, model: str, completion_tokens: int) -> Optional[float]:
+        """Expected seconds for a full answer of completion_tokens, None without data"""
+        stats = self.stats(model)
+        if stats["ttft_p50"] is None:
+            return None
+        if not stats["tokens_per_second"]:
+            return stats["latency_p50"]
+        return stats["ttft_p50"] + completion_tokens / stats["tokens_per_second"]
+
+
+model_telemetry = ModelTelemetry()
@@ -1,73 +1,425 @@
 import asyncio
 import base64
 import json
+import threading
+import uuid
 import zlib
-from typing import Any, Optional, Dict
-
-from upstash_redis import Redis
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
 from app.core.config import settings
+from app.services import cpu_offload
+from app.services.disk_cache import disk_cache
+from app.services.executors import cpu_executor, storage_executor
+from app.services.storage_backends import StorageBackend, StoragePipeline, create_backend
+from app.utils.deadline import DeadlineExceeded, stage_timeout
+from app.utils.timing import span
+
+
+# Prefix of the manifest stored in place of a value split into chunks
+CHUNK_MARKER = "__chunked__:"
+# Seconds the chunks of a replaced value stay readable for readers of the old manifest
+CHUNK_GRACE = 60
+# Chunked keys written by this process whose superseded chunks are expired on overwrite
+MAX_TRACKED_CHUNKED_KEYS = 10000
+
+
+class ChunkedValueError(Exception):
+    """A chunked value has missing chunks or a chunk failed its checksum"""
+
+
+def chunk_key(key: str, version: str, index: int) -> str:
+    return f"{key}:chunk:{version}:{index}"
 
 
 class RedisService:
     _instance = None
+    backend: StorageBackend
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(RedisService, cls).__new__(cls)
-            # Initialize Redis connection
-            cls._instance.redis = Redis(
-                url=settings.UPSTASH_REDIS_URL,
-                token=settings.UPSTASH_REDIS_TOKEN
-            )
+            # Initialize the storage backend selected by STORAGE_BACKEND
+            cls._instance.backend = create_backend()
+            # key -> (version, chunk count) of the chunked values this process wrote last
+            cls._instance._chunked = OrderedDict()
+            cls._instance._chunked_lock = threading.Lock()
         return cls._instance
 
-    async def get(self, key: str, decompress: bool = False) -> Optional[Any]:
-        """Get a value from Redis"""
+    @staticmethod
+    def compress_value(value: Any) -> str:
+        """Encode a dict, list or str as base64 zlib-compressed JSON"""
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        return base64.b64encode(zlib.compress(value.encode('utf-8'))).decode('utf-8')
+
+    @staticmethod
+    def decompress_value(value: str) -> Any:
+        """Inverse of compress_value"""
+        return json.loads(zlib.decompress(base64.b64decode(value)).decode('utf-8'))
+
+    async def _run(self, operation: Callable, *args, **kwargs) -> Any:
+        """
+        Run a backend operation, bounded by STORAGE_TIMEOUT and the current job deadline.
+
+        Network backends are called in the storage pool so a slow store neither blocks the
+        event loop nor outlives the job's budget.
+        """
+        if not self.backend.blocking:
+            return operation(*args, **kwargs)
+        timeout = stage_timeout(settings.STORAGE_TIMEOUT)
+        return await asyncio.wait_for(storage_executor.run(operation, *args, **kwargs), timeout)
+
+    @staticmethod
+    def _manifest(value: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(value, str) and value.startswith(CHUNK_MARKER):
+            return json.loads(value[len(CHUNK_MARKER):])
+        return None
+
+    async def _read_chunks(self, key: str, manifest: Dict[str, Any], start: int) -> List[str]:
+        """One MGET of up to STORAGE_CHUNK_BATCH chunks, each checked against the manifest"""
+        checksums = manifest["checksums"]
+        indexes = range(start, min(start + settings.STORAGE_CHUNK_BATCH, len(checksums)))
+        chunks = await self._run(
+            self.backend.mget, *(chunk_key(key, manifest["version"], index) for index in indexes)
+        )
+        for index, chunk in zip(indexes, chunks):
+            if chunk is None:
+                raise ChunkedValueError(f"Chunk {index} of {key} is missing")
+            if zlib.crc32(chunk.encode("utf-8")) != checksums[index]:
+                raise ChunkedValueError(f"Chunk {index} of {key} failed its checksum")
+        return chunks
+
+    async def _iter_chunks(self, key: str, manifest: Dict[str, Any]) -> AsyncIterator[str]:
+        """Chunks in order; all batches are requested at once and yielded as they arrive"""
+        batches = [
+            asyncio.ensure_future(self._read_chunks(key, manifest, start))
+            for start in range(0, len(manifest["checksums"]), settings.STORAGE_CHUNK_BATCH)
+        ]
         try:
-            value = self.redis.get(key)
+            for batch in batches:
+                for chunk in await batch:
+                    yield chunk
+        finally:
+            for batch in batches:
+                batch.cancel()
+
+    async def _set_chunked(self, key: str, value: str, ttl: int) -> bool:
+        """
+        Store value as chunks under a fresh version plus a manifest at key.
+
+        Chunks are written first, STORAGE_CHUNK_BATCH per pipeline with the batches sent
+        concurrently, so no request body holds the whole value; the manifest goes last, so
+        readers never see a manifest whose chunks are not all stored. Chunk boundaries fall
+        on multiples of 4 characters, so chunks of base64 values decode independently.
+        """
+        size = max(4, settings.STORAGE_CHUNK_SIZE // 4 * 4)
+        chunks = [value[start:start + size] for start in range(0, len(value), size)]
+        version = uuid.uuid4().hex[:12]
+
+        async def write(start: int) -> List[Any]:
+            pipeline = self.backend.pipeline()
+            for index in range(start, min(start + settings.STORAGE_CHUNK_BATCH, len(chunks))):
+                pipeline.set(chunk_key(key, version, index), chunks[index], ttl=ttl)
+            return await self._run(pipeline.execute)
+
+        with span("redis.set_chunks", key=key, chunks=len(chunks)):
+            results = await asyncio.gather(
+                *(write(start) for start in range(0, len(chunks), settings.STORAGE_CHUNK_BATCH))
+            )
+        if not all(all(batch) for batch in results):
+            return False
+
+        manifest = {
+            "version": version,
+            "length": len(value),
+            "checksums": [zlib.crc32(chunk.encode("utf-8")) for chunk in chunks]
+        }
+        stored = await self._set_value(key, CHUNK_MARKER + json.dumps(manifest), ttl)
+        self._track_chunked(key, version, len(chunks))
+        return stored
+
+    def _track_chunked(self, key: str, version: Optional[str], count: int = 0) -> Optional[Tuple[str, int]]:
+        """Record key's current chunk version (None if not chunked); returns the previous one"""
+        with self._chunked_lock:
+            previous = self._chunked.pop(key, None)
+            if version is not None:
+                self._chunked[key] = (version, count)
+                if len(self._chunked) > MAX_TRACKED_CHUNKED_KEYS:
+                    self._chunked.popitem(last=False)
+            return previous
+
+    def _queue_set(self, pipeline: StoragePipeline, key: str, value: Any, ttl: int) -> int:
+        """
+        Queue a set of a stored value; chunks of a value this process previously chunked at
+        key expire after CHUNK_GRACE seconds in the same pipeline (other chunks expire with
+        their TTL). Returns the number of commands queued.
+        """
+        with self._chunked_lock:
+            previous = self._chunked.get(key)
+        pipeline.set(key, value, ttl=ttl)
+        if previous is None:
+            return 1
+
+        if not (isinstance(value, str) and value.startswith(CHUNK_MARKER)):
+            self._track_chunked(key, None)
+        for index in range(previous[1]):
+            pipeline.expire(chunk_key(key, previous[0], index), CHUNK_GRACE)
+        return 1 + previous[1]
+
+    async def _set_value(self, key: str, value: Any, ttl: int) -> bool:
+        with self._chunked_lock:
+            chunked = key in self._chunked
+        if not chunked:
+            return await self._run(self.backend.set, key, value, ttl=ttl)
+        pipeline = self.backend.pipeline()
+        self._queue_set(pipeline, key, value, ttl)
+        return (await self._run(pipeline.execute))[0]
+
+    async def _serialize(self, key: str, value: Any, compress: bool) -> Any:
+        if compress and isinstance(value, (dict, list, str)):
+            with span("redis.compress", key=key):
+                return await cpu_executor.run(cpu_offload.compress_value, value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    @staticmethod
+    def _is_large(value: Any) -> bool:
+        return isinstance(value, str) and 0 < settings.STORAGE_CHUNK_SIZE < len(value)
+
+    @staticmethod
+    async def _get_local(key: str) -> Optional[str]:
+        """Value from the node's disk cache, None on a miss or without one"""
+        if disk_cache is None:
+            return None
+        try:
+            with span("disk_cache.get", key=key) as get_span:
+                value = await storage_executor.run(disk_cache.get, key)
+                get_span.update(hit=value is not None)
+            return value
+        except Exception as e:
+            print(f"Disk cache error: {str(e)}")
+            return None
+
+    @staticmethod
+    async def _set_local(key: str, value: Any, ttl: int) -> None:
+        if disk_cache is None or not isinstance(value, str):
+            return
+        try:
+            with span("disk_cache.set", key=key):
+                await storage_executor.run(disk_cache.set, key, value, ttl)
+        except Exception as e:
+            print(f"Disk cache error: {str(e)}")
+
+    async def get(self, key: str, decompress: bool = False,
+                  local: Union[bool, Callable[[Any], bool]] = False) -> Optional[Any]:
+        """
+        Get a value from Redis (reassembled if it was stored in chunks).
+
+        With local, the node's disk cache (DISK_CACHE_PATH) is read first and a value read
+        from Redis is kept there for DISK_CACHE_TTL seconds. Only use it for values that do not
+        change once stored; local may also be a predicate on the value deciding whether it is
+        final and may be kept.
+        """
+        try:
+            value = await self._get_local(key) if local else None
+            cached = value is not None
+            if not cached:
+                value = await self._run(self.backend.get, key)
+                manifest = self._manifest(value)
+                if manifest is not None:
+                    with span("redis.get_chunks", key=key, chunks=len(manifest["checksums"])):
+                        value = "".join([chunk async for chunk in self._iter_chunks(key, manifest)])
+            stored = value
             if value and decompress:
                 # Decompress value
-                value = zlib.decompress(base64.b64decode(value))
-                value = json.loads(value.decode('utf-8'))
+                value = await cpu_executor.run(cpu_offload.decompress_value, value)
+            if local and not cached and value and (local is True or local(value)):
+                await self._set_local(key, stored, settings.DISK_CACHE_TTL)
             return value
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Redis error: {str(e)}")
             return None
 
-    async def set(self, key: str, value: Any, ttl: int = 86400, compress: bool = False) -> bool:
-        """Set a value in Redis with optional compression"""
+    async def set(self, key: str, value: Any, ttl: int = 86400, compress: bool = False,
+                  local: bool = False) -> bool:
+        """Set a value in Redis with optional compression; with local also in the node's disk cache"""
+        try:
+            value = await self._serialize(key, value, compress)
+            if self._is_large(value):
+                stored = await self._set_chunked(key, value, ttl)
+            else:
+                with span("redis.set", key=key):
+                    stored = await self._set_value(key, value, ttl)
+            if local and stored:
+                await self._set_local(key, value, min(ttl, settings.DISK_CACHE_TTL))
+            return stored
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return False
+
+    async def set_many(self, entries: List[Tuple[str, Any, int, bool]]) -> bool:
+        """
+        Set several (key, value, ttl, compress) entries in one transaction pipeline, so they
+        cost one round trip and readers see all of them or none. Values large enough to be
+        chunked are stored first, each as its own chunked write.
+        """
+        if len(entries) == 1:
+            key, value, ttl, compress = entries[0]
+            return await self.set(key, value, ttl, compress)
+
         try:
-            if compress and isinstance(value, (dict, list, str)):
-                if isinstance(value, (dict, list)):
-                    value = json.dumps(value)
-                # Compress value
-                value = base64.b64encode(zlib.compress(value.encode('utf-8'))).decode('utf-8')
+            values = [
+                (key, await self._serialize(key, value, compress), ttl)
+                for key, value, ttl, compress in entries
+            ]
 
-            return self.redis.setex(key, ttl, value)
+            stored = True
+            for key, value, ttl in values:
+                if self._is_large(value):
+                    stored = await self._set_chunked(key, value, ttl) and stored
+
+            pipeline = self.backend.pipeline(transaction=True)
+            set_positions = []
+            for key, value, ttl in values:
+                if not self._is_large(value):
+                    set_positions.append(len(pipeline))
+                    self._queue_set(pipeline, key, value, ttl)
+            if not set_positions:
+                return stored
+
+            with span("redis.set_many", keys=len(set_positions)):
+                results = await self._run(pipeline.execute)
+            return stored and all(results[position] for position in set_positions)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Redis error: {str(e)}")
             return False
 
+    async def stream(self, key: str, decompress: bool = False) -> Optional[AsyncIterator[bytes]]:
+        """
+        Stream a stored value as bytes, chunk by chunk as the chunks arrive; None if the key
+        does not exist.
+
+        Compressed values are inflated incrementally, yielding JSON text. Every chunk is
+        checked to exist before streaming starts, and each is verified against its checksum
+        before it is sent, so a value is never served with chunks missing: a failure after
+        the response started aborts it.
+
+        Raises:
+            ChunkedValueError: If chunks are missing before streaming starts
+        """
+        value = await self._run(self.backend.get, key)
+        if not value:
+            return None
+
+        manifest = self._manifest(value)
+        if manifest is not None:
+            pipeline = self.backend.pipeline()
+            for index in range(len(manifest["checksums"])):
+                pipeline.ttl(chunk_key(key, manifest["version"], index))
+            if -2 in await self._run(pipeline.execute):
+                raise ChunkedValueError(f"Chunks of {key} are missing")
+
+        async def pieces() -> AsyncIterator[str]:
+            if manifest is None:
+                yield value
+            else:
+                async for chunk in self._iter_chunks(key, manifest):
+                    yield chunk
+
+        async def generate() -> AsyncIterator[bytes]:
+            inflater = zlib.decompressobj() if decompress else None
+            async for piece in pieces():
+                if inflater is None:
+                    yield piece.encode("utf-8")
+                else:
+                    yield await cpu_executor.run(inflater.decompress, base64.b64decode(piece))
+            if inflater is not None:
+                yield inflater.flush()
+
+        return generate()
+
+    async def set_if_absent(self, key: str, value: Any, ttl: int = 86400) -> Optional[bool]:
+        """
+        Atomically set key unless it exists (SET NX); True if it was set, False if it already
+        existed, None if the store could not be reached.
+        """
+        try:
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            return bool(await self._run(self.backend.set, key, value, ttl=ttl, nx=True))
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return None
+
     async def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
         """Increment a counter in Redis"""
-        print("entered redis increment")
         try:
-            # Using synchronous Redis client
-            if amount == 1:
-                current = self.redis.incr(key)
-            else:
-                current = self.redis.incrby(key, amount)
-
-            # ALWAYS set expiration if TTL is provided (not just on first increment)
-            if ttl is not None:
-                self.redis.expire(key, ttl)
+            if ttl is None:
+                return await self._run(self.backend.incr, key, amount)
 
+            # ALWAYS set expiration if TTL is provided (not just on first increment),
+            # pipelined so the counter update costs a single round trip
+            current, _ = await self._run(self.backend.pipeline().incr(key, amount).expire(key, ttl).execute)
             return current
         except Exception as e:
             print(f"Redis error: {str(e)}")
             return 0
 
+    async def exists(self, key: str, local: bool = False) -> bool:
+        """Whether key is stored (and not expired); with local the node's disk cache counts as well"""
+        if local and await self._get_local(key) is not None:
+            return True
+        try:
+            return await self._run(self.backend.ttl, key) != -2
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return False
+
+    async def ttl(self, key: str) -> Optional[int]:
+        """Seconds until key expires (-1 without expiry, -2 if not stored), None on errors"""
+        try:
+            return await self._run(self.backend.ttl, key)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return None
+
+    async def scan(self, pattern: str) -> List[str]:
+        """Keys matching a glob-style pattern (the whole SCAN runs in the storage pool), [] on errors"""
+        try:
+            return await self._run(lambda: list(self.backend.scan(pattern)))
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return []
+
+    async def delete(self, *keys: str) -> int:
+        """Delete keys from Redis and the node's disk cache"""
+        if disk_cache is not None:
+            try:
+                await storage_executor.run(disk_cache.delete, *keys)
+            except Exception as e:
+                print(f"Disk cache error: {str(e)}")
+        try:
+            return await self._run(self.backend.delete, *keys)
+        except Exception as e:
+            print(f"Redis error: {str(e)}")
+            return 0
+
     async def get_status(self, request_id: str) -> Dict[str, Any]:
         """Get processing status for a request"""
         status_key = f"status:{request_id}"
@@ -80,16 +432,18 @@ class RedisService:
         """Set processing status and broadcast to WebSocket clients"""
         status_key = f"status:{request_id}"
         result = await self.set(status_key, status, ttl)
+        self.publish_status(request_id, status)
+        return result
 
-        # Broadcast to WebSockets
+    @staticmethod
+    def publish_status(request_id: str, status: Dict[str, Any]) -> None:
+        """Broadcast a status update to WebSocket clients"""
         try:
             # Import here to avoid circular imports
             from app.api.routes.websocket import manager
-            # Use asyncio.create_task to avoid blocking
-            asyncio.create_task(manager.send_update(request_id, status))
+            # Hand the update to the WebSocket loop without blocking (jobs run on their own loops)
+            manager.publish(request_id, status)
         except Exception as e:
             print(f"Error broadcasting status update: {str(e)}")
             # Don't let broadcasting errors affect the main function
             pass
-
-        return result
@@ -0,0 +1,300 @@
+# app/services/search_index.py
+import math
+import os
+import pickle
+import threading
+from array import array
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.extractive_service import RE_TERM, STOPWORDS
+from app.services.index_snapshots import IndexSnapshots
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Each insights term counts this many times, as insights summarize what a video is about
+INSIGHTS_WEIGHT = 2
+# Segment index recorded for terms that occur in the insights only
+NO_SEGMENT = 0xFFFFFFFF
+# Rebuild the postings once this fraction of documents has been replaced
+COMPACT_RATIO = 0.25
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    terms = (term.strip("'") for term in RE_TERM.findall(text.lower()))
+    return [term for term in terms if len(term) > 1 and term not in STOPWORDS]
+
+
+class _Postings:
+    """
+    Postings of one term: ascending document ids stored as deltas, the weighted term
+    frequency per document, and per document the ascending segment indexes the term occurs
+    in, also as deltas, in one flat array.
+    """
+
+    __slots__ = ("doc_deltas", "tfs", "segment_counts", "segment_deltas", "last_doc")
+
+    def __init__(self):
+        self.doc_deltas = array("I")
+        self.tfs = array("I")
+        self.segment_counts = array("I")
+        self.segment_deltas = array("I")
+        self.last_doc = 0
+
+    def append(self, doc_id: int, tf: int, segments: List[int]) -> None:
+        self.doc_deltas.append(doc_id - self.last_doc)
+        self.last_doc = doc_id
+        self.tfs.append(tf)
+        self.segment_counts.append(len(segments))
+        previous = 0
+        for segment in segments:
+            self.segment_deltas.append(segment - previous)
+            previous = segment
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int, int]]:
+        """(doc_id, tf, segment offset, segment count) per document"""
+        doc_id = 0
+        offset = 0
+        for delta, tf, count in zip(self.doc_deltas, self.tfs, self.segment_counts):
+            doc_id += delta
+            yield doc_id, tf, offset, count
+            offset += count
+
+    def segments(self, offset: int, count: int) -> List[int]:
+        result = []
+        segment = 0
+        for delta in self.segment_deltas[offset:offset + count]:
+            segment += delta
+            result.append(segment)
+        return result
+
+
+class SearchIndex:
+    """
+    Incrementally maintained inverted index with BM25 ranking over the transcripts and
+    insights of processed videos, one document per video.
+
+    Jobs add their video when they finish; a video processed again replaces its previous
+    document, whose postings are dropped at the next compaction. Postings record the
+    caption segments each term occurs in, so a hit links to the segment where most query
+    terms occur. Queries only touch the postings of their terms.
+
+    The index lives in this process; IndexSnapshots keeps one snapshot per worker next to
+    SEARCH_INDEX_PATH and merges the documents of the other workers into it.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, _Postings] = {}
+        # Per document: video_id, request_id, length in weighted terms, segment start times
+        self._videos: List[Optional[str]] = []
+        self._requests: List[str] = []
+        self._lengths = array("I")
+        self._segment_starts: List[array] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._total_length = 0
+        # Changed since the last snapshot
+        self.dirty = False
+
+    @property
+    def size(self) -> int:
+        return len(self._doc_ids)
+
+    def add(self, video_id: str, request_id: str, segments: List[Tuple[float, str]],
+            insights: Optional[str] = None) -> None:
+        """Index a video from its (start seconds, text) caption segments and insights"""
+        # Tokenize outside the lock so queries are not held up
+        frequencies: Counter = Counter()
+        term_segments: Dict[str, List[int]] = defaultdict(list)
+        for index, (_, text) in enumerate(segments):
+            for term in tokenize(text):
+                frequencies[term] += 1
+                positions = term_segments[term]
+                if not positions or positions[-1] != index:
+                    positions.append(index)
+        if insights:
+            for term in tokenize(insights):
+                frequencies[term] += INSIGHTS_WEIGHT
+        starts = array("d", (start for start, _ in segments))
+        length = sum(frequencies.values())
+
+        with self._lock:
+            self._remove(video_id)
+            doc_id = len(self._videos)
+            self._videos.append(video_id)
+            self._requests.append(request_id)
+            self._lengths.append(length)
+            self._segment_starts.append(starts)
+            self._doc_ids[video_id] = doc_id
+            self._total_length += length
+
+            for term, tf in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.append(doc_id, tf, term_segments.get(term) or [NO_SEGMENT])
+            self.dirty = True
+
+            if len(self._videos) - len(self._doc_ids) > COMPACT_RATIO * len(self._videos):
+                self._compact()
+
+    def _remove(self, video_id: str) -> None:
+        doc_id = self._doc_ids.pop(video_id, None)
+        if doc_id is not None:
+            self._videos[doc_id] = None
+            self._total_length -= self._lengths[doc_id]
+
+    def _compact(self) -> None:
+        """Rebuild postings and document ids without replaced documents"""
+        remap = {}
+        for doc_id, video_id in enumerate(self._videos):
+            if video_id is not None:
+                remap[doc_id] = len(remap)
+
+        postings = {}
+        for term, old in self._postings.items():
+            new = _Postings()
+            for doc_id, tf, offset, count in old:
+                if doc_id in remap:
+                    new.append(remap[doc_id], tf, old.segments(offset, count))
+            if new.tfs:
+                postings[term] = new
+        self._postings = postings
+
+        kept = sorted(remap)
+        self._videos = [self._videos[doc_id] for doc_id in kept]
+        self._requests = [self._requests[doc_id] for doc_id in kept]
+        self._lengths = array("I", (self._lengths[doc_id] for doc_id in kept))
+        self._segment_starts = [self._segment_starts[doc_id] for doc_id in kept]
+        self._doc_ids = {video_id: doc_id for doc_id, video_id in enumerate(self._videos)}
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top videos for query by BM25, each with the start time of its best matching segment"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            documents = len(self._doc_ids)
+            if not documents:
+                return []
+            average_length = self._total_length / documents or 1.0
+
+            scores: Dict[int, float] = defaultdict(float)
+            matches: Dict[int, List[Tuple[str, int, int]]] = defaultdict(list)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                live = [entry for entry in postings if self._videos[entry[0]] is not None]
+                idf = math.log(1 + (documents - len(live) + 0.5) / (len(live) + 0.5))
+                for doc_id, tf, offset, count in live:
+                    norm = K1 * (1 - B + B * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+                    matches[doc_id].append((term, offset, count))
+
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            results = []
+            for doc_id, score in top:
+                segment_hits: Counter = Counter()
+                for term, offset, count in matches[doc_id]:
+                    segment_hits.update(
+                        segment for segment in self._postings[term].segments(offset, count) if segment != NO_SEGMENT
+                    )
+                start = None
+                if segment_hits:
+                    # The segment with the most query terms, the earliest on ties
+                    best = min(segment_hits, key=lambda segment: (-segment_hits[segment], segment))
+                    start = self._segment_starts[doc_id][best]
+                results.append({
+                    "video_id": self._videos[doc_id],
+                    "request_id": self._requests[doc_id],
+                    "score": round(score, 4),
+                    "start": start,
+                    "matched_terms": [term for term, _, _ in matches[doc_id]]
+                })
+            return results
+
+    def save(self, path: str) -> None:
+        """Write a snapshot of the index (atomically replacing path)"""
+        with self._lock:
+            state = {
+                "version": INDEX_VERSION,
+                "postings": self._postings,
+                "videos": self._videos,
+                "requests": self._requests,
+                "lengths": self._lengths,
+                "segment_starts": self._segment_starts,
+                "total_length": self._total_length
+            }
+            temporary = f"{path}.tmp"
+            with open(temporary, "wb") as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self.dirty = False
+
+    def merge(self, path: str) -> int:
+        """Add the documents of the snapshot at path whose videos are not indexed yet; returns their number"""
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+        if state.get("version") != INDEX_VERSION:
+            return 0
+
+        with self._lock:
+            # New document ids follow the existing ones, so the postings stay in ascending order
+            remap = {}
+            for doc_id, video_id in enumerate(state["videos"]):
+                if video_id is None or video_id in self._doc_ids:
+                    continue
+                remap[doc_id] = len(self._videos)
+                self._doc_ids[video_id] = len(self._videos)
+                self._videos.append(video_id)
+                self._requests.append(state["requests"][doc_id])
+                self._lengths.append(state["lengths"][doc_id])
+                self._segment_starts.append(state["segment_starts"][doc_id])
+                self._total_length += state["lengths"][doc_id]
+            if not remap:
+                return 0
+
+            for term, merged in state["postings"].items():
+                postings = self._postings.get(term)
+                for doc_id, tf, offset, count in merged:
+                    if doc_id in remap:
+                        if postings is None:
+                            postings = self._postings[term] = _Postings()
+                        postings.append(remap[doc_id], tf, merged.segments(offset, count))
+            self.dirty = True
+        return len(remap)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._doc_ids),
+                "terms": len(self._postings),
+                "postings_bytes": sum(
+                    sum(len(values) * values.itemsize for values in
+                        (postings.doc_deltas, postings.tfs, postings.segment_counts, postings.segment_deltas))
+                    for postings in self._postings.values()
+                )
+            }
+
+
+search_index = SearchIndex()
+_snapshots = IndexSnapshots(search_index, settings.SEARCH_INDEX_PATH, "search index") \
+    if settings.SEARCH_INDEX_PATH else None
+
+
+def save_search_index() -> None:
+    if _snapshots:
+        _snapshots.sync()
+
+
+def load_search_index() -> None:
+    if _snapshots:
+        try:
+            _snapshots.load()
+        except Exception as e:
+            print(f"Error loading search index: {str(e)}")
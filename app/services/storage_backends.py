@@ -0,0 +1,328 @@
+# app/services/storage_backends.py
+import fnmatch
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class StoragePipeline:
+    """
+    Queues storage commands and sends them in one batch.
+
+    Commands are recorded in backend-neutral form and replayed by execute(); backends
+    with a native pipeline (Upstash REST, Redis protocol) override execute() so the
+    whole batch costs one round trip.
+    """
+
+    def __init__(self, backend: "StorageBackend", transaction: bool = False):
+        self._backend = backend
+        self._transaction = transaction
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def get(self, key: str) -> "StoragePipeline":
+        self._commands.append(("get", (key,), {}))
+        return self
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> "StoragePipeline":
+        self._commands.append(("set", (key, value), {"ttl": ttl, "nx": nx}))
+        return self
+
+    def incr(self, key: str, amount: int = 1) -> "StoragePipeline":
+        self._commands.append(("incr", (key, amount), {}))
+        return self
+
+    def expire(self, key: str, ttl: int) -> "StoragePipeline":
+        self._commands.append(("expire", (key, ttl), {}))
+        return self
+
+    def ttl(self, key: str) -> "StoragePipeline":
+        self._commands.append(("ttl", (key,), {}))
+        return self
+
+    def delete(self, *keys: str) -> "StoragePipeline":
+        self._commands.append(("delete", keys, {}))
+        return self
+
+    def execute(self) -> List[Any]:
+        """Run the queued commands, returning one result per command"""
+        commands, self._commands = self._commands, []
+        return [getattr(self._backend, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class StorageBackend(ABC):
+    """Key-value operations RedisService needs from its store"""
+
+    # Operations do network I/O; RedisService runs them in a worker thread
+    blocking = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def mget(self, *keys: str) -> List[Optional[str]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        """Set a value with an optional TTL in seconds; with nx only if the key does not exist"""
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        ...
+
+    @abstractmethod
+    def expire(self, key: str, ttl: int) -> bool:
+        ...
+
+    @abstractmethod
+    def ttl(self, key: str) -> int:
+        """Seconds until the key expires, -1 without expiry, -2 if it does not exist"""
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> int:
+        ...
+
+    @abstractmethod
+    def scan(self, pattern: str, count: int = 500) -> Iterator[str]:
+        """Iterate over keys matching a glob-style pattern"""
+        ...
+
+    def pipeline(self, transaction: bool = False) -> StoragePipeline:
+        return StoragePipeline(self, transaction)
+
+
+class _ClientPipeline(StoragePipeline):
+    """Pipeline for clients exposing the redis-py command names (upstash-redis and redis-py)"""
+
+    def __init__(self, backend: "StorageBackend", native_pipeline):
+        super().__init__(backend)
+        self._native = native_pipeline
+
+    def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        if not commands:
+            return []
+
+        for name, args, kwargs in commands:
+            if name == "set":
+                self._native.set(args[0], args[1], ex=kwargs["ttl"], nx=kwargs["nx"] or None)
+            elif name == "incr":
+                self._native.incrby(*args)
+            else:
+                getattr(self._native, name)(*args)
+
+        results = self._native.exec() if hasattr(self._native, "exec") else self._native.execute()
+        return [
+            bool(result) if name in ("set", "expire") else result
+            for (name, _, _), result in zip(commands, results)
+        ]
+
+
+class UpstashBackend(StorageBackend):
+    """Upstash REST API backend (every command is an HTTPS request)"""
+
+    def __init__(self, url: str, token: str):
+        from upstash_redis import Redis
+
+        # The client has no timeout option; RedisService bounds each call by STORAGE_TIMEOUT
+        self.client = Redis(url=url, token=token)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def mget(self, *keys: str) -> List[Optional[str]]:
+        return self.client.mget(*keys) if keys else []
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(self.client.set(key, value, ex=ttl, nx=nx or None))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return self.client.incr(key) if amount == 1 else self.client.incrby(key, amount)
+
+    def expire(self, key: str, ttl: int) -> bool:
+        return bool(self.client.expire(key, ttl))
+
+    def ttl(self, key: str) -> int:
+        return self.client.ttl(key)
+
+    def delete(self, *keys: str) -> int:
+        return self.client.delete(*keys) if keys else 0
+
+    def scan(self, pattern: str, count: int = 500) -> Iterator[str]:
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor, match=pattern, count=count)
+            yield from keys
+            if int(cursor) == 0:
+                break
+
+    def pipeline(self, transaction: bool = False) -> StoragePipeline:
+        return _ClientPipeline(self, self.client.multi() if transaction else self.client.pipeline())
+
+
+class RedisBackend(StorageBackend):
+    """Standard Redis protocol backend with a shared connection pool"""
+
+    def __init__(self, url: str, max_connections: int, timeout: Optional[float] = None):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=redis requires the redis package (pip install redis)")
+
+        self.pool = redis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            # Max seconds to wait for a free pooled connection
+            timeout=timeout
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def mget(self, *keys: str) -> List[Optional[str]]:
+        return self.client.mget(keys) if keys else []
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(self.client.set(key, value, ex=ttl, nx=nx))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return self.client.incrby(key, amount)
+
+    def expire(self, key: str, ttl: int) -> bool:
+        return bool(self.client.expire(key, ttl))
+
+    def ttl(self, key: str) -> int:
+        return self.client.ttl(key)
+
+    def delete(self, *keys: str) -> int:
+        return self.client.delete(*keys) if keys else 0
+
+    def scan(self, pattern: str, count: int = 500) -> Iterator[str]:
+        return self.client.scan_iter(match=pattern, count=count)
+
+    def pipeline(self, transaction: bool = False) -> StoragePipeline:
+        return _ClientPipeline(self, self.client.pipeline(transaction=transaction))
+
+
+class MemoryBackend(StorageBackend):
+    """
+    In-process backend with TTL eviction.
+
+    Expired keys are dropped lazily on access and by a periodic sweep. Data is local to
+    the worker process, so use it for single-worker deployments, tests and benchmarks.
+    """
+
+    # Run a sweep of expired keys after this many writes
+    SWEEP_EVERY = 1000
+    blocking = False
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.RLock()
+        self._writes = 0
+
+    def _live(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def _write(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        self._data[key] = (value, expires_at)
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            now = time.monotonic()
+            for expired in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+                del self._data[expired]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[0]
+
+    def mget(self, *keys: str) -> List[Optional[str]]:
+        with self._lock:
+            return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> bool:
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return False
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._write(key, str(value), expires_at)
+            return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._live(key)
+            current = int(entry[0]) + amount if entry is not None else amount
+            self._write(key, str(current), entry[1] if entry is not None else None)
+            return current
+
+    def expire(self, key: str, ttl: int) -> bool:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return False
+            self._data[key] = (entry[0], time.monotonic() + ttl)
+            return True
+
+    def ttl(self, key: str) -> int:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(0, int(entry[1] - time.monotonic()))
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._live(key) is not None and self._data.pop(key, None) is not None)
+
+    def scan(self, pattern: str, count: int = 500) -> Iterator[str]:
+        with self._lock:
+            keys = [key for key in list(self._data) if fnmatch.fnmatchcase(key, pattern) and self._live(key)]
+        return iter(keys)
+
+    def pipeline(self, transaction: bool = False) -> StoragePipeline:
+        # Commands replay under the lock, so a memory pipeline is always atomic
+        return _MemoryPipeline(self, transaction)
+
+
+class _MemoryPipeline(StoragePipeline):
+    def execute(self) -> List[Any]:
+        with self._backend._lock:
+            return super().execute()
+
+
+def create_backend() -> StorageBackend:
+    """Build the backend selected by STORAGE_BACKEND"""
+    backend = settings.STORAGE_BACKEND.lower()
+
+    if backend == "upstash":
+        if not settings.UPSTASH_REDIS_URL or not settings.UPSTASH_REDIS_TOKEN:
+            raise ValueError("STORAGE_BACKEND=upstash requires UPSTASH_REDIS_URL and UPSTASH_REDIS_TOKEN")
+        return UpstashBackend(settings.UPSTASH_REDIS_URL, settings.UPSTASH_REDIS_TOKEN)
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("STORAGE_BACKEND=redis requires REDIS_URL")
+        return RedisBackend(settings.REDIS_URL, settings.REDIS_MAX_CONNECTIONS, settings.STORAGE_TIMEOUT)
+    if backend == "memory":
+        return MemoryBackend()
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
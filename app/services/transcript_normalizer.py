@@ -0,0 +1,97 @@
+# app/services/transcript_normalizer.py
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+from app.services.model_router import CHARS_PER_TOKEN, estimate_tokens
+
+# Non-speech cues in auto-generated captions: [Music], [Applause], (laughs), ♪ ...
+RE_NON_SPEECH = re.compile(r"\[[^\]]{0,40}\]|\((?:music|applause|laughs?|laughter|inaudible|silence)\)|[♪♫]+", re.I)
+RE_WHITESPACE = re.compile(r"\s+")
+RE_FILLERS = re.compile(r"\b(?:um+|uh+|uhm+|erm+|er|ah+|hmm+|mm+)\b[,.]?\s*", re.I)
+
+# Words of already emitted text compared against the start of each new segment
+OVERLAP_WINDOW = 30
+
+
+class TranscriptNormalizer:
+    """
+    Streaming clean-up of caption segments before they are sent to the LLM.
+
+    Removes the rolling duplicate fragments of auto-generated captions (a segment that
+    repeats the end of the previous one), non-speech markers, newline and whitespace noise
+    and, optionally, filler words. Segments are processed one at a time, so the stage can
+    sit directly behind the caption parser.
+    """
+
+    def __init__(self, drop_fillers: Optional[bool] = None, min_overlap: Optional[int] = None):
+        self.drop_fillers = settings.NORMALIZE_DROP_FILLERS if drop_fillers is None else drop_fillers
+        self.min_overlap = settings.NORMALIZE_MIN_OVERLAP if min_overlap is None else min_overlap
+        self._tail: List[str] = []
+
+    def clean(self, text: str) -> str:
+        """Per-segment clean-up without duplicate removal"""
+        text = RE_NON_SPEECH.sub(" ", text)
+        if self.drop_fillers:
+            text = RE_FILLERS.sub(" ", text)
+        return RE_WHITESPACE.sub(" ", text).strip()
+
+    def _strip_overlap(self, words: List[str]) -> List[str]:
+        """Drop the longest prefix of words that repeats the end of the emitted text"""
+        tail = [word.lower() for word in self._tail]
+        lowered = [word.lower() for word in words]
+        for size in range(min(len(tail), len(lowered)), 0, -1):
+            if size < self.min_overlap and size < len(lowered):
+                break
+            if tail[-size:] == lowered[:size]:
+                return words[size:]
+        return words
+
+    def feed(self, text: str) -> str:
+        """Normalize the next segment; returns the new text it contributes (possibly empty)"""
+        words = self.clean(text).split(" ") if text else []
+        words = [word for word in words if word]
+        if not words:
+            return ""
+
+        words = self._strip_overlap(words)
+        if not words:
+            return ""
+
+        self._tail = (self._tail + words)[-OVERLAP_WINDOW:]
+        return " ".join(words)
+
+    def stream(self, segments: Iterable[str]) -> Iterator[str]:
+        for segment in segments:
+            normalized = self.feed(segment)
+            if normalized:
+                yield normalized
+
+
+def normalize_transcript(segments: Iterable[str], drop_fillers: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Normalize caption segments into LLM input text.
+
+    Returns:
+        Dict with the normalized "text" and "stats" (estimated raw and normalized tokens and
+        the reduction ratio)
+    """
+    raw_chars = 0
+
+    def counted(items: Iterable[str]) -> Iterator[str]:
+        nonlocal raw_chars
+        for item in items:
+            raw_chars += len(item) + 1
+            yield item
+
+    text = " ".join(TranscriptNormalizer(drop_fillers=drop_fillers).stream(counted(segments)))
+    raw_tokens = max(0, raw_chars - 1) // CHARS_PER_TOKEN + 1
+    normalized_tokens = estimate_tokens(text)
+    return {
+        "text": text,
+        "stats": {
+            "raw_tokens": raw_tokens,
+            "normalized_tokens": normalized_tokens,
+            "reduction_ratio": round(1 - normalized_tokens / raw_tokens, 4) if raw_tokens else 0.0
+        }
+    }
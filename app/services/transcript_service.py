@@ -1,15 +1,279 @@
 # app/services/transcript_service.py
 
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
+from app.core.config import settings
 from app.core.exceptions import YouTubeTranscriptError
+from app.services import cpu_offload
+from app.services.executors import youtube_executor
+from app.services.redis_service import RedisService
+from app.utils.deadline import DeadlineExceeded
+from app.utils.timing import span
 from app.utils.youtube_transcript import (
+    TranscriptResponse,
     YoutubeTranscript,
     YoutubeTranscriptError as BaseYoutubeTranscriptError
 )
 
 
+def transcript_cache_key(video_id: str, lang: str = "en") -> str:
+    return f"cache:transcript:{video_id}:{lang}"
+
+
+def caption_manifest_key(video_id: str) -> str:
+    return f"cache:captions:{video_id}"
+
+
 class TranscriptService:
+    @staticmethod
+    def join_transcript(transcript_items: List[TranscriptResponse]) -> str:
+        """Join transcript items into plain text"""
+        return " ".join(item.text for item in transcript_items)
+
+    @staticmethod
+    def preferred_languages(languages: Optional[List[str]] = None) -> List[str]:
+        """The requested language preference list, or the configured default"""
+        return languages or settings.TRANSCRIPT_LANGUAGES
+
+    @staticmethod
+    async def _call(fn: Callable, *args) -> Any:
+        """Run a blocking YouTube call off the event loop, mapping errors to the API's exception"""
+        try:
+            # The fetch uses blocking HTTP; the YouTube pool keeps the loop responsive and lets
+            # the job deadline cancel the wait
+            return await youtube_executor.run(fn, *args)
+
+        except DeadlineExceeded:
+            raise
+        except BaseYoutubeTranscriptError as e:
+            # Map our custom exceptions to the API's exception
+            raise YouTubeTranscriptError(str(e))
+        except Exception as e:
+            raise YouTubeTranscriptError(f"Unexpected error: {str(e)}")
+
+    @staticmethod
+    async def get_manifest(video_id: str, refresh: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """
+        Caption-track manifest of the video ({title, tracks}, see YoutubeTranscript.fetch_manifest)
+        and whether it came from the cache. The watch page is only downloaded on a miss or with
+        refresh.
+        """
+        redis = RedisService()
+        key = caption_manifest_key(video_id)
+        if not refresh and settings.CAPTION_MANIFEST_TTL > 0:
+            with span("transcript.manifest_cache") as cache_span:
+                manifest = await redis.get(key, decompress=True, local=True)
+                cache_span.update(hit=bool(manifest))
+            if manifest:
+                return manifest, True
+
+        manifest = await TranscriptService._call(YoutubeTranscript().fetch_manifest, video_id)
+        if settings.CAPTION_MANIFEST_TTL > 0:
+            await redis.set(key, manifest, ttl=settings.CAPTION_MANIFEST_TTL, compress=True, local=True)
+        return manifest, False
+
+    @staticmethod
+    def select_track(manifest: Dict[str, Any], video_id: str, languages: List[str]) -> Dict[str, Any]:
+        """YoutubeTranscript.select_track, mapping errors to the API's exception"""
+        try:
+            return YoutubeTranscript.select_track(manifest, languages, video_id)
+        except BaseYoutubeTranscriptError as e:
+            raise YouTubeTranscriptError(str(e))
+
+    @staticmethod
+    async def resolve_track(video_id: str, languages: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+        """The best caption track for languages, the manifest it is from and whether that was cached"""
+        manifest, cached = await TranscriptService.get_manifest(video_id)
+        return TranscriptService.select_track(manifest, video_id, languages), manifest, cached
+
+    @staticmethod
+    async def _download(video_id: str, track: Dict[str, Any]) -> List[TranscriptResponse]:
+        youtube_transcript = YoutubeTranscript(parse_xml=cpu_offload.parse_transcript_xml)
+        return await TranscriptService._call(youtube_transcript.fetch_track, track, video_id)
+
+    @staticmethod
+    async def _fetch_track(
+            video_id: str,
+            languages: List[str],
+            resolved: Optional[Tuple[Dict[str, Any], Dict[str, Any], bool]] = None
+    ) -> Tuple[List[TranscriptResponse], str, str]:
+        """
+        Fetch the segments of the best caption track for languages (resolved already, if given
+        as returned by resolve_track), with the video title and track language.
+        """
+        track, manifest, cached = resolved or await TranscriptService.resolve_track(video_id, languages)
+        try:
+            transcript_items = await TranscriptService._download(video_id, track)
+        except YouTubeTranscriptError:
+            if not cached:
+                raise
+            # Caption URLs are signed and expire: a cached manifest gets one refresh
+            manifest, _ = await TranscriptService.get_manifest(video_id, refresh=True)
+            track = TranscriptService.select_track(manifest, video_id, languages)
+            transcript_items = await TranscriptService._download(video_id, track)
+        return transcript_items, manifest["title"], track["language_code"]
+
+    @staticmethod
+    async def _store(video_id: str, lang: str, transcript_items: List[TranscriptResponse]) -> None:
+        if settings.TRANSCRIPT_CACHE_TTL > 0 and transcript_items:
+            # Segments as [text, offset, duration] rows: compact JSON, rebuilt on read
+            await RedisService().set(
+                transcript_cache_key(video_id, lang),
+                {"segments": [[item.text, item.offset, item.duration] for item in transcript_items]},
+                ttl=settings.TRANSCRIPT_CACHE_TTL,
+                compress=True,
+                local=True
+            )
+
+    @staticmethod
+    async def is_cached(video_id: str, lang: str = "en") -> bool:
+        """Whether the video's caption segments are in the transcript cache"""
+        if settings.TRANSCRIPT_CACHE_TTL <= 0:
+            return False
+        return await RedisService().exists(transcript_cache_key(video_id, lang), local=True)
+
+    @staticmethod
+    async def get_cached_items(video_id: str, lang: str = "en") -> Optional[List[TranscriptResponse]]:
+        """Caption segments from the transcript cache, or None on a miss"""
+        if settings.TRANSCRIPT_CACHE_TTL <= 0:
+            return None
+        with span("transcript.cache") as cache_span:
+            cached = await RedisService().get(transcript_cache_key(video_id, lang), decompress=True, local=True)
+            cache_span.update(hit=bool(cached))
+        if not cached:
+            return None
+        return [
+            TranscriptResponse(text=text, offset=offset, duration=duration, lang=lang)
+            for text, offset, duration in cached["segments"]
+        ]
+
+    @staticmethod
+    async def fetch_transcript_items(video_id: str, lang: str = "en") -> List[TranscriptResponse]:
+        """
+        Fetches the caption segments of a YouTube video from YouTube and stores them in the
+        transcript cache, under the language of the track that matched lang.
+
+        Raises:
+            YouTubeTranscriptError: If transcript cannot be retrieved
+        """
+        transcript_items, _, track_lang = await TranscriptService._fetch_track(video_id, [lang])
+        await TranscriptService._store(video_id, track_lang, transcript_items)
+        return transcript_items
+
+    @staticmethod
+    async def get_preferred_items(
+            video_id: str,
+            languages: Optional[List[str]] = None
+    ) -> Tuple[List[TranscriptResponse], str, bool]:
+        """
+        Fetches the caption segments of the best track for a language preference list, from
+        the transcript cache when they were fetched before.
+
+        The cache of the first preference is checked directly; otherwise the track is picked
+        from the cached caption-track manifest, so only the captions themselves are downloaded.
+
+        Args:
+            video_id: YouTube video ID
+            languages: Language codes in order of preference ("*" for any), default
+                TRANSCRIPT_LANGUAGES
+
+        Returns:
+            Tuple of (transcript segments, language code of the track, whether they were cached)
+
+        Raises:
+            YouTubeTranscriptError: If transcript cannot be retrieved
+        """
+        languages = TranscriptService.preferred_languages(languages)
+        if languages[0] != "*":
+            transcript_items = await TranscriptService.get_cached_items(video_id, languages[0])
+            if transcript_items is not None:
+                return transcript_items, languages[0], True
+
+        resolved = await TranscriptService.resolve_track(video_id, languages)
+        track_lang = resolved[0]["language_code"]
+        if track_lang != languages[0]:
+            transcript_items = await TranscriptService.get_cached_items(video_id, track_lang)
+            if transcript_items is not None:
+                return transcript_items, track_lang, True
+
+        transcript_items, _, track_lang = await TranscriptService._fetch_track(video_id, languages, resolved)
+        await TranscriptService._store(video_id, track_lang, transcript_items)
+        return transcript_items, track_lang, False
+
+    @staticmethod
+    async def get_transcript_items(video_id: str, lang: str = "en") -> List[TranscriptResponse]:
+        """
+        Fetches the caption segments of a YouTube video, from the transcript cache when
+        they were fetched before.
+
+        Args:
+            video_id: YouTube video ID
+            lang: Language code (default: "en")
+
+        Returns:
+            List of transcript segments
+
+        Raises:
+            YouTubeTranscriptError: If transcript cannot be retrieved
+        """
+        transcript_items, _, _ = await TranscriptService.get_preferred_items(video_id, [lang])
+        return transcript_items
+
+    @staticmethod
+    async def get_transcripts(
+            video_id: str,
+            languages: List[str]
+    ) -> Tuple[Dict[str, List[TranscriptResponse]], List[str]]:
+        """
+        Fetches the caption segments of several languages of a YouTube video at once: cached
+        languages come from the transcript cache, the others are downloaded concurrently using
+        one caption-track manifest.
+
+        Args:
+            video_id: YouTube video ID
+            languages: Language codes
+
+        Returns:
+            Tuple of (segments per requested language, requested languages the video has no
+            track for)
+
+        Raises:
+            YouTubeTranscriptError: If the manifest or a track cannot be retrieved
+        """
+        languages = list(dict.fromkeys(languages))
+        cached = await asyncio.gather(*(TranscriptService.get_cached_items(video_id, lang) for lang in languages))
+        transcripts = {lang: items for lang, items in zip(languages, cached) if items is not None}
+        pending = [lang for lang in languages if lang not in transcripts]
+        if not pending:
+            return transcripts, []
+
+        manifest, cached = await TranscriptService.get_manifest(video_id)
+        missing = []
+        for lang in pending:
+            try:
+                TranscriptService.select_track(manifest, video_id, [lang])
+            except YouTubeTranscriptError:
+                missing.append(lang)
+        pending = [lang for lang in pending if lang not in missing]
+
+        async def fetch(lang: str, tracks_manifest: Dict[str, Any]) -> None:
+            track = TranscriptService.select_track(tracks_manifest, video_id, [lang])
+            transcript_items = await TranscriptService._download(video_id, track)
+            await TranscriptService._store(video_id, track["language_code"], transcript_items)
+            transcripts[lang] = transcript_items
+
+        results = await asyncio.gather(*(fetch(lang, manifest) for lang in pending), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for error in errors:
+            if not isinstance(error, YouTubeTranscriptError) or not cached:
+                raise error
+        if errors:
+            # Caption URLs are signed and expire: a cached manifest gets one refresh
+            manifest, _ = await TranscriptService.get_manifest(video_id, refresh=True)
+            await asyncio.gather(*(fetch(lang, manifest) for lang in pending if lang not in transcripts))
+        return {lang: transcripts[lang] for lang in languages if lang in transcripts}, missing
+
     @staticmethod
     async def get_transcript(video_id: str, lang: str = "en") -> str:
         """
@@ -25,21 +289,11 @@ class TranscriptService:
         Raises:
             YouTubeTranscriptError: If transcript cannot be retrieved
         """
-        try:
-            youtube_transcript = YoutubeTranscript()
-            transcript_items, video_title = youtube_transcript.fetch_transcript(video_id, lang)
+        transcript_items = await TranscriptService.get_transcript_items(video_id, lang)
 
-            # Convert transcript items to plain text
-            text_parts = [item.text for item in transcript_items]
-            text_transcript = " ".join(text_parts)
-
-            return text_transcript
-
-        except BaseYoutubeTranscriptError as e:
-            # Map our custom exceptions to the API's exception
-            raise YouTubeTranscriptError(str(e))
-        except Exception as e:
-            raise YouTubeTranscriptError(f"Unexpected error: {str(e)}")
+        # Convert transcript items to plain text
+        with span("transcript.join"):
+            return TranscriptService.join_transcript(transcript_items)
 
     @staticmethod
     async def get_transcript_with_timing(video_id: str, lang: str = "en") -> List[Dict[str, Any]]:
@@ -56,26 +310,18 @@ class TranscriptService:
         Raises:
             YouTubeTranscriptError: If transcript cannot be retrieved
         """
-        try:
-            youtube_transcript = YoutubeTranscript()
-            transcript_items, video_title = youtube_transcript.fetch_transcript(video_id, lang)
-
-            # Convert transcript items to dictionary format
-            result = []
-            for item in transcript_items:
-                result.append({
-                    "text": item.text,
-                    "start": item.offset,
-                    "duration": item.duration
-                })
+        transcript_items = await TranscriptService.get_transcript_items(video_id, lang)
 
-            return result
+        # Convert transcript items to dictionary format
+        result = []
+        for item in transcript_items:
+            result.append({
+                "text": item.text,
+                "start": item.offset,
+                "duration": item.duration
+            })
 
-        except BaseYoutubeTranscriptError as e:
-            # Map our custom exceptions to the API's exception
-            raise YouTubeTranscriptError(str(e))
-        except Exception as e:
-            raise YouTubeTranscriptError(f"Unexpected error: {str(e)}")
+        return result
 
     @staticmethod
     async def get_transcript_and_title(video_id: str, lang: str = "en") -> Dict[str, Any]:
@@ -92,21 +338,12 @@ class TranscriptService:
         Raises:
             YouTubeTranscriptError: If transcript cannot be retrieved
         """
-        try:
-            youtube_transcript = YoutubeTranscript()
-            transcript_items, video_title = youtube_transcript.fetch_transcript(video_id, lang)
-
-            # Convert transcript items to plain text
-            text_parts = [item.text for item in transcript_items]
-            text_transcript = " ".join(text_parts)
+        transcript_items, video_title, _ = await TranscriptService._fetch_track(video_id, [lang])
 
-            return {
-                "transcript": text_transcript,
-                "title": video_title
-            }
+        # Convert transcript items to plain text
+        text_transcript = TranscriptService.join_transcript(transcript_items)
 
-        except BaseYoutubeTranscriptError as e:
-            # Map our custom exceptions to the API's exception
-            raise YouTubeTranscriptError(str(e))
-        except Exception as e:
-            raise YouTubeTranscriptError(f"Unexpected error: {str(e)}")
+        return {
+            "transcript": text_transcript,
+            "title": video_title
+        }
@@ -0,0 +1,200 @@
+# app/services/trending_service.py
+import hashlib
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Count-Min sketch dimensions: counts are overestimated by at most e / WIDTH of all requests
+# with probability 1 - e^-DEPTH (64 KiB of float32)
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+# HyperLogLog registers per trending video (2^precision bytes, standard error 1.04 / sqrt(registers))
+HLL_PRECISION = 8
+# The lazily pruned top-K heap is rebuilt once it holds this many entries per tracked video
+HEAP_SLACK = 4
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class CountMinSketch:
+    """Approximate per-key counts in fixed memory, with conservative updates and decay"""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self._counts = np.zeros((depth, width), dtype=np.float32)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key: str) -> np.ndarray:
+        # Double hashing: row i uses h1 + i * h2
+        value = _hash(key)
+        first, second = value >> 32, (value & 0xFFFFFFFF) | 1
+        return (first + self._rows * second) % self.width
+
+    def add(self, key: str, amount: float = 1.0) -> float:
+        """Count key and return its new estimate"""
+        columns = self._columns(key)
+        cells = self._counts[self._rows, columns]
+        # Conservative update: only the cells at the minimum grow, which reduces overestimation
+        estimate = float(cells.min()) + amount
+        self._counts[self._rows, columns] = np.maximum(cells, estimate)
+        return estimate
+
+    def estimate(self, key: str) -> float:
+        return float(self._counts[self._rows, self._columns(key)].min())
+
+    def decay(self, factor: float) -> None:
+        self._counts *= factor
+
+    @property
+    def nbytes(self) -> int:
+        return self._counts.nbytes
+
+
+class HyperLogLog:
+    """Approximate number of distinct values in 2^precision bytes"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        hashed = _hash(value)
+        register = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self._registers[register]:
+            self._registers[register] = rank
+
+    def count(self) -> int:
+        registers = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        estimate = alpha * registers * registers / sum(2.0 ** -rank for rank in self._registers)
+        empty = self._registers.count(0)
+        if estimate <= 2.5 * registers and empty:
+            # Linear counting is more accurate for small cardinalities
+            estimate = registers * np.log(registers / empty)
+        return int(round(estimate))
+
+
+class _Trend:
+    __slots__ = ("count", "model", "clients", "since")
+
+    def __init__(self, count: float, model: Optional[str]):
+        self.count = count
+        self.model = model
+        self.clients = HyperLogLog()
+        self.since = time.time()
+
+
+class TrendingTracker:
+    """
+    Heavy hitters among requested videos, kept in fixed memory.
+
+    Every request is counted in a Count-Min sketch; the TRENDING_TOP_K videos with the highest
+    estimates are kept in a min-heap (pruned lazily) together with the last requested model and
+    a HyperLogLog of the distinct clients requesting them since they entered the top-K. Counts
+    decay with a half-life of TRENDING_HALF_LIFE seconds, so the top-K follows current demand.
+
+    Like the search index, the sketches are per process: each worker tracks its own traffic.
+    """
+
+    def __init__(self, capacity: int, half_life: float):
+        self.capacity = capacity
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._sketch = CountMinSketch()
+        self._top: Dict[str, _Trend] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._clients = HyperLogLog(precision=12)
+        self._total = 0.0
+        self._decayed_at = time.monotonic()
+
+    def _minimum(self) -> Tuple[float, str]:
+        """Lowest count in the top-K (lock held, top-K full)"""
+        while True:
+            count, video_id = self._heap[0]
+            trend = self._top.get(video_id)
+            if trend is not None and trend.count == count:
+                return count, video_id
+            heapq.heappop(self._heap)
+
+    def _push(self, video_id: str, count: float) -> None:
+        heapq.heappush(self._heap, (count, video_id))
+        if len(self._heap) > HEAP_SLACK * max(1, self.capacity):
+            self._heap = [(trend.count, other) for other, trend in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def record(self, video_id: str, client: str, model: Optional[str] = None) -> None:
+        """Count a request for video_id by client (for insights of model, if any)"""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            count = self._sketch.add(video_id)
+            self._total += 1
+            self._clients.add(client)
+
+            trend = self._top.get(video_id)
+            if trend is None:
+                if len(self._top) >= self.capacity:
+                    lowest, evicted = self._minimum()
+                    if count <= lowest:
+                        return
+                    heapq.heappop(self._heap)
+                    del self._top[evicted]
+                trend = self._top[video_id] = _Trend(count, model)
+            trend.count = count
+            if model:
+                trend.model = model
+            trend.clients.add(client)
+            self._push(video_id, count)
+
+    def decay(self) -> None:
+        """Apply the half-life decay for the time since the last call"""
+        with self._lock:
+            now = time.monotonic()
+            if self.half_life <= 0:
+                return
+            factor = 0.5 ** ((now - self._decayed_at) / self.half_life)
+            self._decayed_at = now
+            self._sketch.decay(factor)
+            self._total *= factor
+            for trend in self._top.values():
+                trend.count *= factor
+            self._heap = [(trend.count, video_id) for video_id, trend in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """The limit most requested videos, highest (decayed) request count first"""
+        with self._lock:
+            ranked = heapq.nlargest(limit, self._top.items(), key=lambda item: item[1].count)
+            return [
+                {
+                    "video_id": video_id,
+                    "requests": round(trend.count, 2),
+                    "unique_clients": trend.clients.count(),
+                    "model": trend.model,
+                    "trending_since": trend.since
+                }
+                for video_id, trend in ranked
+            ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked": len(self._top),
+                "requests": round(self._total, 2),
+                "unique_clients": self._clients.count(),
+                "sketch_bytes": self._sketch.nbytes,
+                "half_life": self.half_life
+            }
+
+
+trending_tracker = TrendingTracker(settings.TRENDING_TOP_K, settings.TRENDING_HALF_LIFE)
@@ -0,0 +1,69 @@
+# app/services/write_buffer.py
+import asyncio
+import contextvars
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.redis_service import RedisService
+
+# Statuses after which a job no longer changes
+TERMINAL_STATUSES = {"completed", "partial_success", "failed", "timed_out", "cancelled"}
+
+
+class JobWriteBuffer:
+    """
+    Write-behind buffer for the status and result writes of one combined job.
+
+    Writes to the same key within WRITE_BEHIND_DELAY seconds are coalesced (the last one
+    wins) and everything pending is flushed as one transaction pipeline. A terminal status
+    flushes at once, together with whatever is pending. Status updates are broadcast to
+    WebSocket clients immediately; only storing them is deferred.
+
+    Created on the job's event loop outside of the job deadline: buffered writes are
+    bounded by STORAGE_TIMEOUT only, so the final status is stored even after a timeout.
+    """
+
+    def __init__(self, redis_service: RedisService):
+        self.redis = redis_service
+        self._pending: Dict[str, Tuple[Any, int, bool]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Delayed flushes run in the context the buffer was created in
+        self._context = contextvars.copy_context()
+
+    async def set(self, key: str, value: Any, ttl: int = 86400, compress: bool = False) -> None:
+        """Queue a RedisService.set"""
+        self._pending[key] = (value, ttl, compress)
+        if settings.WRITE_BEHIND_DELAY <= 0:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = self._context.run(asyncio.ensure_future, self._flush_later())
+
+    async def set_status(self, request_id: str, status: Dict[str, Any], ttl: int = 7200) -> None:
+        """Queue a RedisService.set_status; a terminal status is stored before this returns"""
+        self.redis.publish_status(request_id, status)
+        await self.set(f"status:{request_id}", status, ttl)
+        if status.get("status") in TERMINAL_STATUSES:
+            await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(settings.WRITE_BEHIND_DELAY)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> bool:
+        """Store everything pending in one pipeline"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            if not self._pending:
+                return True
+            pending, self._pending = self._pending, {}
+            stored = await self.redis.set_many([
+                (key, value, ttl, compress) for key, (value, ttl, compress) in pending.items()
+            ])
+            if not stored:
+                print(f"Error storing buffered writes: {', '.join(pending)}")
+            return stored
@@ -1,28 +1,41 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.checkpoint_service import INSIGHTS, NORMALIZED, TRANSCRIPT, CheckpointService, insights_key, \
+    normalized_key
+from app.services.duplicate_index import save_duplicate_index
+from app.services.executors import cpu_executor
+from app.services.extractive_service import EXTRACTIVE_MODEL
+from app.services.insights_service import InsightsService
 from app.services.redis_service import RedisService
+from app.services.search_index import save_search_index
+from app.services.transcript_normalizer import normalize_transcript
+from app.services.transcript_service import TranscriptService, transcript_cache_key
+from app.services.trending_service import trending_tracker
 
 
 async def reset_rate_limits():
     """Reset all rate limit counters at the start of each hour"""
     redis = RedisService()
     # Delete all rate limit keys
-    keys = redis.redis.keys("ratelimit:*")
+    keys = await redis.scan("ratelimit:*")
     if keys:
-        redis.redis.delete(*keys)
+        await redis.delete(*keys)
     print(f"[{datetime.utcnow()}] Reset all rate limit counters")
 
 
-async def schedule_tasks():
-    """Schedule periodic tasks"""
+async def reset_rate_limits_hourly():
+    """Reset rate limits at the start of every hour"""
     while True:
         # Get current time
         now = datetime.utcnow()
         # Calculate seconds until the start of the next hour
         next_hour = now.replace(minute=0, second=0, microsecond=0)
         if next_hour <= now:
-            next_hour = next_hour.replace(hour=next_hour.hour + 1)
+            next_hour += timedelta(hours=1)
         seconds_to_wait = (next_hour - now).total_seconds()
 
         # Wait until the next hour
@@ -30,3 +43,118 @@ async def schedule_tasks():
 
         # Reset rate limits
         await reset_rate_limits()
+
+
+def save_indexes():
+    """Snapshot the search and duplicate indexes, merging what other workers saved"""
+    for name, save in (("search", save_search_index), ("duplicate", save_duplicate_index)):
+        try:
+            save()
+        except Exception as e:
+            print(f"Error saving {name} index: {str(e)}")
+
+
+async def snapshot_indexes():
+    """Snapshot the in-process indexes to disk and merge the other workers' snapshots"""
+    while True:
+        await asyncio.sleep(settings.SEARCH_INDEX_SAVE_INTERVAL)
+        await cpu_executor.run(save_indexes)
+
+
+async def _expiring(redis: RedisService, key: str) -> bool:
+    """Whether key is missing or expires within PREFETCH_MARGIN seconds"""
+    ttl = await redis.ttl(key)
+    return ttl is not None and ttl != -1 and ttl < settings.PREFETCH_MARGIN
+
+
+async def _due_stages(redis: RedisService, video_id: str, model: Optional[str], lang: str) -> List[str]:
+    """Stages whose cache entry for the video in caption language lang is missing or about to expire"""
+    due = []
+    if settings.TRANSCRIPT_CACHE_TTL > 0 and await _expiring(redis, transcript_cache_key(video_id, lang)):
+        due.append(TRANSCRIPT)
+    if settings.CHECKPOINT_TTL <= 0:
+        return due
+    if settings.NORMALIZE_TRANSCRIPT and await _expiring(redis, normalized_key(video_id, lang)):
+        due.append(NORMALIZED)
+    if (settings.PREFETCH_INSIGHTS and model and model != EXTRACTIVE_MODEL
+            and await _expiring(redis, insights_key(video_id, model, lang))):
+        due.append(INSIGHTS)
+    return due
+
+
+async def prefetch_video(video_id: str, model: Optional[str]) -> List[str]:
+    """
+    Refresh the transcript cache and the normalized and insights checkpoints of a video that
+    are missing or about to expire, so new jobs for it skip the fetch and the LLM. Returns the
+    refreshed stages.
+    """
+    redis = RedisService()
+    items = None
+    normalized = None
+
+    # Caches are kept per caption language. Like jobs, check the first preference directly and
+    # only resolve the track the preferences pick (which may fetch the manifest) once a refresh
+    # is due for it
+    languages = TranscriptService.preferred_languages()
+    lang = languages[0]
+    due = await _due_stages(redis, video_id, model, lang) if lang != "*" else None
+    if due is None or due:
+        track, _, _ = await TranscriptService.resolve_track(video_id, languages)
+        if track["language_code"] != lang:
+            lang = track["language_code"]
+            due = await _due_stages(redis, video_id, model, lang)
+
+    if TRANSCRIPT in due:
+        items = await TranscriptService.fetch_transcript_items(video_id, lang)
+
+    if NORMALIZED in due:
+        items = items or await TranscriptService.get_transcript_items(video_id, lang)
+        normalized = await cpu_executor.run(normalize_transcript, [item.text for item in items])
+        await CheckpointService.save_normalized(video_id, normalized, lang)
+
+    if INSIGHTS in due:
+        items = items or await TranscriptService.get_transcript_items(video_id, lang)
+        text = TranscriptService.join_transcript(items)
+        if settings.NORMALIZE_TRANSCRIPT:
+            normalized = normalized or await CheckpointService.get_normalized(video_id, lang)
+            if normalized is None:
+                normalized = await cpu_executor.run(normalize_transcript, [item.text for item in items])
+            text = normalized["text"] or text
+        # Extractive answers are not checkpointed, so there is no point in falling back to one
+        generation = await InsightsService.generate(text, model, extractive_fallback=False)
+        await CheckpointService.save_insights(video_id, model, generation, lang)
+    return due
+
+
+async def prefetch_trending():
+    """Warm the caches of the most requested videos before their entries expire"""
+    trending_tracker.decay()
+    for trend in trending_tracker.top(settings.PREFETCH_TOP_K):
+        if trend["requests"] < settings.PREFETCH_MIN_REQUESTS:
+            break
+        try:
+            refreshed = await asyncio.wait_for(
+                prefetch_video(trend["video_id"], trend["model"]), settings.REQUEST_TIMEOUT
+            )
+            if refreshed:
+                print(f"[{datetime.utcnow()}] Prefetched {trend['video_id']}: {', '.join(refreshed)}")
+        except Exception as e:
+            print(f"Error prefetching video {trend['video_id']}: {str(e)}")
+
+
+async def prefetch_trending_periodically():
+    """Prefetch trending videos every PREFETCH_INTERVAL seconds"""
+    if settings.PREFETCH_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(settings.PREFETCH_INTERVAL)
+        await prefetch_trending()
+
+
+async def schedule_tasks():
+    """Schedule periodic tasks"""
+    await asyncio.gather(
+        reset_rate_limits_hourly(),
+        snapshot_indexes(),
+        prefetch_trending_periodically()
+    )
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Deadline of the job currently running in this context (None outside of process_video)
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a job runs out of its time budget"""
+
+
+class Deadline:
+    """Absolute time budget of a job that every stage inherits"""
+
+    def __init__(self, timeout: float, started_at: Optional[float] = None):
+        self.timeout = timeout
+        # The budget counts from started_at (wall clock, usually the time the job was queued)
+        elapsed = time.time() - started_at if started_at is not None else 0.0
+        self.expires_at = time.monotonic() + timeout - elapsed
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"Processing did not finish within {self.timeout:g} seconds")
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await awaitable, cancelling it when the deadline passes"""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            if self.expired():
+                raise DeadlineExceeded(f"Processing did not finish within {self.timeout:g} seconds") from None
+            raise
+
+
+@contextmanager
+def use_deadline(deadline: Deadline):
+    """Make deadline the budget of operations started in this context"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def stage_timeout(limit: float) -> float:
+    """
+    Timeout for one operation: limit, shortened to what is left of the current job's
+    deadline. Raises DeadlineExceeded if the deadline has already passed.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return limit
+    deadline.check()
+    return min(limit, deadline.remaining())
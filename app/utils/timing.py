@@ -0,0 +1,124 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+# Timeline of the job currently running in this context (None outside of process_video)
+_current_timeline: ContextVar[Optional["JobTimeline"]] = ContextVar("current_timeline", default=None)
+# Held while a job is profiled: only one profiler can be active per process (on Python 3.12+
+# a second cProfile.Profile().enable() raises ValueError)
+_profile_lock = threading.Lock()
+
+
+class JobTimeline:
+    """Collects timed spans for a single combined job"""
+
+    def __init__(self, request_id: str, started_at: Optional[float] = None):
+        self.request_id = request_id
+        # Wall clock origin of the timeline (usually the time the job was queued)
+        self.started_at = started_at if started_at is not None else time.time()
+        # Matching monotonic origin so span offsets are not affected by clock changes
+        self._origin = time.perf_counter() - (time.time() - self.started_at)
+        self.spans: List[Dict[str, Any]] = []
+        self.profile_path: Optional[str] = None
+
+    def record(self, name: str, start: float, duration: float, **attrs) -> None:
+        """Record a span given its offset from the timeline origin and its duration (seconds)"""
+        span_data = {"name": name, "start": round(start, 6), "duration": round(duration, 6)}
+        span_data.update({key: value for key, value in attrs.items() if value is not None})
+        self.spans.append(span_data)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time the enclosed block; the yielded dict can be used to attach attributes"""
+        start = time.perf_counter()
+        extra: Dict[str, Any] = {}
+        try:
+            yield extra
+        except BaseException as e:
+            extra.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            end = time.perf_counter()
+            self.record(name, start - self._origin, end - start, **attrs, **extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view stored alongside the job result"""
+        return {
+            "started_at": self.started_at,
+            "total": round(time.perf_counter() - self._origin, 6),
+            "spans": list(self.spans),
+            "profile": self.profile_path
+        }
+
+
+@contextmanager
+def use_timeline(timeline: JobTimeline):
+    """Make timeline the target of span() calls made in this context"""
+    token = _current_timeline.set(timeline)
+    try:
+        yield timeline
+    finally:
+        _current_timeline.reset(token)
+
+
+def current_timeline() -> Optional[JobTimeline]:
+    return _current_timeline.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Record a span on the current job timeline, or do nothing outside of a job"""
+    timeline = _current_timeline.get()
+    if timeline is None:
+        yield {}
+        return
+    with timeline.span(name, **attrs) as extra:
+        yield extra
+
+
+@contextmanager
+def maybe_profile(timeline: JobTimeline):
+    """
+    Capture a CPU profile for a sampled fraction of jobs.
+
+    Controlled by PROFILE_SAMPLE_RATE (0 disables profiling). Profiles are written to
+    PROFILE_DIR/<request_id>.prof and the path is recorded on the timeline. One job is
+    profiled at a time; a sampled job is skipped while another one is being profiled.
+
+    Only the job's own thread is profiled: work handed to the youtube, storage and cpu
+    pools or the process pool (parsing, compression, normalization, extractive insights)
+    shows up as time spent waiting on it, and is broken down by the timeline spans instead.
+    """
+    if settings.PROFILE_SAMPLE_RATE <= 0 or random.random() >= settings.PROFILE_SAMPLE_RATE:
+        yield None
+        return
+    if not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+
+    try:
+        # Set the path up front so results stored while profiling can reference it
+        path = os.path.join(settings.PROFILE_DIR, f"{timeline.request_id}.prof")
+        timeline.profile_path = path
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            try:
+                os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+                profiler.dump_stats(path)
+            except OSError as e:
+                timeline.profile_path = None
+                print(f"Error writing profile for {timeline.request_id}: {str(e)}")
+    finally:
+        _profile_lock.release()
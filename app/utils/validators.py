@@ -17,6 +17,20 @@ def validate_youtube_id(video_id: str) -> bool:
     return bool(re.match(pattern, video_id))
 
 
+def validate_language_code(lang: str) -> bool:
+    """
+    Validates if a string is a caption language code (such as "en", "pt-BR" or "zh-Hans"),
+    or "*" for any language.
+
+    Args:
+        lang: String to validate
+
+    Returns:
+        True if valid, False otherwise
+    """
+    return lang == "*" or bool(re.match(r'^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$', lang))
+
+
 def extract_youtube_id(url: str) -> Optional[str]:
     """
     Extracts YouTube video ID from various URL formats.
@@ -3,10 +3,14 @@
 import html
 import json
 import re
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from app.core.config import settings
+from app.utils.deadline import current_deadline, stage_timeout
+from app.utils.timing import span
+
 # Constants
 RE_YOUTUBE = r'(?:youtube\.com\/(?:[^\/]+\/.+\/|(?:v|e(?:mbed)?)\/|.*[?&]v=)|youtu\.be\/)([^"&?\/\s]{11})'
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36'
@@ -74,6 +78,10 @@ class TranscriptResponse:
 class YoutubeTranscript:
     """Class to fetch transcripts from YouTube videos"""
 
+    def __init__(self, parse_xml: Optional[Callable[[str, str], List[TranscriptResponse]]] = None):
+        # Caption parser; replaceable so large captions can be parsed out of process
+        self.parse_xml = parse_xml or self.parse_transcript_xml
+
     @staticmethod
     def retrieve_video_id(video_id: str) -> str:
         """Extract YouTube video ID from a string (URL or ID)"""
@@ -112,16 +120,78 @@ class YoutubeTranscript:
 
         return filename
 
-    def fetch_transcript(self, video_id: str, lang: str = "") -> Tuple[List[TranscriptResponse], str]:
+    @staticmethod
+    def parse_caption_tracks(video_page_html: str, identifier: str) -> List[dict]:
+        """Extract the captionTracks list from a watch page that contains captions data"""
+        captions_data = video_page_html.split('"captions":')[1]
+        captions_data = captions_data.split(',"videoDetails')[0]
+
+        try:
+            captions_json = json.loads('{' + '"captions":' + captions_data + '}')
+        except json.JSONDecodeError:
+            raise YoutubeTranscriptDisabledError(
+                f"Failed to parse captions data for video ({identifier})",
+                identifier
+            )
+
+        return captions_json.get('captions', {}).get('playerCaptionsTracklistRenderer', {}).get(
+            'captionTracks', [])
+
+    @classmethod
+    def parse_transcript_xml(cls, transcript_xml: str, lang: str = "") -> List[TranscriptResponse]:
+        """Parse timedtext XML into transcript items"""
+        transcript_items = []
+
+        matches = re.findall(RE_XML_TRANSCRIPT, transcript_xml)
+        for match in matches:
+            offset = float(match[0])
+            duration = float(match[1])
+            text = cls.decode_html(match[2])
+
+            transcript_items.append(TranscriptResponse(
+                text=text,
+                duration=duration,
+                offset=offset,
+                lang=lang
+            ))
+
+        return transcript_items
+
+    @staticmethod
+    def _get(session: requests.Session, url: str) -> requests.Response:
+        """GET with a timeout bounded by YOUTUBE_TIMEOUT and the current job deadline"""
+        try:
+            return session.get(url, timeout=stage_timeout(settings.YOUTUBE_TIMEOUT))
+        except requests.Timeout:
+            deadline = current_deadline()
+            if deadline is not None:
+                # The timeout was cut short by the job deadline
+                deadline.check()
+            raise YoutubeTranscriptError("Timed out waiting for a response from YouTube")
+
+    @staticmethod
+    def _session() -> requests.Session:
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        return session
+
+    @staticmethod
+    def _track_name(track: dict) -> str:
+        name = track.get('name', {})
+        if 'simpleText' in name:
+            return name['simpleText']
+        return "".join(run.get('text', '') for run in name.get('runs', []))
+
+    def fetch_manifest(self, video_id: str) -> Dict[str, Any]:
         """
-        Fetch transcript for a YouTube video
+        Fetch the caption-track manifest of a YouTube video from its watch page
 
         Args:
             video_id: YouTube video ID or URL
-            lang: Language code (optional)
 
         Returns:
-            Tuple of (transcript_items, video_title)
+            Dict with the video title and its caption tracks, each with its base URL, language
+            code, name and whether it was generated by speech recognition
 
         Raises:
             Various YoutubeTranscriptError exceptions
@@ -129,13 +199,11 @@ class YoutubeTranscript:
         # Extract video ID if URL was provided
         identifier = self.retrieve_video_id(video_id)
 
-        # Create a session with headers
-        session = requests.Session()
-        session.headers.update({"User-Agent": USER_AGENT})
-
         # Fetch the video page
-        video_page_url = f"https://www.youtube.com/watch?v={identifier}"
-        response = session.get(video_page_url)
+        video_page_url = f"{settings.YOUTUBE_BASE_URL}/watch?v={identifier}"
+        with span("youtube.watch_page") as page_span:
+            response = self._get(self._session(), video_page_url)
+            page_span["bytes"] = len(response.content)
 
         if response.status_code != 200:
             raise YoutubeTranscriptVideoUnavailableError(
@@ -168,18 +236,8 @@ class YoutubeTranscript:
             )
 
         # Extract captions data
-        captions_data = video_page_html.split('"captions":')[1]
-        captions_data = captions_data.split(',"videoDetails')[0]
-
-        try:
-            captions_json = json.loads('{' + '"captions":' + captions_data + '}')
-            caption_tracks = captions_json.get('captions', {}).get('playerCaptionsTracklistRenderer', {}).get(
-                'captionTracks', [])
-        except json.JSONDecodeError:
-            raise YoutubeTranscriptDisabledError(
-                f"Failed to parse captions data for video ({identifier})",
-                identifier
-            )
+        with span("youtube.caption_tracks"):
+            caption_tracks = self.parse_caption_tracks(video_page_html, identifier)
 
         if not caption_tracks:
             raise YoutubeTranscriptNotAvailableError(
@@ -187,53 +245,100 @@ class YoutubeTranscript:
                 identifier
             )
 
-        # Select the appropriate caption track
-        transcript_url = None
-        if lang:
-            # Find the requested language
-            for track in caption_tracks:
-                if track.get('languageCode') == lang:
-                    transcript_url = track.get('baseUrl')
-                    break
-
-            if not transcript_url:
-                # Language not found
-                available_langs = [track.get('languageCode') for track in caption_tracks]
-                raise YoutubeTranscriptNotAvailableLanguageError(
-                    f"No transcripts are available in {lang} for this video ({identifier}). Available languages: {', '.join(available_langs)}",
-                    lang,
-                    available_langs,
-                    identifier
-                )
-        else:
-            # Use the first available track
-            transcript_url = caption_tracks[0].get('baseUrl')
+        return {
+            "title": video_title,
+            "tracks": [
+                {
+                    "base_url": track.get('baseUrl'),
+                    "language_code": track.get('languageCode'),
+                    "name": self._track_name(track),
+                    "auto_generated": track.get('kind') == 'asr'
+                }
+                for track in caption_tracks if track.get('baseUrl')
+            ]
+        }
+
+    @staticmethod
+    def select_track(manifest: Dict[str, Any], languages: List[str], video_id: str) -> Dict[str, Any]:
+        """
+        Pick the caption track for the first of languages the video has
+
+        A language matches tracks with the same code, or with the same base language if
+        there is none ("en" matches "en-GB"); "*" matches any track. Among matching tracks,
+        manually created ones are preferred over auto-generated ones. Without languages the
+        first track is used.
+
+        Raises:
+            YoutubeTranscriptNotAvailableLanguageError: If no track matches
+        """
+        tracks = manifest["tracks"]
+        if not languages:
+            return tracks[0]
+
+        for lang in languages:
+            if lang == "*":
+                candidates = tracks
+            else:
+                candidates = [track for track in tracks if track["language_code"] == lang] or [
+                    track for track in tracks if track["language_code"].split("-")[0] == lang.split("-")[0]
+                ]
+            if candidates:
+                return min(candidates, key=lambda track: track["auto_generated"])
+
+        # Language not found
+        available_langs = [track["language_code"] for track in tracks]
+        requested = ", ".join(languages)
+        raise YoutubeTranscriptNotAvailableLanguageError(
+            f"No transcripts are available in {requested} for this video ({video_id}). "
+            f"Available languages: {', '.join(available_langs)}",
+            requested,
+            available_langs,
+            video_id
+        )
+
+    def fetch_track(self, track: Dict[str, Any], video_id: str) -> List[TranscriptResponse]:
+        """
+        Fetch and parse the segments of a caption track from a manifest
 
+        Raises:
+            YoutubeTranscriptNotAvailableError: If the track cannot be downloaded (for
+                example because its signed URL expired)
+        """
         # Fetch the transcript XML
-        transcript_response = session.get(transcript_url)
+        with span("youtube.captions") as captions_span:
+            transcript_response = self._get(self._session(), track["base_url"])
+            captions_span["bytes"] = len(transcript_response.content)
 
         if transcript_response.status_code != 200:
             raise YoutubeTranscriptNotAvailableError(
                 f"Failed to fetch transcript (HTTP {transcript_response.status_code})",
-                identifier
+                video_id
             )
 
         transcript_xml = transcript_response.text
 
         # Parse the XML to extract transcript items
-        transcript_items = []
+        with span("youtube.parse") as parse_span:
+            transcript_items = self.parse_xml(transcript_xml, track["language_code"])
+            parse_span["segments"] = len(transcript_items)
 
-        matches = re.findall(RE_XML_TRANSCRIPT, transcript_xml)
-        for match in matches:
-            offset = float(match[0])
-            duration = float(match[1])
-            text = self.decode_html(match[2])
+        return transcript_items
 
-            transcript_items.append(TranscriptResponse(
-                text=text,
-                duration=duration,
-                offset=offset,
-                lang=lang
-            ))
+    def fetch_transcript(self, video_id: str, lang: str = "") -> Tuple[List[TranscriptResponse], str]:
+        """
+        Fetch transcript for a YouTube video
 
-        return transcript_items, video_title
+        Args:
+            video_id: YouTube video ID or URL
+            lang: Language code (optional)
+
+        Returns:
+            Tuple of (transcript_items, video_title)
+
+        Raises:
+            Various YoutubeTranscriptError exceptions
+        """
+        identifier = self.retrieve_video_id(video_id)
+        manifest = self.fetch_manifest(identifier)
+        track = self.select_track(manifest, [lang] if lang else [], identifier)
+        return self.fetch_track(track, identifier), manifest["title"]
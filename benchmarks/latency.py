@@ -0,0 +1,56 @@
+import math
+import random
+from typing import Optional
+
+
+class LatencyDistribution:
+    """
+    Latency distribution used by the stub servers.
+
+    Specs are parsed from strings so they can be passed on the command line:
+
+    - ``fixed:0.2``                   always 200 ms
+    - ``uniform:0.1,0.5``             uniformly between 100 ms and 500 ms
+    - ``lognormal:0.3,2.0``           log-normal with a 300 ms median and a 2 s p99
+    - ``0``                           no added latency
+    """
+
+    # z-score of the 99th percentile of a standard normal distribution
+    _Z99 = 2.326
+
+    def __init__(self, kind: str, a: float = 0.0, b: float = 0.0, seed: Optional[int] = None):
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self._random = random.Random(seed)
+
+        if kind == "lognormal":
+            median, p99 = a, max(b, a)
+            self._mu = math.log(max(median, 1e-6))
+            self._sigma = (math.log(max(p99, 1e-6)) - self._mu) / self._Z99
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyDistribution":
+        spec = spec.strip()
+        if ":" not in spec:
+            return cls("fixed", float(spec or 0), seed=seed)
+
+        kind, _, params = spec.partition(":")
+        values = [float(value) for value in params.split(",") if value]
+        if kind == "fixed" and len(values) == 1:
+            return cls("fixed", values[0], seed=seed)
+        if kind in ("uniform", "lognormal") and len(values) == 2:
+            return cls(kind, values[0], values[1], seed=seed)
+
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        """Draw a latency in seconds"""
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return self._random.uniform(self.a, self.b)
+        return self._random.lognormvariate(self._mu, self._sigma)
+
+    def __repr__(self) -> str:
+        return f"LatencyDistribution({self.kind}, {self.a}, {self.b})"
@@ -0,0 +1,271 @@
+# benchmarks/load.py
+"""
+Load driver for the combined transcript + insights flow.
+
+Starts user sessions at a fixed arrival rate. Each session submits a video to
+POST /api/v1/combined and then follows it to completion either by polling the
+status endpoint or over the WebSocket, and finally fetches the result.
+
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --rate 2 --duration 60 --ws-ratio 0.3
+
+Exits non-zero when --max-p99 or --max-error-rate is exceeded so it can gate deploys.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import string
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+TERMINAL_STATUSES = {"completed", "partial_success", "failed", "timed_out", "cancelled"}
+
+
+class Recorder:
+    """Collects per-operation latencies and errors"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.final_statuses: Dict[str, int] = defaultdict(int)
+
+    def ok(self, operation: str, latency: float) -> None:
+        self.latencies[operation].append(latency)
+
+    def error(self, operation: str, latency: Optional[float] = None) -> None:
+        self.errors[operation] += 1
+        if latency is not None:
+            self.latencies[operation].append(latency)
+
+    def report(self, elapsed: float) -> Dict:
+        operations = {}
+        for operation in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies.get(operation, []))
+            errors = self.errors.get(operation, 0)
+            count = max(len(samples), errors)
+            operations[operation] = {
+                "count": count,
+                "throughput": count / elapsed if elapsed else 0.0,
+                "error_rate": errors / count if count else 0.0,
+                "p50": percentile(samples, 50),
+                "p90": percentile(samples, 90),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "max": samples[-1] if samples else None,
+            }
+        return {
+            "elapsed": elapsed,
+            "operations": operations,
+            "final_statuses": dict(self.final_statuses),
+        }
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def random_video_id(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_letters + string.digits + "-_") for _ in range(11))
+
+
+async def submit(client: httpx.AsyncClient, recorder: Recorder, video_id: str, model: str) -> Optional[str]:
+    start = time.perf_counter()
+    try:
+        response = await client.post("/api/v1/combined/", json={"video_id": video_id, "model": model})
+    except httpx.HTTPError:
+        recorder.error("submit")
+        return None
+    latency = time.perf_counter() - start
+    if response.status_code != 200:
+        recorder.error("submit", latency)
+        return None
+    recorder.ok("submit", latency)
+    return response.json().get("request_id")
+
+
+async def follow_by_polling(client: httpx.AsyncClient, recorder: Recorder, request_id: str,
+                            interval: float, timeout: float) -> Optional[str]:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(f"/api/v1/status/{request_id}")
+        except httpx.HTTPError:
+            recorder.error("poll")
+            await asyncio.sleep(interval)
+            continue
+        latency = time.perf_counter() - start
+        if response.status_code != 200:
+            recorder.error("poll", latency)
+        else:
+            recorder.ok("poll", latency)
+            status = response.json().get("status")
+            if status in TERMINAL_STATUSES:
+                return status
+        await asyncio.sleep(interval)
+    return None
+
+
+async def follow_by_websocket(ws_url: str, recorder: Recorder, request_id: str,
+                              interval: float, timeout: float) -> Optional[str]:
+    start = time.perf_counter()
+    deadline = start + timeout
+    try:
+        async with websockets.connect(f"{ws_url}/api/v1/ws/{request_id}") as websocket:
+            recorder.ok("ws_connect", time.perf_counter() - start)
+            while time.perf_counter() < deadline:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), timeout=interval)
+                except asyncio.TimeoutError:
+                    await websocket.send("ping")
+                    continue
+                if message == "pong":
+                    continue
+                status = json.loads(message).get("status")
+                if status in TERMINAL_STATUSES:
+                    return status
+    except (OSError, websockets.WebSocketException):
+        recorder.error("ws_connect")
+    return None
+
+
+async def fetch_result(client: httpx.AsyncClient, recorder: Recorder, request_id: str) -> None:
+    start = time.perf_counter()
+    try:
+        response = await client.get(f"/api/v1/combined/result/{request_id}")
+    except httpx.HTTPError:
+        recorder.error("result")
+        return
+    latency = time.perf_counter() - start
+    if response.status_code == 200:
+        recorder.ok("result", latency)
+    else:
+        recorder.error("result", latency)
+
+
+async def session(args: argparse.Namespace, client: httpx.AsyncClient, recorder: Recorder,
+                  rng: random.Random, video_pool: List[str]) -> None:
+    start = time.perf_counter()
+    # Skewed pick so popular videos repeat, like real traffic
+    video_id = video_pool[min(int(rng.paretovariate(1.2)) - 1, len(video_pool) - 1)]
+    request_id = await submit(client, recorder, video_id, args.model)
+    if request_id is None:
+        return
+
+    if rng.random() < args.ws_ratio:
+        status = await follow_by_websocket(args.ws_url, recorder, request_id, args.poll_interval, args.job_timeout)
+    else:
+        status = await follow_by_polling(client, recorder, request_id, args.poll_interval, args.job_timeout)
+
+    recorder.final_statuses[status or "unfinished"] += 1
+    if status is None or status == "failed":
+        recorder.error("job", time.perf_counter() - start)
+        return
+
+    await fetch_result(client, recorder, request_id)
+    recorder.ok("job", time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    rng = random.Random(args.seed)
+    video_pool = [random_video_id(rng) for _ in range(args.videos)]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.max_connections)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.http_timeout, limits=limits) as client:
+        sessions = []
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            sessions.append(asyncio.create_task(session(args, client, recorder, rng, video_pool)))
+            # Poisson arrivals at the requested rate
+            await asyncio.sleep(rng.expovariate(args.rate))
+        await asyncio.gather(*sessions)
+        elapsed = time.perf_counter() - start
+
+    return recorder.report(elapsed)
+
+
+def print_report(report: Dict) -> None:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    print(f"Elapsed: {report['elapsed']:.1f}s")
+    print(f"{'operation':<12}{'count':>8}{'rps':>8}{'err%':>7}{'p50':>8}{'p90':>8}{'p95':>8}{'p99':>8}{'max':>8}  (ms)")
+    for operation, stats in report["operations"].items():
+        print(
+            f"{operation:<12}{stats['count']:>8}{stats['throughput']:>8.2f}{stats['error_rate'] * 100:>7.1f}"
+            f"{ms(stats['p50']):>8}{ms(stats['p90']):>8}{ms(stats['p95']):>8}{ms(stats['p99']):>8}{ms(stats['max']):>8}"
+        )
+    print(f"Final statuses: {report['final_statuses']}")
+
+
+def check_thresholds(report: Dict, args: argparse.Namespace) -> List[str]:
+    failures = []
+    for operation, stats in report["operations"].items():
+        if args.max_error_rate is not None and stats["error_rate"] > args.max_error_rate:
+            failures.append(f"{operation} error rate {stats['error_rate']:.2%} > {args.max_error_rate:.2%}")
+        limit = args.max_p99.get(operation)
+        if limit is not None and stats["p99"] is not None and stats["p99"] > limit:
+            failures.append(f"{operation} p99 {stats['p99']:.3f}s > {limit:.3f}s")
+    return failures
+
+
+def parse_thresholds(value: str) -> Dict[str, float]:
+    """Parse "submit=0.2,job=30" into {"submit": 0.2, "job": 30.0}"""
+    thresholds = {}
+    for item in filter(None, value.split(",")):
+        operation, _, seconds = item.partition("=")
+        thresholds[operation.strip()] = float(seconds)
+    return thresholds
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the combined flow")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--ws-url", default=None, help="Defaults to base URL with a ws:// scheme")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to keep starting sessions")
+    parser.add_argument("--rate", type=float, default=1.0, help="New sessions per second")
+    parser.add_argument("--videos", type=int, default=200, help="Distinct videos in the pool")
+    parser.add_argument("--model", default="deepseek/deepseek-chat:free")
+    parser.add_argument("--ws-ratio", type=float, default=0.3, help="Fraction of sessions following via WebSocket")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--job-timeout", type=float, default=300.0)
+    parser.add_argument("--http-timeout", type=float, default=30.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report as JSON")
+    parser.add_argument("--max-p99", type=parse_thresholds, default={},
+                        help="Per-operation p99 limits in seconds, e.g. submit=0.2,job=60")
+    parser.add_argument("--max-error-rate", type=float, default=None)
+    args = parser.parse_args()
+    if args.ws_url is None:
+        args.ws_url = args.base_url.replace("https://", "wss://").replace("http://", "ws://")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_thresholds(report, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
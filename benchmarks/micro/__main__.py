@@ -0,0 +1,139 @@
+# benchmarks/micro/__main__.py
+"""
+Microbenchmarks for the CPU-bound hot paths, compared against a stored baseline.
+
+    python -m benchmarks.micro                     # run and compare with baseline.json
+    python -m benchmarks.micro --update-baseline   # record a new baseline
+    python -m benchmarks.micro -k parse            # only benchmarks whose name contains "parse"
+
+Baselines are machine specific, record them on the machine that runs the comparison.
+Exits non-zero when a benchmark is slower than its baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+# The app reads required settings at import time; benchmarks never touch the network
+for _name, _value in (("PORT", "8000"), ("OPENROUTER_API_KEY", "benchmark"),
+                      ("UPSTASH_REDIS_URL", "http://127.0.0.1:9003"), ("UPSTASH_REDIS_TOKEN", "benchmark")):
+    os.environ.setdefault(_name, _value)
+
+from app.models.schemas import CombinedResponse, ProcessingStatusResponse  # noqa: E402
+from app.services.redis_service import RedisService  # noqa: E402
+from app.services.transcript_service import TranscriptService  # noqa: E402
+from app.utils.validators import extract_youtube_id, validate_youtube_id  # noqa: E402
+from app.utils.youtube_transcript import RE_XML_TRANSCRIPT, YoutubeTranscript  # noqa: E402
+from benchmarks.micro import fixtures  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def build_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    benchmarks = []
+
+    for size in fixtures.SIZES:
+        page = fixtures.watch_page(size)
+        xml = fixtures.timedtext(size)
+        raw_texts = [match[2] for match in re.findall(RE_XML_TRANSCRIPT, xml)]
+        items = fixtures.transcript_items(size)
+        result = fixtures.combined_result(size)
+        status = fixtures.status_payload(size)
+        compressed = RedisService.compress_value(result)
+
+        benchmarks += [
+            (f"caption_tracks[{size}]", lambda page=page: YoutubeTranscript.parse_caption_tracks(page, "bench")),
+            (f"parse_transcript_xml[{size}]", lambda xml=xml: YoutubeTranscript.parse_transcript_xml(xml, "en")),
+            (f"decode_html[{size}]", lambda texts=raw_texts: [YoutubeTranscript.decode_html(t) for t in texts]),
+            (f"join_transcript[{size}]", lambda items=items: TranscriptService.join_transcript(items)),
+            (f"compress_value[{size}]", lambda result=result: RedisService.compress_value(result)),
+            (f"decompress_value[{size}]", lambda data=compressed: RedisService.decompress_value(data)),
+            (f"validate_combined_response[{size}]", lambda result=result: CombinedResponse(**result)),
+            (f"validate_status_response[{size}]", lambda status=status: ProcessingStatusResponse(**status)),
+            (f"serialize_combined_response[{size}]",
+             lambda result=result: CombinedResponse(**result).model_dump_json()),
+        ]
+
+    benchmarks += [
+        ("extract_youtube_id[300 urls]", lambda: [extract_youtube_id(url) for url in fixtures.URLS]),
+        ("validate_youtube_id[300 ids]",
+         lambda: [validate_youtube_id(url[-11:]) for url in fixtures.URLS]),
+    ]
+    return benchmarks
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> float:
+    """Best per-call time in seconds over `repeat` runs of at least `min_time` seconds each"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: Dict[str, float]) -> None:
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CPU hot path microbenchmarks")
+    parser.add_argument("-k", dest="keyword", default="", help="Only run benchmarks containing this substring")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    baseline = load_baseline(args.baseline)
+    results: Dict[str, float] = {}
+    regressions = []
+
+    print(f"{'benchmark':<44}{'time':>12}{'baseline':>12}{'change':>9}")
+    for name, func in build_benchmarks():
+        if args.keyword not in name:
+            continue
+        seconds = measure(func, args.repeat, args.min_time)
+        results[name] = seconds
+
+        reference = baseline.get(name)
+        change = "" if reference is None else f"{(seconds / reference - 1) * 100:+.1f}%"
+        reference_text = "-" if reference is None else f"{reference * 1e6:.1f}us"
+        print(f"{name:<44}{seconds * 1e6:>10.1f}us{reference_text:>12}{change:>9}")
+
+        if reference is not None and seconds > reference * (1 + args.threshold):
+            regressions.append(name)
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        save_baseline(args.baseline, merged)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    for name in regressions:
+        print(f"REGRESSION: {name} is more than {args.threshold:.0%} slower than baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# benchmarks/micro/fixtures.py
+from functools import lru_cache
+from typing import Dict, List
+
+from benchmarks.stubs.youtube import YoutubeStubConfig, build_timedtext, build_watch_page
+
+# Caption segment counts of realistic videos (roughly one segment every 3 seconds)
+SIZES: Dict[str, int] = {
+    "clip_5m": 100,
+    "talk_1h": 1200,
+    "stream_10h": 12000,
+}
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def _config(segments: int) -> YoutubeStubConfig:
+    return YoutubeStubConfig(public_url="https://www.youtube.com", min_segments=segments, max_segments=segments)
+
+
+@lru_cache(maxsize=None)
+def watch_page(size: str) -> str:
+    # Watch pages are ~1 MB regardless of video length
+    return build_watch_page(VIDEO_ID, _config(SIZES[size]))
+
+
+@lru_cache(maxsize=None)
+def timedtext(size: str) -> str:
+    return build_timedtext(VIDEO_ID, _config(SIZES[size]))
+
+
+@lru_cache(maxsize=None)
+def transcript_items(size: str) -> List:
+    from app.utils.youtube_transcript import YoutubeTranscript
+    return YoutubeTranscript.parse_transcript_xml(timedtext(size), "en")
+
+
+@lru_cache(maxsize=None)
+def transcript_text(size: str) -> str:
+    from app.services.transcript_service import TranscriptService
+    return TranscriptService.join_transcript(transcript_items(size))
+
+
+def combined_result(size: str) -> Dict:
+    text = transcript_text(size)
+    return {
+        "video_id": VIDEO_ID,
+        "transcript": text,
+        "insights": text[:4000],
+        "processing_time": 12.5,
+    }
+
+
+def status_payload(size: str) -> Dict:
+    text = transcript_text(size)
+    return {
+        "status": "completed",
+        "progress": 1.0,
+        "message": "Processing complete",
+        "request_id": "550e8400-e29b-41d4-a716-446655440000",
+        "video_id": VIDEO_ID,
+        "transcript": text,
+        "insights": text[:4000],
+    }
+
+
+URLS: List[str] = [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}",
+    f"https://www.youtube.com/watch?feature=share&list=PL123&v={VIDEO_ID}",
+    "https://example.com/not-a-video",
+] * 50
@@ -0,0 +1,81 @@
+# benchmarks/stubs/__main__.py
+"""
+Run local stand-ins for YouTube, OpenRouter and Upstash in one process.
+
+    python -m benchmarks.stubs --youtube-latency lognormal:0.3,2 --llm-latency lognormal:2,20
+
+Then start the API against them:
+
+    YOUTUBE_BASE_URL=http://127.0.0.1:9001 \\
+    OPENROUTER_BASE_URL=http://127.0.0.1:9002 \\
+    UPSTASH_REDIS_URL=http://127.0.0.1:9003 UPSTASH_REDIS_TOKEN=stub \\
+    RATE_LIMIT_REQUESTS=1000000 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+
+import uvicorn
+
+from benchmarks.latency import LatencyDistribution
+from benchmarks.stubs import openrouter, upstash, youtube
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stub servers for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--youtube-port", type=int, default=9001)
+    parser.add_argument("--openrouter-port", type=int, default=9002)
+    parser.add_argument("--upstash-port", type=int, default=9003)
+    parser.add_argument("--youtube-latency", default="lognormal:0.3,1.5", help="Watch page latency spec")
+    parser.add_argument("--captions-latency", default="lognormal:0.1,0.5", help="Timedtext latency spec")
+    parser.add_argument("--min-segments", type=int, default=100)
+    parser.add_argument("--max-segments", type=int, default=1500)
+    parser.add_argument("--page-kb", type=int, default=800, help="Watch page size in KB")
+    parser.add_argument("--captcha-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", default="lognormal:1.5,15", help="Time to first token spec")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--llm-completion-tokens", type=int, default=250)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-server-error-rate", type=float, default=0.0)
+    parser.add_argument("--redis-latency", default="lognormal:0.005,0.05", help="Upstash REST latency spec")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    youtube_app = youtube.create_app(youtube.YoutubeStubConfig(
+        public_url=f"http://{args.host}:{args.youtube_port}",
+        page_latency=LatencyDistribution.parse(args.youtube_latency, args.seed),
+        captions_latency=LatencyDistribution.parse(args.captions_latency, args.seed),
+        min_segments=args.min_segments,
+        max_segments=args.max_segments,
+        page_kb=args.page_kb,
+        captcha_rate=args.captcha_rate
+    ))
+    openrouter_app = openrouter.create_app(openrouter.OpenRouterStubConfig(
+        first_token_latency=LatencyDistribution.parse(args.llm_latency, args.seed),
+        tokens_per_second=args.llm_tokens_per_second,
+        completion_tokens=args.llm_completion_tokens,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        server_error_rate=args.llm_server_error_rate
+    ))
+    upstash_app = upstash.create_app(upstash.UpstashStubConfig(
+        latency=LatencyDistribution.parse(args.redis_latency, args.seed)
+    ))
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=args.host, port=port, log_level="warning"))
+        for app, port in (
+            (youtube_app, args.youtube_port),
+            (openrouter_app, args.openrouter_port),
+            (upstash_app, args.upstash_port),
+        )
+    ]
+    print(f"YouTube stub:    http://{args.host}:{args.youtube_port}")
+    print(f"OpenRouter stub: http://{args.host}:{args.openrouter_port}")
+    print(f"Upstash stub:    http://{args.host}:{args.upstash_port}")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
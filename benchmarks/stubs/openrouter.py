@@ -0,0 +1,95 @@
+# benchmarks/stubs/openrouter.py
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.latency import LatencyDistribution
+
+
+@dataclass
+class OpenRouterStubConfig:
+    """Settings for the OpenRouter chat completions stub"""
+    # Time until the first token (or the whole response when not streaming)
+    first_token_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.0))
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 200
+    # Fraction of requests answered with 429 / 503
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+
+
+def _usage(prompt: str, completion_tokens: int) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cost": 0.0
+    }
+
+
+def create_app(config: OpenRouterStubConfig) -> FastAPI:
+    app = FastAPI(title="OpenRouter stub")
+    error_rng = random.Random(0)
+
+    @app.get("/models")
+    async def models():
+        return {"data": [{"id": "stub/model", "context_length": 131072}]}
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        model = payload.get("model", "stub/model")
+        prompt = " ".join(message.get("content", "") for message in payload.get("messages", []))
+
+        roll = error_rng.random()
+        if roll < config.rate_limit_rate:
+            return JSONResponse({"error": {"message": "Rate limit exceeded", "code": 429}}, status_code=429)
+        if roll < config.rate_limit_rate + config.server_error_rate:
+            return JSONResponse({"error": {"message": "Upstream error", "code": 503}}, status_code=503)
+
+        completion_id = f"gen-{uuid.uuid4().hex[:12]}"
+        tokens = [f"insight{i} " for i in range(config.completion_tokens)]
+        token_delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        first_token_delay = config.first_token_latency.sample()
+
+        if not payload.get("stream"):
+            await asyncio.sleep(first_token_delay + token_delay * len(tokens))
+            return {
+                "id": completion_id,
+                "model": model,
+                "created": int(time.time()),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                             "finish_reason": "stop"}],
+                "usage": _usage(prompt, len(tokens))
+            }
+
+        async def stream():
+            await asyncio.sleep(first_token_delay)
+            for token in tokens:
+                chunk = {
+                    "id": completion_id,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+            final = {
+                "id": completion_id,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": _usage(prompt, len(tokens))
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
@@ -0,0 +1,130 @@
+# benchmarks/stubs/upstash.py
+import asyncio
+import base64
+import fnmatch
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+
+from benchmarks.latency import LatencyDistribution
+
+
+@dataclass
+class UpstashStubConfig:
+    """Settings for the Upstash REST stub"""
+    latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.0))
+
+
+class CommandError(Exception):
+    pass
+
+
+class InMemoryRedis:
+    """Tiny Redis command interpreter covering the commands the app sends"""
+
+    def __init__(self):
+        self.data: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _get(self, key: str) -> Any:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _expiry(self, key: str) -> Optional[float]:
+        return self.data[key][1] if self._get(key) is not None else None
+
+    def execute(self, command: List[Any]) -> Any:
+        name, args = str(command[0]).upper(), [str(arg) for arg in command[1:]]
+
+        if name == "PING":
+            return "PONG"
+        if name == "GET":
+            return self._get(args[0])
+        if name == "MGET":
+            return [self._get(key) for key in args]
+        if name == "SET":
+            key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+            expires_at = None
+            if "EX" in options:
+                expires_at = time.time() + int(args[2 + options.index("EX") + 1])
+            if "PX" in options:
+                expires_at = time.time() + int(args[2 + options.index("PX") + 1]) / 1000
+            if "NX" in options and self._get(key) is not None:
+                return None
+            self.data[key] = (value, expires_at)
+            return "OK"
+        if name == "SETEX":
+            self.data[args[0]] = (args[2], time.time() + int(args[1]))
+            return "OK"
+        if name in ("INCR", "INCRBY"):
+            amount = int(args[1]) if name == "INCRBY" else 1
+            current = int(self._get(args[0]) or 0) + amount
+            self.data[args[0]] = (str(current), self._expiry(args[0]))
+            return current
+        if name == "EXPIRE":
+            value = self._get(args[0])
+            if value is None:
+                return 0
+            self.data[args[0]] = (value, time.time() + int(args[1]))
+            return 1
+        if name == "TTL":
+            if self._get(args[0]) is None:
+                return -2
+            expires_at = self.data[args[0]][1]
+            return -1 if expires_at is None else max(0, int(expires_at - time.time()))
+        if name in ("DEL", "UNLINK"):
+            return sum(1 for key in args if self.data.pop(key, None) is not None)
+        if name == "EXISTS":
+            return sum(1 for key in args if self._get(key) is not None)
+        if name == "KEYS":
+            return [key for key in list(self.data) if fnmatch.fnmatchcase(key, args[0]) and self._get(key) is not None]
+        if name == "SCAN":
+            pattern = args[args.index("MATCH") + 1] if "MATCH" in args else "*"
+            keys = [key for key in list(self.data) if fnmatch.fnmatchcase(key, pattern) and self._get(key) is not None]
+            return ["0", keys]
+        if name == "PUBLISH":
+            return 0
+
+        raise CommandError(f"ERR unknown command '{name}'")
+
+
+def _encode(result: Any) -> Any:
+    """Apply the Upstash base64 response encoding"""
+    if isinstance(result, str):
+        return "OK" if result == "OK" else base64.b64encode(result.encode()).decode()
+    if isinstance(result, list):
+        return [_encode(element) for element in result]
+    return result
+
+
+def create_app(config: UpstashStubConfig) -> FastAPI:
+    app = FastAPI(title="Upstash REST stub")
+    store = InMemoryRedis()
+
+    def run(command: List[Any], encoding: Optional[str]) -> Dict[str, Any]:
+        try:
+            result = store.execute(command)
+        except (CommandError, IndexError, ValueError) as e:
+            return {"error": str(e)}
+        return {"result": _encode(result) if encoding == "base64" else result}
+
+    @app.post("/")
+    async def single(request: Request):
+        await asyncio.sleep(config.latency.sample())
+        return run(await request.json(), request.headers.get("Upstash-Encoding"))
+
+    @app.post("/pipeline")
+    @app.post("/multi-exec")
+    async def pipeline(request: Request):
+        await asyncio.sleep(config.latency.sample())
+        encoding = request.headers.get("Upstash-Encoding")
+        return [run(command, encoding) for command in await request.json()]
+
+    return app
@@ -0,0 +1,97 @@
+# benchmarks/stubs/youtube.py
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Query, Response
+
+from benchmarks.latency import LatencyDistribution
+
+WORDS = (
+    "so today we are going to talk about how the system actually works and why "
+    "it matters for performance you know the key idea is that latency adds up "
+    "across every stage of the pipeline"
+).split()
+
+
+@dataclass
+class YoutubeStubConfig:
+    """Settings for the YouTube watch page / timedtext stub"""
+    public_url: str = "http://127.0.0.1:9001"
+    page_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.0))
+    captions_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.0))
+    # Number of caption segments per video (a 5 minute clip has ~100, a 1 hour talk ~1200)
+    min_segments: int = 100
+    max_segments: int = 1500
+    # Size of the watch page filler, real watch pages are around 1 MB
+    page_kb: int = 800
+    # Fraction of watch page requests answered with the captcha page
+    captcha_rate: float = 0.0
+
+
+def _video_rng(video_id: str) -> random.Random:
+    """Deterministic per-video RNG so the same video always gets the same captions"""
+    return random.Random(int(hashlib.sha1(video_id.encode()).hexdigest()[:8], 16))
+
+
+def build_watch_page(video_id: str, config: YoutubeStubConfig) -> str:
+    caption_tracks = [
+        {
+            "baseUrl": f"{config.public_url}/api/timedtext?v={video_id}&lang=en",
+            "name": {"simpleText": "English (auto-generated)"},
+            "languageCode": "en",
+            "kind": "asr"
+        },
+        {
+            "baseUrl": f"{config.public_url}/api/timedtext?v={video_id}&lang=de",
+            "name": {"simpleText": "German"},
+            "languageCode": "de"
+        }
+    ]
+    captions = {"playerCaptionsTracklistRenderer": {"captionTracks": caption_tracks}}
+    filler = "x" * (config.page_kb * 1024)
+    return (
+        f"<html><head><title>Stub video {video_id} - YouTube</title></head><body>"
+        f"<script>var ytInitialPlayerResponse = {{\"playabilityStatus\":{{\"status\":\"OK\"}},"
+        f"\"captions\":{json.dumps(captions)},\"videoDetails\":{{\"videoId\":\"{video_id}\"}}}};</script>"
+        f"<div hidden>{filler}</div></body></html>"
+    )
+
+
+def build_timedtext(video_id: str, config: YoutubeStubConfig) -> str:
+    rng = _video_rng(video_id)
+    segments = rng.randint(config.min_segments, max(config.min_segments, config.max_segments))
+    parts = ['<?xml version="1.0" encoding="utf-8" ?><transcript>']
+    offset = 0.0
+    for _ in range(segments):
+        duration = round(rng.uniform(1.5, 4.0), 2)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+        if rng.random() < 0.05:
+            text = "[Music]"
+        elif rng.random() < 0.1:
+            text += " it&amp;#39;s"
+        parts.append(f'<text start="{offset:.2f}" dur="{duration}">{text}</text>')
+        offset += duration
+    parts.append("</transcript>")
+    return "".join(parts)
+
+
+def create_app(config: YoutubeStubConfig) -> FastAPI:
+    app = FastAPI(title="YouTube stub")
+    captcha_rng = random.Random(0)
+
+    @app.get("/watch")
+    async def watch(v: str = Query(...)):
+        await asyncio.sleep(config.page_latency.sample())
+        if config.captcha_rate and captcha_rng.random() < config.captcha_rate:
+            return Response('<html><div class="g-recaptcha"></div></html>', media_type="text/html")
+        return Response(build_watch_page(v, config), media_type="text/html")
+
+    @app.get("/api/timedtext")
+    async def timedtext(v: str = Query(...), lang: str = Query("en")):
+        await asyncio.sleep(config.captions_latency.sample())
+        return Response(build_timedtext(f"{v}:{lang}", config), media_type="text/xml")
+
+    return app